@@ -0,0 +1 @@
+"""Shared helpers packaged into every SupplySense agent runtime image."""
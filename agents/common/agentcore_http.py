@@ -0,0 +1,378 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import socket
+import threading
+import time
+import urllib.parse
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+import requests
+from bedrock_agentcore_starter_toolkit.services.runtime import HttpBedrockAgentCoreClient
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+
+try:
+    import aiohttp
+except ImportError:  # only AsyncAgentCoreClient needs it
+    aiohttp = None
+
+logger = logging.getLogger(__name__)
+
+# Keep-alive connections held open to the AgentCore data plane
+DEFAULT_POOL_SIZE = max(1, int(os.environ.get('SUPPLYSENSE_AGENTCORE_POOL_SIZE', '16')))
+# In-flight invocations allowed at once; callers beyond this wait for a slot
+DEFAULT_MAX_CONCURRENCY = max(1, int(os.environ.get('SUPPLYSENSE_AGENTCORE_MAX_CONCURRENCY', str(DEFAULT_POOL_SIZE))))
+DEFAULT_TIMEOUT_SECONDS = float(os.environ.get('SUPPLYSENSE_AGENTCORE_TIMEOUT_SECONDS', '900'))
+SESSION_HEADER = 'X-Amzn-Bedrock-AgentCore-Runtime-Session-Id'
+# Seconds an idle pooled connection is kept open by the asyncio client
+DEFAULT_KEEPALIVE_SECONDS = float(os.environ.get('SUPPLYSENSE_AGENTCORE_KEEPALIVE_SECONDS', '60'))
+
+
+class _KeepAliveAdapter(HTTPAdapter):
+    """HTTPAdapter whose sockets enable TCP keep-alive so idle pooled connections survive."""
+
+    def init_poolmanager(self, *args: Any, **kwargs: Any) -> None:
+        kwargs['socket_options'] = HTTPConnection.default_socket_options + [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+        super().init_poolmanager(*args, **kwargs)
+
+
+class PooledAgentCoreClient:
+    """Thread-safe AgentCore runtime client over one shared keep-alive connection pool.
+
+    Unlike HttpBedrockAgentCoreClient.invoke_endpoint, which opens a fresh connection (and
+    TLS handshake) per call, every invocation reuses pooled connections. Concurrency is
+    capped by a semaphore sized to the pool, so fan-out never opens throwaway connections.
+    Long-lived streams use a separate, non-blocking pool and never take an invocation slot.
+    """
+
+    def __init__(
+        self,
+        region: str,
+        pool_size: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+        timeout: Optional[float] = None,
+    ):
+        self.region = region
+        self.dp_endpoint = HttpBedrockAgentCoreClient(region).dp_endpoint
+        self.pool_size = max(1, int(pool_size or DEFAULT_POOL_SIZE))
+        self.max_concurrency = max(1, int(max_concurrency or min(DEFAULT_MAX_CONCURRENCY, self.pool_size)))
+        self.timeout = DEFAULT_TIMEOUT_SECONDS if timeout is None else float(timeout)
+
+        self._adapter = _KeepAliveAdapter(pool_connections=1, pool_maxsize=self.pool_size, pool_block=True)
+        self._session = self._mount(self._adapter)
+        # Streams beyond pool_size open extra connections instead of waiting for one
+        self._stream_adapter = _KeepAliveAdapter(pool_connections=1, pool_maxsize=self.pool_size, pool_block=False)
+        self._stream_session = self._mount(self._stream_adapter)
+        self._slots = threading.BoundedSemaphore(self.max_concurrency)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._peak_in_flight = 0
+        self._open_streams = 0
+
+    @staticmethod
+    def _mount(adapter: HTTPAdapter) -> requests.Session:
+        session = requests.Session()
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        session.headers.update({'Connection': 'keep-alive'})
+        return session
+
+    def _url(self, agent_arn: str) -> str:
+        return f"{self.dp_endpoint}/runtimes/{urllib.parse.quote(agent_arn, safe='')}/invocations"
+
+    def _headers(self, session_id: str, bearer_token: Optional[str], accept: str) -> Dict[str, str]:
+        headers = {'Content-Type': 'application/json', 'Accept': accept, SESSION_HEADER: session_id}
+        if bearer_token:
+            headers['Authorization'] = f"Bearer {bearer_token}"
+        return headers
+
+    @contextmanager
+    def _post(
+        self,
+        session: requests.Session,
+        agent_arn: str,
+        payload: Any,
+        session_id: str,
+        bearer_token: Optional[str],
+        endpoint_name: str,
+        timeout: Optional[float],
+    ) -> Iterator[requests.Response]:
+        with session.post(
+            self._url(agent_arn),
+            params={'qualifier': endpoint_name},
+            headers=self._headers(session_id, bearer_token, 'text/event-stream, application/json'),
+            json=payload,
+            timeout=self.timeout if timeout is None else timeout,
+            stream=True,
+        ) as response:
+            if response.status_code in (401, 403):
+                raise RuntimeError(f"{response.status_code} {response.reason}: bearer token may be expired or invalid")
+            response.raise_for_status()
+            yield response
+
+    @contextmanager
+    def stream(
+        self,
+        agent_arn: str,
+        payload: Any,
+        session_id: str,
+        bearer_token: Optional[str] = None,
+        endpoint_name: str = 'DEFAULT',
+        timeout: Optional[float] = None,
+    ) -> Iterator[requests.Response]:
+        """Open a streaming invocation; the connection is released when the block exits.
+
+        Streams do not count against max_concurrency. Use abort() to unblock a thread
+        reading the stream from elsewhere.
+        """
+        with self._lock:
+            self._open_streams += 1
+        try:
+            with self._post(self._stream_session, agent_arn, payload, session_id, bearer_token, endpoint_name, timeout) as response:
+                yield response
+        finally:
+            with self._lock:
+                self._open_streams -= 1
+
+    @staticmethod
+    def abort(response: requests.Response) -> None:
+        """Shut down a streaming response's socket so a thread blocked reading it returns promptly."""
+        sock = getattr(getattr(response.raw, 'connection', None), 'sock', None)
+        if sock is None:
+            return
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+    def invoke_endpoint(
+        self,
+        agent_arn: str,
+        payload: Any,
+        session_id: str,
+        bearer_token: Optional[str] = None,
+        endpoint_name: str = 'DEFAULT',
+        timeout: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """Invoke a runtime and return {'response': text}; streamed replies are joined from their data lines.
+
+        timeout bounds the whole call, not each socket read: once it passes, the response is
+        aborted and TimeoutError raised, so a runtime that keeps sending data cannot hold the
+        slot (or the caller's thread) past it.
+        """
+        deadline = time.monotonic() + (self.timeout if timeout is None else timeout)
+        with self._slots:
+            with self._lock:
+                self._in_flight += 1
+                self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+            try:
+                with self._post(self._session, agent_arn, payload, session_id, bearer_token, endpoint_name, timeout) as response:
+                    with self._abort_at(response, deadline) as expired:
+                        result = self._read_response(response, deadline)
+                    if expired.is_set():
+                        # The abort can end a read cleanly, leaving a truncated body
+                        raise TimeoutError("Agent endpoint response aborted at its deadline")
+                    return result
+            finally:
+                with self._lock:
+                    self._in_flight -= 1
+
+    @contextmanager
+    def _abort_at(self, response: requests.Response, deadline: float) -> Iterator[threading.Event]:
+        """Abort the response if the block is still running at deadline; yields an event set when that happened."""
+        expired = threading.Event()
+        guard = threading.Lock()
+        finished = False
+
+        def _expire() -> None:
+            with guard:
+                if finished:
+                    return
+                expired.set()
+                self.abort(response)
+
+        timer = threading.Timer(max(0.0, deadline - time.monotonic()), _expire)
+        timer.daemon = True
+        timer.start()
+        try:
+            yield expired
+        except Exception:
+            if expired.is_set():
+                raise TimeoutError("Agent endpoint response aborted at its deadline") from None
+            raise
+        finally:
+            # Mark finished before the connection goes back to the pool, so a late timer cannot abort its next user
+            with guard:
+                finished = True
+            timer.cancel()
+
+    @staticmethod
+    def _read_response(response: requests.Response, deadline: float) -> Dict[str, Any]:
+        if 'text/event-stream' in response.headers.get('content-type', ''):
+            chunks = []
+            for line in response.iter_lines(decode_unicode=True):
+                if time.monotonic() >= deadline:
+                    raise TimeoutError("Agent endpoint stream ran past its deadline")
+                if line and line.startswith('data:'):
+                    chunks.append(line[5:].strip())
+            return {'response': '\n'.join(chunks)}
+        if not response.content:
+            raise ValueError("Empty response from agent endpoint")
+        return {'response': response.text}
+
+    def stats(self) -> Dict[str, Any]:
+        """Pool sizing, in-flight calls and how often requests reused an open connection."""
+        pools = self._adapter.poolmanager.pools
+        requests_sent = connections = 0
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is not None:
+                requests_sent += pool.num_requests
+                connections += pool.num_connections
+        with self._lock:
+            in_flight, peak, open_streams = self._in_flight, self._peak_in_flight, self._open_streams
+        return {
+            'poolSize': self.pool_size,
+            'maxConcurrency': self.max_concurrency,
+            'inFlight': in_flight,
+            'peakInFlight': peak,
+            'openStreams': open_streams,
+            'requests': requests_sent,
+            'connectionsOpened': connections,
+            'reuseRate': round(1 - connections / requests_sent, 3) if requests_sent else 0.0,
+        }
+
+    def close(self) -> None:
+        self._session.close()
+        self._stream_session.close()
+
+
+class AsyncAgentCoreClient:
+    """asyncio AgentCore runtime client on an aiohttp keep-alive connector.
+
+    Connections are capped at pool_size; callers beyond it wait on the connector rather
+    than holding a thread. The session is bound to the event loop that uses it; using the
+    client from another loop closes the old session before building a new one.
+    """
+
+    def __init__(
+        self,
+        dp_endpoint: str,
+        pool_size: Optional[int] = None,
+        keepalive_seconds: Optional[float] = None,
+        timeout: Optional[float] = None,
+    ):
+        if aiohttp is None:
+            raise RuntimeError("AsyncAgentCoreClient requires aiohttp")
+        self.dp_endpoint = dp_endpoint
+        self.pool_size = max(1, int(pool_size or DEFAULT_POOL_SIZE))
+        self.keepalive_seconds = DEFAULT_KEEPALIVE_SECONDS if keepalive_seconds is None else float(keepalive_seconds)
+        self.timeout = DEFAULT_TIMEOUT_SECONDS if timeout is None else float(timeout)
+        self._session: Optional[Any] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._counts = {'requests': 0, 'connectionsOpened': 0, 'connectionsReused': 0, 'inFlight': 0, 'peakInFlight': 0}
+
+    def _trace_config(self) -> Any:
+        trace = aiohttp.TraceConfig()
+
+        async def _created(*_: Any) -> None:
+            self._counts['connectionsOpened'] += 1
+
+        async def _reused(*_: Any) -> None:
+            self._counts['connectionsReused'] += 1
+
+        trace.on_connection_create_end.append(_created)
+        trace.on_connection_reuseconn.append(_reused)
+        return trace
+
+    @staticmethod
+    def _release_session(session: Any, loop: Optional[asyncio.AbstractEventLoop]) -> None:
+        """Close a session that belongs to another event loop."""
+        if session.closed:
+            return
+        if loop is not None and not loop.is_closed():
+            try:
+                # Its connections belong to that loop (possibly running on another thread)
+                asyncio.run_coroutine_threadsafe(session.close(), loop)
+                return
+            except RuntimeError:
+                pass  # closed since the check
+        # The loop can no longer run close(); detach so the session is not reported as leaked
+        # and its dead connections are released with it
+        session.detach()
+
+    def _client_session(self) -> Any:
+        loop = asyncio.get_running_loop()
+        if self._session is not None and self._loop is not loop:
+            self._release_session(self._session, self._loop)
+            self._session = None
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_size,
+                limit_per_host=self.pool_size,
+                keepalive_timeout=self.keepalive_seconds,
+                ttl_dns_cache=300,
+            )
+            self._session = aiohttp.ClientSession(connector=connector, trace_configs=[self._trace_config()])
+            self._loop = loop
+        return self._session
+
+    async def invoke_endpoint(
+        self,
+        agent_arn: str,
+        payload: Any,
+        session_id: str,
+        bearer_token: Optional[str] = None,
+        endpoint_name: str = 'DEFAULT',
+        timeout: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """Invoke a runtime and return {'response': text}, like PooledAgentCoreClient.invoke_endpoint."""
+        headers = {'Content-Type': 'application/json', 'Accept': 'text/event-stream, application/json', SESSION_HEADER: session_id}
+        if bearer_token:
+            headers['Authorization'] = f"Bearer {bearer_token}"
+        url = f"{self.dp_endpoint}/runtimes/{urllib.parse.quote(agent_arn, safe='')}/invocations"
+
+        self._counts['requests'] += 1
+        self._counts['inFlight'] += 1
+        self._counts['peakInFlight'] = max(self._counts['peakInFlight'], self._counts['inFlight'])
+        try:
+            async with self._client_session().post(
+                url,
+                params={'qualifier': endpoint_name},
+                headers=headers,
+                json=payload,
+                timeout=aiohttp.ClientTimeout(total=self.timeout if timeout is None else timeout),
+            ) as response:
+                if response.status in (401, 403):
+                    raise RuntimeError(f"{response.status} {response.reason}: bearer token may be expired or invalid")
+                response.raise_for_status()
+                if 'text/event-stream' in response.headers.get('content-type', ''):
+                    chunks = []
+                    async for raw_line in response.content:
+                        line = raw_line.decode('utf-8').strip()
+                        if line.startswith('data:'):
+                            chunks.append(line[5:].strip())
+                    return {'response': '\n'.join(chunks)}
+                text = await response.text()
+                if not text:
+                    raise ValueError("Empty response from agent endpoint")
+                return {'response': text}
+        finally:
+            self._counts['inFlight'] -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        counts = dict(self._counts)
+        connects = counts['connectionsOpened'] + counts['connectionsReused']
+        return {
+            'poolSize': self.pool_size,
+            **counts,
+            'reuseRate': round(counts['connectionsReused'] / connects, 3) if connects else 0.0,
+        }
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
@@ -0,0 +1,233 @@
+from __future__ import annotations
+
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+import boto3
+
+logger = logging.getLogger(__name__)
+
+# Number of parallel Segment/TotalSegments workers used for full-table scans.
+DEFAULT_SCAN_SEGMENTS = max(1, int(os.environ.get('SUPPLYSENSE_SCAN_SEGMENTS', '4')))
+# Pages buffered between scan workers and the consuming generator.
+_PAGE_BUFFER = 8
+# BatchGetItem accepts at most 100 keys per request.
+BATCH_GET_CHUNK_SIZE = 100
+BATCH_GET_MAX_WORKERS = max(1, int(os.environ.get('SUPPLYSENSE_BATCH_GET_WORKERS', '8')))
+BATCH_GET_MAX_ATTEMPTS = 6
+# Workers shared by every scan segment, query fan-out and BatchGetItem chunk in the process.
+# Long-lived workers keep their per-thread DynamoDB resources across calls.
+DYNAMO_POOL_WORKERS = max(
+    DEFAULT_SCAN_SEGMENTS, BATCH_GET_MAX_WORKERS, int(os.environ.get('SUPPLYSENSE_DYNAMO_WORKERS', '16')),
+)
+_SEGMENT_DONE = object()
+
+_thread_local = threading.local()
+_pool = ThreadPoolExecutor(max_workers=DYNAMO_POOL_WORKERS, thread_name_prefix='dynamo')
+
+
+def _thread_resource(table: Any) -> Any:
+    """Return a per-thread DynamoDB service resource in the table's region (resources are not thread-safe)."""
+    region = table.meta.client.meta.region_name
+    resources = getattr(_thread_local, 'resources', None)
+    if resources is None:
+        resources = _thread_local.resources = {}
+    resource = resources.get(region)
+    if resource is None:
+        resource = resources[region] = boto3.session.Session().resource('dynamodb', region_name=region)
+    return resource
+
+
+def _thread_table(table: Any) -> Any:
+    return _thread_resource(table).Table(table.name)
+
+
+def _run_bounded(func: Callable[[Any], Any], items: Sequence[Any], limit: int) -> List[Any]:
+    """Run func over items on the shared pool with at most limit in flight; results keep input order.
+
+    Tasks must not submit to the pool themselves, or a saturated pool could deadlock.
+    """
+    results: List[Any] = [None] * len(items)
+    pending: Dict[Future, int] = {}
+    queued = iter(enumerate(items))
+
+    def _submit_next() -> None:
+        for index, item in queued:
+            pending[_pool.submit(func, item)] = index
+            return
+
+    for _ in range(limit):
+        _submit_next()
+    try:
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                results[pending.pop(future)] = future.result()
+                _submit_next()
+    finally:
+        for future in pending:
+            future.cancel()
+    return results
+
+
+def _paginate(operation: Any, kwargs: Dict[str, Any]) -> Iterator[List[Dict[str, Any]]]:
+    """Yield pages from a scan/query call, following LastEvaluatedKey until exhausted."""
+    request = dict(kwargs)
+    while True:
+        response = operation(**request)
+        yield response.get('Items', [])
+        last_key = response.get('LastEvaluatedKey')
+        if not last_key:
+            return
+        request['ExclusiveStartKey'] = last_key
+
+
+def iter_query(table: Any, **query_kwargs: Any) -> Iterator[Dict[str, Any]]:
+    """Stream every item matched by a query, across all result pages."""
+    for page in _paginate(table.query, query_kwargs):
+        yield from page
+
+
+def query_all(table: Any, **query_kwargs: Any) -> List[Dict[str, Any]]:
+    """Collect every item matched by a query into a list."""
+    return list(iter_query(table, **query_kwargs))
+
+
+def query_many(
+    table: Any,
+    requests: Sequence[Dict[str, Any]],
+    max_workers: Optional[int] = None,
+) -> List[List[Dict[str, Any]]]:
+    """Run independent paginated queries concurrently; results line up with requests."""
+    if not requests:
+        return []
+    workers = min(len(requests), max_workers or BATCH_GET_MAX_WORKERS)
+    if workers == 1:
+        return [query_all(table, **request) for request in requests]
+    return _run_bounded(lambda request: query_all(_thread_table(table), **request), requests, workers)
+
+
+def iter_scan(table: Any, segments: Optional[int] = None, **scan_kwargs: Any) -> Iterator[Dict[str, Any]]:
+    """Stream every item of a table scan.
+
+    With more than one segment the table is scanned as parallel Segment/TotalSegments
+    workers on the shared pool; items are yielded as pages arrive, so ordering across
+    segments is not guaranteed.
+    """
+    total_segments = DEFAULT_SCAN_SEGMENTS if segments is None else max(1, int(segments))
+    if total_segments == 1:
+        for page in _paginate(table.scan, scan_kwargs):
+            yield from page
+        return
+
+    pages: queue.Queue = queue.Queue(maxsize=_PAGE_BUFFER)
+    stop = threading.Event()
+
+    def _offer(entry: Any) -> bool:
+        while not stop.is_set():
+            try:
+                pages.put(entry, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _scan_segment(segment: int) -> None:
+        try:
+            segment_kwargs = dict(scan_kwargs, Segment=segment, TotalSegments=total_segments)
+            for page in _paginate(_thread_table(table).scan, segment_kwargs):
+                if not _offer(page):
+                    return
+            _offer(_SEGMENT_DONE)
+        except Exception as exc:  # surfaced to the consumer below
+            _offer(exc)
+
+    futures = []
+    try:
+        for segment in range(total_segments):
+            futures.append(_pool.submit(_scan_segment, segment))
+        remaining = total_segments
+        while remaining:
+            entry = pages.get()
+            if entry is _SEGMENT_DONE:
+                remaining -= 1
+            elif isinstance(entry, Exception):
+                raise entry
+            else:
+                yield from entry
+    finally:
+        stop.set()
+        for future in futures:
+            future.cancel()
+
+
+def scan_all(table: Any, segments: Optional[int] = None, **scan_kwargs: Any) -> List[Dict[str, Any]]:
+    """Collect every item of a (possibly parallel) table scan into a list."""
+    items = list(iter_scan(table, segments=segments, **scan_kwargs))
+    logger.debug("Scanned %d items from %s", len(items), table.name)
+    return items
+
+
+def _batch_get_chunk(table: Any, keys: List[Dict[str, Any]], projection: Optional[str]) -> List[Dict[str, Any]]:
+    """Fetch one BatchGetItem chunk, retrying UnprocessedKeys with exponential backoff and jitter."""
+    resource = _thread_resource(table)
+    request: Dict[str, Any] = {'Keys': keys}
+    if projection:
+        request['ProjectionExpression'] = projection
+
+    items: List[Dict[str, Any]] = []
+    for attempt in range(BATCH_GET_MAX_ATTEMPTS):
+        response = resource.batch_get_item(RequestItems={table.name: request})
+        items.extend(response.get('Responses', {}).get(table.name, []))
+        unprocessed = response.get('UnprocessedKeys', {}).get(table.name)
+        if not unprocessed:
+            return items
+        request = unprocessed
+        time.sleep(min(2.0, 0.05 * (2 ** attempt)) * random.uniform(0.5, 1.0))
+    raise RuntimeError(
+        f"BatchGetItem on {table.name} left {len(request.get('Keys', []))} keys unprocessed "
+        f"after {BATCH_GET_MAX_ATTEMPTS} attempts"
+    )
+
+
+def batch_get_items(
+    table: Any,
+    keys: Sequence[Dict[str, Any]],
+    projection: Optional[str] = None,
+    max_workers: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """Fetch many items by primary key, in input order, skipping keys that do not exist.
+
+    Keys are de-duplicated and split into BatchGetItem chunks of 100 that run
+    concurrently on the shared pool. A projection must include the key attributes
+    for results to be returned in input order.
+    """
+    unique_keys: Dict[tuple, Dict[str, Any]] = {}
+    for key in keys:
+        unique_keys.setdefault(tuple(sorted(key.items())), dict(key))
+    if not unique_keys:
+        return []
+
+    key_list = list(unique_keys.values())
+    chunks = [key_list[i:i + BATCH_GET_CHUNK_SIZE] for i in range(0, len(key_list), BATCH_GET_CHUNK_SIZE)]
+    workers = min(len(chunks), max_workers or BATCH_GET_MAX_WORKERS)
+    if workers == 1:
+        results = [_batch_get_chunk(table, chunk, projection) for chunk in chunks]
+    else:
+        results = _run_bounded(lambda chunk: _batch_get_chunk(table, chunk, projection), chunks, workers)
+
+    key_names = list(key_list[0].keys())
+    by_key: Dict[tuple, Dict[str, Any]] = {}
+    for item in (item for chunk_items in results for item in chunk_items):
+        by_key[tuple(sorted((name, item.get(name)) for name in key_names))] = item
+    ordered = [by_key.pop(key) for key in unique_keys if key in by_key]
+    # Items whose keys were projected away cannot be matched; keep them rather than drop them
+    ordered.extend(by_key.values())
+    logger.debug("Batch-fetched %d/%d items from %s", len(ordered), len(key_list), table.name)
+    return ordered
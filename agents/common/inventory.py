@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from common.cache import TTLCache
+from common.dynamo import query_all, scan_all
+
+logger = logging.getLogger(__name__)
+
+INVENTORY_TABLE_NAME = 'supplysense-inventory'
+
+# Per-container inventory snapshots; reserve_stock writes invalidate them explicitly.
+_snapshot_cache = TTLCache(
+    maxsize=int(os.environ.get('SUPPLYSENSE_INVENTORY_CACHE_MAX_ENTRIES', '64')),
+    ttl=float(os.environ.get('SUPPLYSENSE_INVENTORY_CACHE_TTL_SECONDS', '30')),
+)
+_version_lock = threading.Lock()
+_snapshot_version = 0
+
+
+def inventory_snapshot_version() -> int:
+    """Monotonic counter bumped whenever cached inventory is invalidated."""
+    return _snapshot_version
+
+
+def invalidate_inventory_snapshot(product_id: Optional[str] = None) -> None:
+    """Drop cached inventory after a write (all snapshots, or those touching one product)."""
+    global _snapshot_version
+    # Bump first: a load that started before the write then sees the new version and is not cached
+    with _version_lock:
+        _snapshot_version += 1
+    if product_id is None:
+        _snapshot_cache.invalidate()
+    else:
+        _snapshot_cache.invalidate_where(lambda key: key[1] in ('ALL', product_id))
+    logger.info("Inventory snapshot invalidated (product=%s)", product_id or "ALL")
+
+
+def _cached_rows(key: Tuple[str, str], loader: Callable[[], List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """Cached rows for key, loading on a miss; a load overtaken by an invalidation is returned but not cached."""
+    rows = _snapshot_cache.get(key)
+    if rows is None:
+        version = _snapshot_version
+        rows = loader()
+        with _version_lock:
+            if _snapshot_version == version:
+                _snapshot_cache.set(key, rows)
+    return rows
+
+
+def get_inventory_snapshot(inventory_table: Any, location_id: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Return every inventory row (optionally for one location) from the cached table snapshot."""
+    items = _cached_rows((inventory_table.name, 'ALL'), lambda: scan_all(inventory_table))
+    # Copies, so callers cannot change the cached rows
+    return [dict(item) for item in items if not location_id or item.get('locationId') == location_id]
+
+
+def get_product_inventory(
+    inventory_table: Any,
+    product_id: str,
+    location_id: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """Return inventory rows for one product, served from the full snapshot when it is warm."""
+    items = _snapshot_cache.get((inventory_table.name, 'ALL'))
+    if items is None:
+        items = _cached_rows(
+            (inventory_table.name, product_id),
+            lambda: query_all(
+                inventory_table,
+                KeyConditionExpression='productId = :productId',
+                ExpressionAttributeValues={':productId': product_id}
+            ),
+        )
+    return [
+        dict(item) for item in items
+        if item.get('productId') == product_id and (not location_id or item.get('locationId') == location_id)
+    ]
+
+
+def inventory_cache_stats() -> Dict[str, Any]:
+    stats = _snapshot_cache.stats()
+    stats['version'] = _snapshot_version
+    return stats
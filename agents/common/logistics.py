@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import logging
+from typing import Any, Dict, List, Optional
+
+from boto3.dynamodb.conditions import Key
+from botocore.exceptions import ClientError
+
+from common.dynamo import query_many, scan_all
+
+logger = logging.getLogger(__name__)
+
+LOGISTICS_TABLE_NAME = 'supplysense-logistics'
+LOGISTICS_ORDER_INDEX = 'orderId-index'
+
+_MISSING_INDEX_ERRORS = {'ValidationException', 'ResourceNotFoundException'}
+
+
+def get_shipments_for_orders(
+    logistics_table: Any,
+    order_ids: List[str],
+    max_workers: Optional[int] = None,
+) -> Dict[str, List[Dict[str, Any]]]:
+    """Return orderId -> shipments for many orders, querying the orderId GSI concurrently.
+
+    Falls back to a single filtered scan while the index is missing or still backfilling.
+    """
+    unique_ids = list(dict.fromkeys(order_id for order_id in order_ids if order_id))
+    if not unique_ids:
+        return {}
+
+    try:
+        results = query_many(
+            logistics_table,
+            [
+                {'IndexName': LOGISTICS_ORDER_INDEX, 'KeyConditionExpression': Key('orderId').eq(order_id)}
+                for order_id in unique_ids
+            ],
+            max_workers=max_workers,
+        )
+        return dict(zip(unique_ids, results))
+    except ClientError as exc:
+        if exc.response.get('Error', {}).get('Code') not in _MISSING_INDEX_ERRORS:
+            raise
+        logger.warning("Logistics orderId index unavailable (%s); falling back to scan", exc)
+
+    wanted = set(unique_ids)
+    shipments: Dict[str, List[Dict[str, Any]]] = {order_id: [] for order_id in unique_ids}
+    for shipment in scan_all(logistics_table):
+        if shipment.get('orderId') in wanted:
+            shipments[shipment['orderId']].append(shipment)
+    return shipments
+
+
+def get_shipments_for_order(logistics_table: Any, order_id: str) -> List[Dict[str, Any]]:
+    """Return the shipments recorded for one order."""
+    return get_shipments_for_orders(logistics_table, [order_id]).get(order_id, [])
@@ -0,0 +1,259 @@
+from __future__ import annotations
+
+import logging
+from typing import Any, Dict, List, Optional
+
+from boto3.dynamodb.conditions import Key
+from botocore.exceptions import ClientError
+
+from common.dynamo import batch_get_items, query_all, query_many, scan_all
+
+logger = logging.getLogger(__name__)
+
+ORDERS_TABLE_NAME = 'supplysense-orders'
+ORDERS_STATUS_INDEX = 'status-orderDate-index'
+PENDING_DEMAND_TABLE_NAME = 'supplysense-pending-demand'
+# One (productId, orderId) row per pending order line, queried per SKU
+PENDING_DEMAND_LINES_TABLE_NAME = 'supplysense-pending-demand-lines'
+# Aggregate row collecting pending orders that carry no line items
+UNRESOLVED_DEMAND_KEY = '#UNRESOLVED'
+# Aggregate row whose orderCount is the number of distinct pending orders
+PENDING_DEMAND_SUMMARY_KEY = '#SUMMARY'
+# Marker row the aggregator writes once a backfill has seeded every pending order
+PENDING_DEMAND_BACKFILL_KEY = '#BACKFILL'
+ORDER_ROLLUP_TABLE_NAME = 'supplysense-order-daily-rollup'
+ROLLUP_ALL = 'ALL'
+PRODUCT_SCOPE_PREFIX = 'PRODUCT#'
+# Marker row the order-rollups consumer writes once a backfill has seeded the rollups and order lines
+ROLLUP_BACKFILL_KEY = {'scope': '#BACKFILL', 'day': '#'}
+ORDER_LINES_TABLE_NAME = 'supplysense-order-lines'
+
+_MISSING_INDEX_ERRORS = {'ValidationException', 'ResourceNotFoundException'}
+
+
+def get_orders_by_ids(orders_table: Any, order_ids: List[str]) -> List[Dict[str, Any]]:
+    """Fetch orders by ID with concurrent BatchGetItem chunks; unknown IDs are skipped."""
+    return batch_get_items(orders_table, [{'orderId': order_id} for order_id in order_ids if order_id])
+
+
+def query_orders_by_status(
+    orders_table: Any,
+    status: str = 'pending',
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    newest_first: bool = False,
+) -> List[Dict[str, Any]]:
+    """Fetch orders with the given status via the status/orderDate GSI.
+
+    Optional ISO-8601 bounds restrict the orderDate range (start inclusive, end exclusive).
+    Falls back to a filtered scan while the index is missing or still backfilling.
+    """
+    key_condition = Key('status').eq(status)
+    if start_date and end_date:
+        # BETWEEN is inclusive on both ends; drop exact end matches below
+        key_condition = key_condition & Key('orderDate').between(start_date, end_date)
+    elif start_date:
+        key_condition = key_condition & Key('orderDate').gte(start_date)
+    elif end_date:
+        key_condition = key_condition & Key('orderDate').lt(end_date)
+
+    try:
+        orders = query_all(
+            orders_table,
+            IndexName=ORDERS_STATUS_INDEX,
+            KeyConditionExpression=key_condition,
+            ScanIndexForward=not newest_first,
+        )
+    except ClientError as exc:
+        if exc.response.get('Error', {}).get('Code') not in _MISSING_INDEX_ERRORS:
+            raise
+        logger.warning("Orders status index unavailable (%s); falling back to scan", exc)
+        orders = scan_all(
+            orders_table,
+            FilterExpression='#status = :status',
+            ExpressionAttributeNames={'#status': 'status'},
+            ExpressionAttributeValues={':status': status},
+        )
+        if start_date:
+            orders = [o for o in orders if str(o.get('orderDate', '')) >= start_date]
+        orders.sort(key=lambda o: str(o.get('orderDate', '')), reverse=newest_first)
+
+    if end_date:
+        orders = [o for o in orders if str(o.get('orderDate', '')) < end_date]
+    return orders
+
+
+def load_pending_demand(dynamodb: Any) -> Optional[Dict[str, Dict[str, Any]]]:
+    """Read the stream-maintained per-SKU pending-demand aggregate.
+
+    Returns productId -> {pendingUnits, pendingValue, orderCount}, including the
+    UNRESOLVED_DEMAND_KEY and PENDING_DEMAND_SUMMARY_KEY rows, or None when the aggregate
+    table is unavailable or has not been backfilled yet (no PENDING_DEMAND_BACKFILL_KEY
+    row), so callers rebuild demand from pending orders instead of trusting a partial
+    aggregate. Use query_pending_order_ids for the orders behind a SKU.
+    """
+    try:
+        rows = scan_all(dynamodb.Table(PENDING_DEMAND_TABLE_NAME))
+    except ClientError as exc:
+        logger.warning("Pending demand aggregate unavailable (%s); rebuilding from orders", exc)
+        return None
+    if not any(row.get('productId') == PENDING_DEMAND_BACKFILL_KEY for row in rows):
+        logger.info("Pending demand aggregate not backfilled yet; rebuilding from orders")
+        return None
+
+    demand: Dict[str, Dict[str, Any]] = {}
+    for row in rows:
+        product_id = row.get('productId')
+        order_count = int(row.get('orderCount') or 0)
+        if not product_id or product_id == PENDING_DEMAND_BACKFILL_KEY or order_count <= 0:
+            continue
+        demand[product_id] = {
+            'pendingUnits': max(int(row.get('pendingUnits') or 0), 0),
+            'pendingValue': max(float(row.get('pendingValue') or 0), 0.0),
+            'orderCount': order_count,
+        }
+    return demand
+
+
+def query_pending_order_ids(dynamodb: Any, product_ids: List[str]) -> Dict[str, List[str]]:
+    """Map each productId (or UNRESOLVED_DEMAND_KEY) to the pending order IDs behind it."""
+    product_ids = list(dict.fromkeys(product_ids))
+    results = query_many(
+        dynamodb.Table(PENDING_DEMAND_LINES_TABLE_NAME),
+        [
+            {'KeyConditionExpression': Key('productId').eq(product_id), 'ProjectionExpression': 'orderId'}
+            for product_id in product_ids
+        ],
+    )
+    return {
+        product_id: sorted(row['orderId'] for row in rows)
+        for product_id, rows in zip(product_ids, results)
+    }
+
+
+def rollups_backfilled(dynamodb: Any) -> bool:
+    """Whether the order-rollups backfill has completed, so the rollups and order lines cover all orders.
+
+    Raises ClientError when the rollup table is unavailable.
+    """
+    marker = dynamodb.Table(ORDER_ROLLUP_TABLE_NAME).get_item(Key=ROLLUP_BACKFILL_KEY).get('Item')
+    return marker is not None
+
+
+def _rollup_key_condition(scope: str, start_day: Optional[str], end_day: Optional[str]) -> Any:
+    key_condition = Key('scope').eq(scope)
+    if start_day and end_day:
+        return key_condition & Key('day').between(start_day, end_day)
+    if start_day:
+        return key_condition & Key('day').gte(start_day)
+    if end_day:
+        return key_condition & Key('day').lte(end_day)
+    return key_condition
+
+
+def _rollup_days(rows: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    rollups: Dict[str, Dict[str, Any]] = {}
+    for row in rows:
+        order_count = int(row.get('orderCount') or 0)
+        if order_count <= 0:
+            continue
+        rollups[row['day']] = {
+            'orderCount': order_count,
+            'units': int(row.get('units') or 0),
+            'value': float(row.get('value') or 0),
+            'productIds': sorted(row.get('productIds') or []),
+        }
+    return rollups
+
+
+def query_daily_rollups(
+    dynamodb: Any,
+    start_day: Optional[str] = None,
+    end_day: Optional[str] = None,
+    product_id: Optional[str] = None,
+) -> Optional[Dict[str, Dict[str, Any]]]:
+    """Read stream-maintained daily order rollups for an inclusive YYYY-MM-DD range.
+
+    Returns day -> {orderCount, units, value, productIds} for all orders, or for orders
+    listing product_id; days without orders are omitted, so an empty result means no demand.
+    Returns None when the rollup table is unavailable or not backfilled yet.
+    """
+    scope = f"{PRODUCT_SCOPE_PREFIX}{product_id}" if product_id else ROLLUP_ALL
+    try:
+        if not rollups_backfilled(dynamodb):
+            logger.info("Order rollups not backfilled yet; falling back to order scans")
+            return None
+        rows = query_all(
+            dynamodb.Table(ORDER_ROLLUP_TABLE_NAME),
+            KeyConditionExpression=_rollup_key_condition(scope, start_day, end_day),
+        )
+    except ClientError as exc:
+        logger.warning("Order rollups unavailable (%s); falling back to order scans", exc)
+        return None
+    return _rollup_days(rows)
+
+
+def query_product_rollups(
+    dynamodb: Any,
+    product_ids: List[str],
+    start_day: Optional[str] = None,
+    end_day: Optional[str] = None,
+) -> Optional[Dict[str, Dict[str, Dict[str, Any]]]]:
+    """Read daily rollups for many products at once, querying their scopes concurrently.
+
+    Returns productId -> day -> rollup row (as query_daily_rollups), or None when the
+    rollup table is unavailable or not backfilled yet.
+    """
+    unique_ids = list(dict.fromkeys(product_id for product_id in product_ids if product_id))
+    if not unique_ids:
+        return {}
+    try:
+        if not rollups_backfilled(dynamodb):
+            logger.info("Order rollups not backfilled yet; falling back to order scans")
+            return None
+        results = query_many(
+            dynamodb.Table(ORDER_ROLLUP_TABLE_NAME),
+            [
+                {'KeyConditionExpression': _rollup_key_condition(f"{PRODUCT_SCOPE_PREFIX}{product_id}", start_day, end_day)}
+                for product_id in unique_ids
+            ],
+        )
+    except ClientError as exc:
+        logger.warning("Order rollups unavailable (%s); falling back to order scans", exc)
+        return None
+    return {product_id: _rollup_days(rows) for product_id, rows in zip(unique_ids, results)}
+
+
+def query_order_lines(
+    dynamodb: Any,
+    product_id: str,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+) -> Optional[List[Dict[str, Any]]]:
+    """Fetch the orders containing product_id from the order-line index, oldest first.
+
+    Optional ISO-8601 bounds restrict orderDate (start inclusive, end exclusive). Each row
+    carries the order's attributes, so it can stand in for the order itself. Returns None
+    when the index table is unavailable or the order-rollups backfill has not seeded it yet.
+    """
+    key_condition = Key('productId').eq(product_id)
+    # lineKey is "<orderDate>#<orderId>"; '#' sorts below every date character
+    if start_date and end_date:
+        key_condition = key_condition & Key('lineKey').between(start_date, end_date)
+    elif start_date:
+        key_condition = key_condition & Key('lineKey').gte(start_date)
+    elif end_date:
+        key_condition = key_condition & Key('lineKey').lt(end_date)
+
+    try:
+        if not rollups_backfilled(dynamodb):
+            logger.info("Order-line index not backfilled yet; falling back to order scans")
+            return None
+        lines = query_all(dynamodb.Table(ORDER_LINES_TABLE_NAME), KeyConditionExpression=key_condition)
+    except ClientError as exc:
+        logger.warning("Order-line index unavailable (%s); falling back to order scans", exc)
+        return None
+
+    if end_date:
+        lines = [line for line in lines if str(line.get('orderDate', '')) < end_date]
+    return lines
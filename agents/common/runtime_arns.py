@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+AGENTS_PARAMETER_PATH = '/supplysense/agents/'
+INVOKE_ARN_SUFFIX = '/invoke-arn'
+# Resolved ARNs are refreshed in the background every TTL/2 and re-read inline once older than the TTL
+RUNTIME_ARN_TTL_SECONDS = float(os.environ.get('SUPPLYSENSE_RUNTIME_ARN_TTL_SECONDS', '120'))
+# An unknown agent type forces a reload at most this often (e.g. just after a new runtime is deployed)
+_MISS_RELOAD_SECONDS = 10.0
+
+
+def _runtime_arn(value: str) -> str:
+    """Strip the /runtime-endpoint/<name> suffix from an endpoint ARN."""
+    return value.split('/runtime-endpoint/')[0] if '/runtime-endpoint/' in value else value
+
+
+class RuntimeArnResolver:
+    """agent type -> runtime ARN, read from every /supplysense/agents/<type>/invoke-arn parameter.
+
+    One paginated GetParametersByPath call loads all agents. After the first load a daemon
+    thread keeps the map fresh, so lookups are served from memory. A failed refresh keeps
+    the previous map.
+    """
+
+    def __init__(self, ssm_client: Any, path: str = AGENTS_PARAMETER_PATH, ttl: Optional[float] = None):
+        self.path = path
+        self.ttl = RUNTIME_ARN_TTL_SECONDS if ttl is None else float(ttl)
+        self._ssm = ssm_client
+        self._arns: Dict[str, str] = {}
+        self._loaded_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._refresher_pid: Optional[int] = None
+
+    def _load(self) -> Dict[str, str]:
+        arns: Dict[str, str] = {}
+        paginator = self._ssm.get_paginator('get_parameters_by_path')
+        for page in paginator.paginate(Path=self.path, Recursive=True):
+            for parameter in page.get('Parameters', []):
+                name = parameter['Name']
+                if name.endswith(INVOKE_ARN_SUFFIX):
+                    agent_type = name[len(self.path):-len(INVOKE_ARN_SUFFIX)].strip('/')
+                    arns[agent_type] = _runtime_arn(parameter['Value'])
+        return arns
+
+    def refresh(self) -> Dict[str, str]:
+        """Reload every runtime ARN now; returns the current map."""
+        with self._lock:
+            try:
+                arns = self._load()
+            except Exception as exc:
+                logger.warning("Unable to refresh runtime ARNs from %s: %s", self.path, exc)
+                # Back off for a full TTL before the next inline attempt
+                self._loaded_at = time.monotonic() if self._arns else self._loaded_at
+                return dict(self._arns)
+            if arns != self._arns:
+                logger.info("Resolved runtime ARNs for %s", sorted(arns))
+            self._arns = arns
+            self._loaded_at = time.monotonic()
+            return dict(arns)
+
+    def _refresh_forever(self) -> None:
+        while True:
+            time.sleep(max(1.0, self.ttl / 2))
+            self.refresh()
+
+    def _ensure_fresh(self) -> None:
+        # Started lazily so forked server workers each run their own refresher
+        if self._refresher_pid != os.getpid():
+            with self._start_lock:
+                if self._refresher_pid != os.getpid():
+                    self._refresher_pid = os.getpid()
+                    threading.Thread(target=self._refresh_forever, name='runtime-arn-refresh', daemon=True).start()
+        if self._loaded_at is None or time.monotonic() - self._loaded_at >= self.ttl:
+            self.refresh()
+
+    def all(self) -> Dict[str, str]:
+        self._ensure_fresh()
+        return dict(self._arns)
+
+    def get(self, agent_type: str) -> Optional[str]:
+        self._ensure_fresh()
+        arn = self._arns.get(agent_type)
+        if arn is None and self._loaded_at is not None and time.monotonic() - self._loaded_at >= _MISS_RELOAD_SECONDS:
+            arn = self.refresh().get(agent_type)
+        return arn
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import logging
+import os
+from typing import Any, Dict, Iterable, Optional
+
+from botocore.exceptions import ClientError
+
+from common.cache import TTLCache
+from common.dynamo import scan_all
+
+logger = logging.getLogger(__name__)
+
+DATA_VERSIONS_TABLE_NAME = 'supplysense-data-versions'
+
+# Versions are re-read at most this often; a change becomes visible within this window
+_versions_cache = TTLCache(
+    maxsize=1,
+    ttl=float(os.environ.get('SUPPLYSENSE_DATA_VERSION_TTL_SECONDS', '2')),
+)
+
+
+def get_data_versions(dynamodb: Any) -> Optional[Dict[str, int]]:
+    """Return table name -> change counter maintained by the stream consumers.
+
+    Returns None when the versions table is unavailable, so callers can skip caching.
+    """
+    def _load() -> Optional[Dict[str, int]]:
+        try:
+            rows = scan_all(dynamodb.Table(DATA_VERSIONS_TABLE_NAME), segments=1)
+        except ClientError as exc:
+            logger.warning("Data versions unavailable (%s); cached results cannot be validated", exc)
+            return None
+        return {row['source']: int(row.get('version') or 0) for row in rows if row.get('source')}
+
+    return _versions_cache.get_or_load('versions', _load)
+
+
+def data_version_token(dynamodb: Any, sources: Iterable[str]) -> Optional[str]:
+    """Combine the versions of the given tables into a cache-key token (tables never changed count as 0)."""
+    versions = get_data_versions(dynamodb)
+    if versions is None:
+        return None
+    return '|'.join(f"{source}:{versions.get(source, 0)}" for source in sorted(set(sources)))
+
+
+def invalidate_data_versions() -> None:
+    """Force the next token lookup to re-read the versions table."""
+    _versions_cache.invalidate()
@@ -3,6 +3,7 @@ from __future__ import annotations
 import json
 import logging
 import os
+import re
 from decimal import Decimal
 from typing import Any, Dict, List
 from datetime import datetime, timedelta
@@ -13,6 +14,9 @@ from strands.models import BedrockModel
 import boto3
 from botocore.exceptions import ClientError
 
+from common.dynamo import query_all, scan_all
+from common.orders import query_daily_rollups, query_order_lines, query_orders_by_status, query_product_rollups
+
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
@@ -184,12 +188,7 @@ def analyze_demand_for_pending_orders() -> str:
         forecast_table = dynamodb.Table('supplysense-demand-forecast')
         
         # Get all pending orders
-        orders_response = orders_table.scan(
-            FilterExpression='#status = :status',
-            ExpressionAttributeNames={'#status': 'status'},
-            ExpressionAttributeValues={':status': 'pending'}
-        )
-        pending_orders = orders_response.get('Items', [])
+        pending_orders = query_orders_by_status(orders_table, 'pending')
         
         if not pending_orders:
             return json.dumps({
@@ -278,27 +277,33 @@ def analyze_demand_for_pending_orders() -> str:
         logger.error(f"Error analyzing demand for pending orders: {str(e)}")
         return json.dumps({"error": f"Failed to analyze demand: {str(e)}"})
 
+def _orders_for_product(product_id: str) -> List[Dict[str, Any]]:
+    """Orders containing a product, from the order-line index once it is backfilled (else a filtered scan)."""
+    orders = query_order_lines(dynamodb, product_id)
+    if orders is not None:
+        return orders
+    return scan_all(
+        dynamodb.Table('supplysense-orders'),
+        FilterExpression='contains(productIds, :productId)',
+        ExpressionAttributeValues={':productId': product_id}
+    )
+
+
 @tool
 def forecast_demand(product_id: str, timeframe: str, include_seasonality: bool = True) -> str:
     """Generate demand forecast for products based on historical data and patterns."""
     try:
-        # Get historical orders data
-        orders_table = dynamodb.Table('supplysense-orders')
         forecast_table = dynamodb.Table('supplysense-demand-forecast')
         
-        # Scan orders for the product
-        orders_response = orders_table.scan(
-            FilterExpression='contains(productIds, :productId)',
-            ExpressionAttributeValues={':productId': product_id}
-        )
-        orders = orders_response.get('Items', [])
+        # Historical orders for the product (order-line index query; scan only if the index is unavailable)
+        orders = _orders_for_product(product_id)
         
         # Get existing forecasts
-        forecast_response = forecast_table.query(
+        existing_forecasts = query_all(
+            forecast_table,
             KeyConditionExpression='productId = :productId',
             ExpressionAttributeValues={':productId': product_id}
         )
-        existing_forecasts = forecast_response.get('Items', [])
         
         # Analyze historical demand
         total_historical_demand = sum(int(order.get('quantity', 0)) for order in orders)
@@ -416,18 +421,19 @@ def forecast_demand(product_id: str, timeframe: str, include_seasonality: bool =
 def analyze_demand_patterns(product_id: str = None, analysis_type: str = "trend") -> str:
     """Analyze historical demand patterns and trends for products."""
     try:
-        orders_table = dynamodb.Table('supplysense-orders')
-        
-        # Get orders data
-        if product_id:
-            response = orders_table.scan(
-                FilterExpression='contains(productIds, :productId)',
-                ExpressionAttributeValues={':productId': product_id}
-            )
+        # Trend analysis only needs per-day totals, which the daily rollups already hold
+        rollups = query_daily_rollups(dynamodb, product_id=product_id) if analysis_type == "trend" else None
+        if rollups:
+            daily_demand = {day: row['units'] for day, row in rollups.items()}
+            return json.dumps(analyze_trend_patterns([], product_id, daily_demand), indent=2)
+        
+        # Get orders data (backfilled rollups with no days mean there are none)
+        if rollups is not None:
+            orders = []
+        elif product_id:
+            orders = _orders_for_product(product_id)
         else:
-            response = orders_table.scan()
-        
-        orders = response.get('Items', [])
+            orders = scan_all(dynamodb.Table('supplysense-orders'))
         
         if not orders:
             return json.dumps({
@@ -457,45 +463,109 @@ def analyze_demand_patterns(product_id: str = None, analysis_type: str = "trend"
             "analysisType": analysis_type
         })
 
+def _parse_window_days(time_window: str, default: int = 7) -> int:
+    """Parse windows such as '7days', '90d', '12weeks' or '3months' into a day count."""
+    match = re.match(r'^\s*(\d+)\s*(d|day|days|w|week|weeks|m|month|months)?\s*$', str(time_window or '').lower())
+    if not match:
+        return default
+    count = int(match.group(1))
+    unit = (match.group(2) or 'd')[0]
+    days = count * {'d': 1, 'w': 7, 'm': 30}[unit]
+    return days if days > 0 else default
+
+
+def _surge_totals_from_rollups(days_back: int) -> Dict[str, Any] | None:
+    """Recent vs. previous window totals from daily rollups (key-range queries, no order scans).
+
+    Returns None when the rollups are unavailable or not backfilled yet, so the caller falls
+    back to scanning orders. Once backfilled, an empty window is zero demand.
+    """
+    today = datetime.now().date()
+    recent_start = (today - timedelta(days=days_back - 1)).isoformat()
+    historical_start = (today - timedelta(days=days_back * 2 - 1)).isoformat()
+
+    rollups = query_daily_rollups(dynamodb, start_day=historical_start)
+    if rollups is None:
+        return None
+
+    totals = {"recentTotal": 0, "historicalTotal": 0, "recentOrderCount": 0, "historicalOrderCount": 0}
+    product_ids: set[str] = set()
+    for day, row in rollups.items():
+        window = "recent" if day >= recent_start else "historical"
+        totals[f"{window}Total"] += row['units']
+        totals[f"{window}OrderCount"] += row['orderCount']
+        product_ids.update(row['productIds'])
+
+    per_product = query_product_rollups(dynamodb, sorted(product_ids), start_day=historical_start)
+    if per_product is None:
+        return None
+
+    product_analysis: Dict[str, Dict[str, int]] = {}
+    for product_id in sorted(product_ids):
+        product_analysis[product_id] = {"recent": 0, "historical": 0}
+        for day, row in per_product.get(product_id, {}).items():
+            product_analysis[product_id]["recent" if day >= recent_start else "historical"] += row['units']
+
+    totals["productAnalysis"] = product_analysis
+    return totals
+
+
+def _surge_totals_from_orders(days_back: int) -> Dict[str, Any]:
+    """Recent vs. previous window totals by scanning orders (used when rollups are unavailable)."""
+    orders_table = dynamodb.Table('supplysense-orders')
+    cutoff_date = (datetime.now() - timedelta(days=days_back)).isoformat()
+    
+    # Get recent orders
+    recent_orders = scan_all(
+        orders_table,
+        FilterExpression='orderDate >= :cutoff',
+        ExpressionAttributeValues={':cutoff': cutoff_date}
+    )
+    
+    # Get historical baseline (previous period)
+    historical_cutoff = (datetime.now() - timedelta(days=days_back * 2)).isoformat()
+    historical_orders = scan_all(
+        orders_table,
+        FilterExpression='orderDate >= :historical_cutoff AND orderDate < :cutoff',
+        ExpressionAttributeValues={
+            ':historical_cutoff': historical_cutoff,
+            ':cutoff': cutoff_date
+        }
+    )
+    
+    # Analyze by product
+    product_analysis: Dict[str, Dict[str, int]] = {}
+    for window, orders in (("recent", recent_orders), ("historical", historical_orders)):
+        for order in orders:
+            for product_id in order.get('productIds', []):
+                if product_id not in product_analysis:
+                    product_analysis[product_id] = {"recent": 0, "historical": 0}
+                product_analysis[product_id][window] += int(order.get('quantity', 0))
+    
+    return {
+        "recentTotal": sum(int(order.get('quantity', 0)) for order in recent_orders),
+        "historicalTotal": sum(int(order.get('quantity', 0)) for order in historical_orders),
+        "recentOrderCount": len(recent_orders),
+        "historicalOrderCount": len(historical_orders),
+        "productAnalysis": product_analysis,
+    }
+
+
 @tool
 def detect_demand_surge(time_window: str = "7days", sensitivity: str = "medium") -> str:
-    """Detect unusual demand patterns and surges in recent orders."""
+    """Detect unusual demand patterns and surges in recent orders. Accepts any window such as '7days', '30days' or '90days'."""
     try:
-        orders_table = dynamodb.Table('supplysense-orders')
-        
         # Calculate time window
-        if time_window == "7days":
-            days_back = 7
-        elif time_window == "14days":
-            days_back = 14
-        elif time_window == "30days":
-            days_back = 30
-        else:
-            days_back = 7
+        days_back = _parse_window_days(time_window)
         
-        cutoff_date = (datetime.now() - timedelta(days=days_back)).isoformat()
-        
-        # Get recent orders
-        response = orders_table.scan(
-            FilterExpression='orderDate >= :cutoff',
-            ExpressionAttributeValues={':cutoff': cutoff_date}
-        )
-        recent_orders = response.get('Items', [])
-        
-        # Get historical baseline (previous period)
-        historical_cutoff = (datetime.now() - timedelta(days=days_back * 2)).isoformat()
-        historical_response = orders_table.scan(
-            FilterExpression='orderDate >= :historical_cutoff AND orderDate < :cutoff',
-            ExpressionAttributeValues={
-                ':historical_cutoff': historical_cutoff,
-                ':cutoff': cutoff_date
-            }
-        )
-        historical_orders = historical_response.get('Items', [])
+        # Daily rollups answer both windows with key-range queries; scan orders only as a fallback
+        totals = _surge_totals_from_rollups(days_back)
+        if totals is None:
+            totals = _surge_totals_from_orders(days_back)
         
         # Calculate demand metrics
-        recent_total = sum(int(order.get('quantity', 0)) for order in recent_orders)
-        historical_total = sum(int(order.get('quantity', 0)) for order in historical_orders)
+        recent_total = totals["recentTotal"]
+        historical_total = totals["historicalTotal"]
         
         recent_avg_daily = recent_total / days_back
         historical_avg_daily = historical_total / days_back if historical_total > 0 else recent_avg_daily
@@ -517,18 +587,7 @@ def detect_demand_surge(time_window: str = "7days", sensitivity: str = "medium")
         surge_detected = surge_percentage > threshold
         
         # Analyze by product
-        product_analysis = {}
-        for order in recent_orders:
-            for product_id in order.get('productIds', []):
-                if product_id not in product_analysis:
-                    product_analysis[product_id] = {"recent": 0, "historical": 0}
-                product_analysis[product_id]["recent"] += int(order.get('quantity', 0))
-        
-        for order in historical_orders:
-            for product_id in order.get('productIds', []):
-                if product_id not in product_analysis:
-                    product_analysis[product_id] = {"recent": 0, "historical": 0}
-                product_analysis[product_id]["historical"] += int(order.get('quantity', 0))
+        product_analysis = totals["productAnalysis"]
         
         # Identify products with surges
         product_surges = []
@@ -567,8 +626,9 @@ def detect_demand_surge(time_window: str = "7days", sensitivity: str = "medium")
                 "historicalAvgDaily": round(historical_avg_daily, 2),
                 "recentTotal": recent_total,
                 "historicalTotal": historical_total,
-                "recentOrderCount": len(recent_orders),
-                "historicalOrderCount": len(historical_orders)
+                "recentOrderCount": totals["recentOrderCount"],
+                "historicalOrderCount": totals["historicalOrderCount"],
+                "windowDays": days_back
             },
             "productSurges": sorted(product_surges, key=lambda x: x["surgePercentage"], reverse=True),
             "recommendations": recommendations,
@@ -586,10 +646,10 @@ def detect_demand_surge(time_window: str = "7days", sensitivity: str = "medium")
         })
 
 # Helper functions for pattern analysis
-def analyze_trend_patterns(orders, product_id):
-    """Analyze trend patterns in demand data."""
+def analyze_trend_patterns(orders, product_id, daily_demand=None):
+    """Analyze trend patterns in demand data (from orders, or precomputed day buckets)."""
     # Group orders by week
-    weekly_demand = {}
+    weekly_demand = dict(daily_demand or {})
     for order in orders:
         order_date = order.get('orderDate', '')
         if order_date:
@@ -12,6 +12,19 @@ from strands.models import BedrockModel
 import boto3
 from botocore.exceptions import ClientError
 
+from common.inventory import (
+    get_inventory_snapshot,
+    get_product_inventory,
+    invalidate_inventory_snapshot,
+)
+from common.orders import (
+    PENDING_DEMAND_SUMMARY_KEY,
+    UNRESOLVED_DEMAND_KEY,
+    load_pending_demand,
+    query_orders_by_status,
+    query_pending_order_ids,
+)
+
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
@@ -271,16 +284,9 @@ def analyze_inventory(location_filter: str = None, include_forecasts: bool = Fal
     try:
         inventory_table = dynamodb.Table('supplysense-inventory')
         
-        # Scan inventory table
-        if location_filter:
-            response = inventory_table.scan(
-                FilterExpression='locationId = :location',
-                ExpressionAttributeValues={':location': location_filter}
-            )
-        else:
-            response = inventory_table.scan()
+        # Read inventory (served from the per-container snapshot when warm)
+        items = get_inventory_snapshot(inventory_table, location_filter)
         
-        items = response.get('Items', [])
         logger.info(
             "Inventory scan returned %d items (location_filter=%s)",
             len(items),
@@ -386,27 +392,51 @@ def analyze_inventory(location_filter: str = None, include_forecasts: bool = Fal
             "status": "error"
         })
 
+def _load_pending_demand() -> tuple[Dict[str, int], int, int, List[str]]:
+    """Return (product demand, pending order count, orders evaluated, orders missing line items)."""
+    aggregate = load_pending_demand(dynamodb)
+    if aggregate is not None:
+        total_orders = aggregate.pop(PENDING_DEMAND_SUMMARY_KEY, {}).get('orderCount', 0)
+        missing: List[str] = []
+        if aggregate.pop(UNRESOLVED_DEMAND_KEY, None):
+            missing = query_pending_order_ids(dynamodb, [UNRESOLVED_DEMAND_KEY])[UNRESOLVED_DEMAND_KEY]
+        product_demand = {product_id: row['pendingUnits'] for product_id, row in aggregate.items()}
+        return product_demand, total_orders, max(total_orders - len(missing), 0), missing
+
+    # Aggregate unavailable: walk every pending order (normalize schema variations)
+    pending_orders = query_orders_by_status(dynamodb.Table('supplysense-orders'), 'pending')
+    product_demand: Dict[str, int] = {}
+    orders_evaluated = 0
+    orders_missing_line_items: List[str] = []
+    for order in pending_orders:
+        order_id = order.get('orderId', 'UNKNOWN')
+        normalized_items = _normalize_order_items(order)
+        if not normalized_items:
+            orders_missing_line_items.append(order_id)
+            continue
+
+        orders_evaluated += 1
+        for item in normalized_items:
+            product_id = item['productId']
+            quantity = max(item['quantity'], 0)
+            product_demand[product_id] = product_demand.get(product_id, 0) + quantity
+    return product_demand, len(pending_orders), orders_evaluated, orders_missing_line_items
+
+
 @tool
 def check_order_fulfillment_capacity() -> str:
     """Check if current inventory can fulfill ALL pending orders. Use this when asked about fulfilling all/multiple orders."""
     try:
         inventory_table = dynamodb.Table('supplysense-inventory')
-        orders_table = dynamodb.Table('supplysense-orders')
         
-        # Get all pending orders
-        orders_response = orders_table.scan(
-            FilterExpression='#status = :status',
-            ExpressionAttributeNames={'#status': 'status'},
-            ExpressionAttributeValues={':status': 'pending'}
-        )
-        pending_orders = orders_response.get('Items', [])
+        # Per-SKU pending demand (stream-maintained aggregate, or rebuilt from orders)
+        product_demand, total_pending_orders, orders_evaluated, orders_missing_line_items = _load_pending_demand()
         
         # Get current inventory
-        inventory_response = inventory_table.scan()
-        inventory_items = inventory_response.get('Items', [])
+        inventory_items = get_inventory_snapshot(inventory_table)
         logger.info(
             "Fulfillment check: %d pending orders, %d inventory rows",
-            len(pending_orders),
+            total_pending_orders,
             len(inventory_items)
         )
 
@@ -414,7 +444,7 @@ def check_order_fulfillment_capacity() -> str:
             return json.dumps({
                 "status": "no_inventory",
                 "message": "No inventory records available",
-                "totalPendingOrders": len(pending_orders)
+                "totalPendingOrders": total_pending_orders
             })
 
         # Aggregate inventory by product
@@ -426,29 +456,12 @@ def check_order_fulfillment_capacity() -> str:
             available = _to_int(item.get('availableStock', 0))
             inventory_by_product[product_id] = inventory_by_product.get(product_id, 0) + max(available, 0)
 
-        # Calculate total demand from orders (normalize schema variations)
-        product_demand: Dict[str, int] = {}
-        orders_evaluated = 0
-        orders_missing_line_items: List[str] = []
-        for order in pending_orders:
-            order_id = order.get('orderId', 'UNKNOWN')
-            normalized_items = _normalize_order_items(order)
-            if not normalized_items:
-                orders_missing_line_items.append(order_id)
-                continue
-
-            orders_evaluated += 1
-            for item in normalized_items:
-                product_id = item['productId']
-                quantity = max(item['quantity'], 0)
-                product_demand[product_id] = product_demand.get(product_id, 0) + quantity
-        
         if not product_demand:
             return json.dumps({
                 "status": "no_demand_data",
                 "message": "Pending orders do not contain line-item details. Unable to calculate fulfillment capacity.",
                 "ordersMissingLineItems": orders_missing_line_items,
-                "totalPendingOrders": len(pending_orders)
+                "totalPendingOrders": total_pending_orders
             })
 
         # Check fulfillment capability
@@ -484,7 +497,7 @@ def check_order_fulfillment_capacity() -> str:
 
         return json.dumps({
             "canFulfillAllOrders": can_fulfill_all,
-            "totalPendingOrders": len(pending_orders),
+            "totalPendingOrders": total_pending_orders,
             "ordersEvaluated": orders_evaluated,
             "ordersMissingLineItems": orders_missing_line_items,
             "uniqueProductsRequested": len(product_demand),
@@ -506,19 +519,8 @@ def check_availability(product_id: str, quantity: int, location_id: str = None)
     try:
         inventory_table = dynamodb.Table('supplysense-inventory')
         
-        if location_id:
-            # Check specific location
-            response = inventory_table.get_item(
-                Key={'productId': product_id, 'locationId': location_id}
-            )
-            items = [response['Item']] if 'Item' in response else []
-        else:
-            # Check all locations for the product
-            response = inventory_table.query(
-                KeyConditionExpression='productId = :productId',
-                ExpressionAttributeValues={':productId': product_id}
-            )
-            items = response.get('Items', [])
+        # Specific location or all locations for the product
+        items = get_product_inventory(inventory_table, product_id, location_id)
         
         if not items:
             return json.dumps({
@@ -626,6 +628,7 @@ def reserve_stock(product_id: str, location_id: str, quantity: int, order_id: st
                 ':timestamp': json.dumps({"timestamp": "now"}, default=str)
             }
         )
+        invalidate_inventory_snapshot(product_id)
         
         result = {
             "success": True,
@@ -13,6 +13,9 @@ from strands.models import BedrockModel
 import boto3
 from botocore.exceptions import ClientError
 
+from common.logistics import get_shipments_for_order, get_shipments_for_orders
+from common.orders import get_orders_by_ids, query_orders_by_status
+
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
@@ -183,12 +186,8 @@ def optimize_routes(order_id: str, urgency: str = "medium", constraints: dict[st
         
         order = order_response['Item']
         
-        # Get existing logistics data
-        logistics_response = logistics_table.scan(
-            FilterExpression='orderId = :orderId',
-            ExpressionAttributeValues={':orderId': order_id}
-        )
-        existing_logistics = logistics_response.get('Items', [])
+        # Get existing logistics data (orderId GSI query)
+        existing_logistics = get_shipments_for_order(logistics_table, order_id)
         
         # Generate route optimization
         optimization_result = generate_route_optimization(order, urgency, constraints, existing_logistics)
@@ -202,6 +201,37 @@ def optimize_routes(order_id: str, urgency: str = "medium", constraints: dict[st
             "orderId": order_id
         })
 
+@tool
+def optimize_routes_batch(order_ids: list[str], urgency: str = "medium", constraints: dict[str, Any] | None = None) -> str:
+    """Optimize delivery routes for many orders at once (bulk route optimization)."""
+    try:
+        orders_table = dynamodb.Table('supplysense-orders')
+        logistics_table = dynamodb.Table('supplysense-logistics')
+        
+        # Batched order fetch plus one concurrent shipment lookup per order
+        orders = get_orders_by_ids(orders_table, order_ids or [])
+        found_ids = {order.get('orderId') for order in orders}
+        shipments_by_order = get_shipments_for_orders(logistics_table, list(found_ids))
+        
+        optimizations = [
+            generate_route_optimization(order, urgency, constraints, shipments_by_order.get(order.get('orderId'), []))
+            for order in orders
+        ]
+        
+        return json.dumps({
+            "totalRequested": len(order_ids or []),
+            "ordersOptimized": len(optimizations),
+            "ordersNotFound": [order_id for order_id in (order_ids or []) if order_id not in found_ids],
+            "optimizations": optimizations
+        }, indent=2)
+        
+    except Exception as e:
+        logger.error(f"Error optimizing routes in batch: {str(e)}")
+        return json.dumps({
+            "error": f"Failed to optimize routes in batch: {str(e)}",
+            "orderIds": order_ids
+        })
+
 @tool
 def analyze_all_pending_orders() -> str:
     """Analyze ALL pending orders for logistics feasibility. Use this when asked about fulfilling all/multiple orders."""
@@ -209,12 +239,7 @@ def analyze_all_pending_orders() -> str:
         orders_table = dynamodb.Table('supplysense-orders')
         
         # Get all pending orders
-        response = orders_table.scan(
-            FilterExpression='#status = :status',
-            ExpressionAttributeNames={'#status': 'status'},
-            ExpressionAttributeValues={':status': 'pending'}
-        )
-        orders = response.get('Items', [])
+        orders = query_orders_by_status(orders_table, 'pending')
         
         if not orders:
             return json.dumps({
@@ -361,12 +386,7 @@ def _fallback_logistics_summary(prompt: str) -> str:
     """
     try:
         pending_orders_table = dynamodb.Table('supplysense-orders')
-        response = pending_orders_table.scan(
-            FilterExpression='#status = :status',
-            ExpressionAttributeNames={'#status': 'status'},
-            ExpressionAttributeValues={':status': 'pending'}
-        )
-        orders = response.get('Items', [])
+        orders = query_orders_by_status(pending_orders_table, 'pending')
         total_orders = len(orders)
         total_items = 0
         orders_missing_line_items: List[str] = []
@@ -423,6 +443,7 @@ Your role is to optimize delivery routes, calculate shipping options, and coordi
 You have access to logistics tools:
 - analyze_all_pending_orders: Analyze logistics for ALL pending orders (USE THIS for "all orders" questions)
 - optimize_routes: Optimize delivery routes for specific orders
+- optimize_routes_batch: Optimize delivery routes for a list of orders in one call
 - calculate_shipping_options: Analyze shipping methods and costs
 
 IMPORTANT - RESPONSE FORMAT:
@@ -453,6 +474,7 @@ Be efficient and practical."""
         tools=[
             analyze_all_pending_orders,
             optimize_routes,
+            optimize_routes_batch,
             calculate_shipping_options,
         ],
         system_prompt=system_prompt
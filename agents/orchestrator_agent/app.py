@@ -1,23 +1,39 @@
 from __future__ import annotations
 
+import asyncio
+import contextvars
+import copy
+import functools
+import hashlib
 import json
 import logging
 import os
 import re
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FuturesTimeoutError
 from datetime import datetime, timezone
 from statistics import mean
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple
 
 import boto3
+from boto3.dynamodb.conditions import Attr, Key
 from bedrock_agentcore import BedrockAgentCoreApp, RequestContext
-from bedrock_agentcore_starter_toolkit.services.runtime import (
-    HttpBedrockAgentCoreClient,
-    generate_session_id,
-)
+from bedrock_agentcore_starter_toolkit.services.runtime import generate_session_id
 from botocore.exceptions import ClientError
 from strands import Agent, tool
 from strands.models import BedrockModel
 
+from common.agentcore_http import AsyncAgentCoreClient, PooledAgentCoreClient
+from common.cache import TTLCache
+from common.dynamo import query_all, scan_all
+from common.orders import get_orders_by_ids, query_orders_by_status
+from common.runtime_arns import RuntimeArnResolver
+from common.versions import data_version_token
+
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
@@ -26,85 +42,296 @@ app = BedrockAgentCoreApp()
 # Initialize AWS clients
 dynamodb = boto3.resource('dynamodb', region_name=os.environ.get('AWS_REGION', 'us-east-1'))
 ssm = boto3.client('ssm', region_name=os.environ.get('AWS_REGION', 'us-east-1'))
-http_client = HttpBedrockAgentCoreClient(os.environ.get('AWS_REGION', 'us-east-1'))
-_runtime_cache: Dict[str, str] = {}
+sns = boto3.client('sns', region_name=os.environ.get('AWS_REGION', 'us-east-1'))
+# Shared keep-alive pool for every runtime invocation (SUPPLYSENSE_AGENTCORE_POOL_SIZE / _MAX_CONCURRENCY)
+http_client = PooledAgentCoreClient(os.environ.get('AWS_REGION', 'us-east-1'))
+# Used by the asyncio request path; the blocking client serves the fulfillment tools
+async_http_client = AsyncAgentCoreClient(http_client.dp_endpoint)
+runtime_arns = RuntimeArnResolver(ssm)
+
+# Specialists without declared inputs run concurrently on a bounded pool; an agent
+# listed here starts once every planned input agent has finished.
+SPECIALIST_MAX_WORKERS = max(1, int(os.environ.get('SUPPLYSENSE_SPECIALIST_WORKERS', '4')))
+SPECIALIST_DEPENDENCIES: Dict[str, Tuple[str, ...]] = {
+    'risk': ('inventory', 'demand', 'logistics'),
+}
+# Opt-in: while the planner LLM runs, start the specialists most likely to be planned
+SPECULATIVE_PREFETCH_ENABLED = os.environ.get('SUPPLYSENSE_SPECULATIVE_PREFETCH', 'false').lower() in ('1', 'true', 'yes')
+SPECULATIVE_MAX_AGENTS = max(1, int(os.environ.get('SUPPLYSENSE_SPECULATIVE_MAX_AGENTS', '2')))
+SPECULATIVE_HISTORY_SIZE = 50
+# Specialist results are cached per agent, normalized query, prompt inputs and the
+# data version of the tables that agent reads
+SPECIALIST_DATA_SOURCES: Dict[str, Tuple[str, ...]] = {
+    'inventory': ('supplysense-inventory', 'supplysense-orders'),
+    'demand': ('supplysense-orders',),
+    'logistics': ('supplysense-logistics', 'supplysense-orders'),
+    'risk': ('supplysense-inventory', 'supplysense-orders', 'supplysense-logistics', 'supplysense-suppliers'),
+}
+# Upper bound (estimated tokens) on the structured data embedded in the synthesis prompt
+SYNTHESIS_CONTEXT_TOKEN_BUDGET = max(200, int(os.environ.get('SUPPLYSENSE_SYNTHESIS_CONTEXT_TOKENS', '2000')))
+# Inter-agent context: key metrics per upstream agent, capped in size
+SPECIALIST_CONTEXT_MAX_CHARS = max(200, int(os.environ.get('SUPPLYSENSE_SPECIALIST_CONTEXT_MAX_CHARS', '1200')))
+SPECIALIST_CONTEXT_MAX_METRICS = 6
+# Per-agent deadline for the specialists fanned out by orchestrate_fulfillment
+FULFILLMENT_AGENT_DEADLINE_SECONDS = float(os.environ.get('SUPPLYSENSE_FULFILLMENT_AGENT_DEADLINE_SECONDS', '45'))
+# End-to-end latency budget per orchestrated request; each stage may use time left over by earlier ones
+REQUEST_BUDGET_SECONDS = float(os.environ.get('SUPPLYSENSE_REQUEST_BUDGET_SECONDS', '120'))
+REQUEST_BUDGET_SHARES: Tuple[Tuple[str, float], ...] = (('planning', 0.15), ('specialists', 0.65), ('synthesis', 0.20))
+# Opt-in: send a second request once a specialist call outlives that agent's recent p95 latency
+HEDGED_REQUESTS_ENABLED = os.environ.get('SUPPLYSENSE_HEDGED_REQUESTS', 'false').lower() in ('1', 'true', 'yes')
+HEDGE_MIN_SAMPLES = 10
+LATENCY_SAMPLE_SIZE = 100
+INVOKE_MAX_WORKERS = max(1, int(os.environ.get('SUPPLYSENSE_INVOKE_WORKERS', '16')))
+# Per-agent circuit breaker: opens when failures (errors, missed deadlines or calls slower
+# than the slow-call threshold) reach the failure rate over the last window of calls
+BREAKER_WINDOW = max(1, int(os.environ.get('SUPPLYSENSE_BREAKER_WINDOW', '20')))
+BREAKER_MIN_CALLS = max(1, int(os.environ.get('SUPPLYSENSE_BREAKER_MIN_CALLS', '5')))
+BREAKER_FAILURE_RATE = float(os.environ.get('SUPPLYSENSE_BREAKER_FAILURE_RATE', '0.5'))
+BREAKER_SLOW_CALL_SECONDS = float(os.environ.get('SUPPLYSENSE_BREAKER_SLOW_CALL_SECONDS', '60'))
+BREAKER_OPEN_SECONDS = float(os.environ.get('SUPPLYSENSE_BREAKER_OPEN_SECONDS', '30'))
 
 # DynamoDB table names
 ACTIONS_TABLE_NAME = os.environ.get('ACTIONS_TABLE_NAME', 'supplysense-actions')
 APPROVALS_TABLE_NAME = os.environ.get('APPROVALS_TABLE_NAME', 'supplysense-approvals')
 
+# Notification drafts are written by a background pool and attached to the persisted
+# action/approval rows; the briefing carries a template draft until then
+NOTIFICATION_DRAFT_WORKERS = max(1, int(os.environ.get('SUPPLYSENSE_NOTIFICATION_DRAFT_WORKERS', '2')))
+NOTIFICATION_ATTACH_ATTEMPTS = 6
+# Attached drafts are announced on the chat stack's event topics (named per account/region
+# unless overridden), since the chat service published the row with the template draft
+ACTION_EVENTS_TOPIC_ARN = os.environ.get('ACTION_EVENTS_TOPIC_ARN')
+APPROVAL_EVENTS_TOPIC_ARN = os.environ.get('APPROVAL_EVENTS_TOPIC_ARN')
+
+
+# Warm, incrementally refreshed view of completed actions / decided approvals.
+# Each refresh queries the status GSIs only for records newer than the last one seen.
+ACTIONS_STATUS_INDEX = 'status-completedAt-index'
+APPROVALS_STATUS_INDEX = 'status-decisionAt-index'
+DECISION_INDEX_REFRESH_SECONDS = float(os.environ.get('DECISION_INDEX_REFRESH_SECONDS', '5'))
+_decision_index_lock = threading.Lock()
+_decision_index: Dict[str, Dict[str, Any]] = {
+    'actions': {'items': {}, 'highWater': '', 'refreshedAt': None, 'matcher': None},
+    'approvals': {'items': {}, 'highWater': '', 'refreshedAt': None, 'matcher': None},
+}
+
+
+def _completed_action_entry(item: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+    description = item.get('description', '')
+    # Create a normalized key from description
+    key = description.lower().strip()
+    # Also track by affected SKUs if available
+    payload = item.get('payload') or {}
+    data = payload.get('data') or {}
+    shortages = data.get('shortages') or []
+    affected_skus = sorted([s.get('productId', '') for s in shortages if s.get('productId')])
+    if affected_skus:
+        key = f"{key}|{','.join(affected_skus)}"
+    return key, {
+        'completedAt': item.get('completedAt'),
+        'completedBy': item.get('completedBy'),
+        'actionId': item.get('actionId'),
+        'sessionId': item.get('sessionId'),
+        'description': description,
+    }
+
+
+def _decided_approval_entry(item: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+    title = item.get('title', '')
+    return title.lower().strip(), {
+        'status': item.get('status'),
+        'decidedAt': item.get('decisionAt'),
+        'decidedBy': item.get('decidedBy'),
+        'approvalId': item.get('approvalId'),
+        'sessionId': item.get('sessionId'),
+        'title': title,
+    }
+
+
+class _DedupMatcher:
+    """Token -> entry inverted index over normalized dedup keys.
+
+    Applies the same rules as the original linear scan -- a key matches when one text
+    contains the other or when they share at least 3 words, and the earliest-inserted
+    match wins -- but only verifies entries that can possibly match:
+      * entries sharing a word with the query (postings lookup; covers the 3-word rule,
+        and any containment where the shorter side has 3+ words, since its interior
+        words are then whole words of the longer side);
+      * keys of at most 2 words, which can sit inside the query without sharing a whole word;
+      * for queries of at most 2 words, entries with a word containing a query word.
+    Entries are append-only, matching the insertion order of the warm index dict.
+    find() takes no lock, so a matcher other threads can see must not be upserted;
+    refreshes upsert into copy() and publish the copy.
+    """
+
+    def __init__(self, key_text: Any):
+        self._key_text = key_text
+        self._positions: Dict[str, int] = {}
+        self._texts: List[str] = []
+        self._infos: List[Dict[str, Any]] = []
+        self._postings: Dict[str, List[int]] = {}
+        self._vocabulary: List[Tuple[str, List[int]]] = []
+        self._short: List[int] = []
+
+    def copy(self) -> '_DedupMatcher':
+        clone = _DedupMatcher(self._key_text)
+        clone._positions = dict(self._positions)
+        clone._texts = list(self._texts)
+        clone._infos = list(self._infos)
+        clone._postings = {token: list(posting) for token, posting in self._postings.items()}
+        clone._vocabulary = [(token, clone._postings[token]) for token, _ in self._vocabulary]
+        clone._short = list(self._short)
+        return clone
+
+    def upsert(self, key: str, info: Dict[str, Any]) -> None:
+        position = self._positions.get(key)
+        if position is not None:
+            self._infos[position] = info
+            return
+        text = self._key_text(key)
+        position = len(self._texts)
+        self._texts.append(text)
+        self._infos.append(info)
+        self._positions[key] = position
+        tokens = set(text.split())
+        if len(text.split()) <= 2:
+            self._short.append(position)
+        for token in tokens:
+            posting = self._postings.get(token)
+            if posting is None:
+                posting = self._postings[token] = []
+                self._vocabulary.append((token, posting))
+            posting.append(position)
+
+    def find(self, query: str) -> Optional[Dict[str, Any]]:
+        if not self._texts:
+            return None
+        if not query:
+            # '' is contained in every key, so the earliest entry matches
+            return self._infos[0]
+
+        query_tokens = query.split()
+        shared: Dict[int, int] = {}
+        for token in set(query_tokens):
+            for position in self._postings.get(token, ()):
+                shared[position] = shared.get(position, 0) + 1
+
+        candidates = set(shared)
+        candidates.update(self._short)
+        if len(query_tokens) <= 2:
+            for token, posting in self._vocabulary:
+                if any(query_token in token for query_token in query_tokens):
+                    candidates.update(posting)
+
+        best: Optional[int] = None
+        for position in candidates:
+            if best is not None and position > best:
+                continue
+            text = self._texts[position]
+            if shared.get(position, 0) >= 3 or text in query or query in text:
+                best = position
+        return self._infos[best] if best is not None else None
+
+
+def _action_match_text(key: str) -> str:
+    return key.split('|')[0] if '|' in key else key
+
+
+def _refresh_decision_index(
+    kind: str,
+    table_name: str,
+    index_name: str,
+    statuses: List[str],
+    sort_attribute: str,
+    to_entry: Any,
+) -> Dict[str, Dict[str, Any]]:
+    """Return the warm index for `kind`, pulling only records newer than its high-water mark.
+
+    The returned dict and the published matcher are replaced (never mutated) on refresh, so
+    callers may iterate or query them freely without the lock.
+    """
+    state = _decision_index[kind]
+    with _decision_index_lock:
+        now = time.monotonic()
+        if state['refreshedAt'] is not None and now - state['refreshedAt'] < DECISION_INDEX_REFRESH_SECONDS:
+            return state['items']
+
+        table = dynamodb.Table(table_name)
+        high_water = state['highWater']
+        matcher = state['matcher']
+        try:
+            new_items: List[Dict[str, Any]] = []
+            for status in statuses:
+                key_condition = Key('status').eq(status)
+                if high_water:
+                    # >= so records sharing the boundary timestamp are not missed; merge is idempotent
+                    key_condition = key_condition & Key(sort_attribute).gte(high_water)
+                new_items.extend(query_all(table, IndexName=index_name, KeyConditionExpression=key_condition))
+            items = dict(state['items'])
+        except ClientError as e:
+            # Index missing or backfilling: rebuild from a full filtered scan
+            logger.warning(f"{index_name} unavailable ({e}); rebuilding {kind} index from scan")
+            new_items = scan_all(
+                table,
+                FilterExpression=Attr('status').is_in(statuses),
+            )
+            items = {}
+            matcher = None
+
+        if matcher is None:
+            matcher = _DedupMatcher(_action_match_text if kind == 'actions' else str)
+        elif new_items:
+            matcher = matcher.copy()
+        new_items.sort(key=lambda item: str(item.get(sort_attribute) or ''))
+        for item in new_items:
+            key, entry = to_entry(item)
+            items[key] = entry
+            matcher.upsert(key, entry)
+            high_water = max(high_water, str(item.get(sort_attribute) or ''))
+
+        state['items'] = items
+        state['matcher'] = matcher
+        state['highWater'] = high_water
+        state['refreshedAt'] = now
+        if new_items:
+            logger.info(f"Decision index '{kind}' merged {len(new_items)} records ({len(items)} total)")
+        return items
+
 
 def _get_completed_actions_global() -> Dict[str, Dict[str, Any]]:
     """
-    Scan DynamoDB for ALL completed actions (global, not session-specific).
+    Look up ALL completed actions (global, not session-specific).
     Returns a dict keyed by action description for easy lookup.
     This ensures any user sees if an action was already taken by anyone.
     """
-    completed = {}
     try:
-        table = dynamodb.Table(ACTIONS_TABLE_NAME)
-        # Scan for all completed actions (use sparingly, consider GSI for production)
-        response = table.scan(
-            FilterExpression='#status = :completed',
-            ExpressionAttributeNames={'#status': 'status'},
-            ExpressionAttributeValues={':completed': 'completed'},
-            Limit=100  # Limit to recent actions
+        return _refresh_decision_index(
+            'actions', ACTIONS_TABLE_NAME, ACTIONS_STATUS_INDEX,
+            ['completed'], 'completedAt', _completed_action_entry,
         )
-        for item in response.get('Items', []):
-            description = item.get('description', '')
-            # Create a normalized key from description
-            key = description.lower().strip()
-            # Also track by affected SKUs if available
-            payload = item.get('payload') or {}
-            data = payload.get('data') or {}
-            shortages = data.get('shortages') or []
-            affected_skus = sorted([s.get('productId', '') for s in shortages if s.get('productId')])
-            if affected_skus:
-                key = f"{key}|{','.join(affected_skus)}"
-            
-            completed[key] = {
-                'completedAt': item.get('completedAt'),
-                'completedBy': item.get('completedBy'),
-                'actionId': item.get('actionId'),
-                'sessionId': item.get('sessionId'),
-                'description': description,
-            }
-        logger.info(f"Found {len(completed)} completed actions globally")
     except Exception as e:
         logger.warning(f"Failed to query completed actions: {e}")
-    return completed
+        return _decision_index['actions']['items']
 
 
 def _get_decided_approvals_global() -> Dict[str, Dict[str, Any]]:
     """
-    Scan DynamoDB for ALL decided approvals (global, not session-specific).
+    Look up ALL decided approvals (global, not session-specific).
     Returns a dict keyed by approval title for easy lookup.
     """
-    decided = {}
     try:
-        table = dynamodb.Table(APPROVALS_TABLE_NAME)
-        # Scan for all decided approvals
-        response = table.scan(
-            FilterExpression='#status IN (:approved, :rejected)',
-            ExpressionAttributeNames={'#status': 'status'},
-            ExpressionAttributeValues={':approved': 'approved', ':rejected': 'rejected'},
-            Limit=100
+        return _refresh_decision_index(
+            'approvals', APPROVALS_TABLE_NAME, APPROVALS_STATUS_INDEX,
+            ['approved', 'rejected'], 'decisionAt', _decided_approval_entry,
         )
-        for item in response.get('Items', []):
-            title = item.get('title', '')
-            key = title.lower().strip()
-            decided[key] = {
-                'status': item.get('status'),
-                'decidedAt': item.get('decisionAt'),
-                'decidedBy': item.get('decidedBy'),
-                'approvalId': item.get('approvalId'),
-                'sessionId': item.get('sessionId'),
-                'title': title,
-            }
-        logger.info(f"Found {len(decided)} decided approvals globally")
     except Exception as e:
         logger.warning(f"Failed to query decided approvals: {e}")
-    return decided
+        return _decision_index['approvals']['items']
+
+
+def _get_decision_matcher(kind: str) -> Optional[_DedupMatcher]:
+    """Inverted index built alongside the warm decision index ('actions' or 'approvals')."""
+    return _decision_index[kind]['matcher']
 
 
 def _safe_json_loads(value: str) -> Any:
@@ -283,84 +510,184 @@ def _build_risk_overview(
     return ' '.join(parts).strip()
 
 
-def _synthesize_summary_with_llm(user_question: str, agent_findings: List[Dict[str, Any]], risk_level: str) -> str:
-    """Use LLM to synthesize agent findings into a direct answer to the user's question."""
-    logger.info("=" * 60)
-    logger.info("SYNTHESIZE SUMMARY - Starting LLM synthesis")
-    logger.info(f"User question: {user_question}")
-    logger.info(f"Number of agent findings: {len(agent_findings)}")
-    logger.info(f"Risk level: {risk_level}")
-    
-    try:
-        # Build context from all agent findings
-        findings_context = []
-        for finding in agent_findings:
-            agent_type = finding.get('agent', 'unknown')
-            summary = finding.get('summary', '')
-            status = finding.get('status', '')
-            insights = finding.get('insights', {})
-            overview = insights.get('overview', '')
-            blockers = insights.get('blockers', [])
-            recommendations = insights.get('recommendations', [])
-            
-            logger.info(f"Agent {agent_type}: status={status}, summary_len={len(summary)}, overview_len={len(overview) if overview else 0}")
-            
-            agent_context = f"**{agent_type.upper()} AGENT:**\n"
-            agent_context += f"Status: {status}\n"
-            if summary:
-                agent_context += f"Summary: {summary}\n"
-            if overview:
-                agent_context += f"Detailed Analysis: {overview}\n"
-            if blockers:
-                agent_context += f"Blockers: {', '.join(str(b) for b in blockers)}\n"
-            if recommendations:
-                agent_context += f"Recommendations: {', '.join(str(r) for r in recommendations)}\n"
-            findings_context.append(agent_context)
-        
-        all_findings = "\n".join(findings_context)
-        logger.info(f"Total findings context length: {len(all_findings)}")
-        
-        prompt = f"""You are a supply chain analyst. The user asked: "{user_question}"
+def _strip_reasoning_tags(text: str) -> str:
+    clean_text = re.sub(r'<(thinking|analysis|response)>.*?</\1>', '', text, flags=re.DOTALL | re.IGNORECASE).strip()
+    return re.sub(r'</?(thinking|analysis|response)>', '', clean_text, flags=re.IGNORECASE).strip()
 
-Based on the following findings from multiple specialist agents, provide a DIRECT answer to the user's question.
 
-{all_findings}
+def _template_narrative(fused: Dict[str, Any]) -> str:
+    """Deterministic executive briefing built from the fused response."""
+    lines = [fused.get('summary') or 'Multi-agent analysis complete.', '']
+    for finding in fused.get('agentFindings') or []:
+        agent_type = str(finding.get('agent') or 'agent').capitalize()
+        lines.append(f"- {agent_type}: {finding.get('summary') or finding.get('status') or 'No findings.'}")
+    next_steps = fused.get('nextSteps') or []
+    if next_steps:
+        lines.extend(['', 'Next steps:'])
+        lines.extend(f"- {step}" for step in next_steps)
+    return '\n'.join(lines).strip()
 
-Overall Risk Level: {risk_level}
 
-CRITICAL INSTRUCTIONS:
-1. READ THE AGENT FINDINGS CAREFULLY - they contain the actual data
-2. Start with a direct answer to the question (Yes/No if applicable, or the specific information requested)
-3. Include specific numbers, SKU IDs, and quantities EXACTLY as stated in the agent findings
-4. If agents report shortages or stockouts, you MUST mention them - do NOT say "no stockouts" if agents report shortages
-5. Keep the response concise (3-5 sentences) but comprehensive
-6. Do NOT contradict the agent findings - if inventory agent says there are shortages, there ARE shortages
+# Successively tighter (list cap, string cap) limits tried until the context fits its budget
+_CONTEXT_COMPACTION_LEVELS: Tuple[Tuple[int, int], ...] = ((8, 600), (5, 320), (3, 200), (2, 120), (1, 80))
 
-Respond with ONLY the summary paragraph, no JSON or formatting."""
 
-        logger.info("Calling _agent_narrative for synthesis...")
-        response = _agent_narrative(prompt)
-        text = response.message["content"][0]["text"]
-        logger.info(f"Raw LLM response length: {len(text)}")
-        logger.info(f"Raw LLM response preview: {text[:300]}...")
-        
-        # Clean up the response
-        clean_text = re.sub(r'<(thinking|analysis|response)>.*?</\1>', '', text, flags=re.DOTALL | re.IGNORECASE).strip()
-        clean_text = re.sub(r'</?(thinking|analysis|response)>', '', clean_text, flags=re.IGNORECASE).strip()
-        
-        logger.info(f"Cleaned LLM response length: {len(clean_text)}")
-        
-        if clean_text and len(clean_text) > 20:
-            logger.info(f"SYNTHESIZE SUMMARY - Success: {clean_text[:200]}...")
-            return clean_text
-        else:
-            logger.warning(f"SYNTHESIZE SUMMARY - Response too short or empty: '{clean_text}'")
-        
-    except Exception as e:
-        logger.error(f"SYNTHESIZE SUMMARY - Failed: {e}", exc_info=True)
-    
-    logger.warning("SYNTHESIZE SUMMARY - Falling back to static summary")
-    return ""  # Return empty string to fall back to static summary
+def _estimate_tokens(text: str) -> int:
+    # ~4 characters per token for English prose and JSON
+    return (len(text) + 3) // 4
+
+
+def _clip(value: Any, max_chars: int) -> str:
+    text = ' '.join(str(value).split())
+    return text if len(text) <= max_chars else text[:max_chars - 3].rstrip() + '...'
+
+
+def _compact_briefing_context(fused: Dict[str, Any], max_tokens: Optional[int] = None) -> str:
+    """Serialize only what the summary/narrative need, deduping metrics and fitting a token budget.
+
+    Raw specialist responses, events and action payloads are left out; lists and strings are
+    capped progressively, then whole sections dropped, until the JSON fits max_tokens.
+    """
+    budget = SYNTHESIS_CONTEXT_TOKEN_BUDGET if max_tokens is None else max_tokens
+    decision = fused.get('decision') or {}
+
+    def _build(list_cap: int, text_cap: int) -> Dict[str, Any]:
+        seen_metrics: set = set()
+        findings = []
+        for finding in fused.get('agentFindings') or []:
+            metrics = []
+            for metric in (finding.get('insights') or {}).get('metrics') or []:
+                key = ' '.join(str(metric).lower().split()).strip(' •-')
+                if key and key not in seen_metrics:
+                    seen_metrics.add(key)
+                    metrics.append(_clip(metric, text_cap))
+            findings.append({
+                'agent': finding.get('agent'),
+                'status': finding.get('status'),
+                'summary': _clip(finding.get('summary') or '', text_cap),
+                'metrics': metrics[:list_cap],
+                'blockers': [_clip(b, text_cap) for b in (finding.get('blockers') or [])[:list_cap]],
+                'recommendations': [_clip(r, text_cap) for r in (finding.get('recommendations') or [])[:list_cap]],
+            })
+        return {
+            'queryType': fused.get('queryType') or (fused.get('analysis') or {}).get('type'),
+            'draftSummary': _clip(fused.get('summary') or '', text_cap * 2),
+            'decision': {
+                'status': decision.get('status'),
+                'canFulfill': decision.get('canFulfill'),
+                'riskLevel': decision.get('riskLevel'),
+                'confidence': decision.get('confidence'),
+                'blockers': [_clip(b, text_cap) for b in (decision.get('blockers') or [])[:list_cap]],
+            },
+            'riskScore': fused.get('riskScore'),
+            'riskSignals': [_clip(r, text_cap) for r in (fused.get('riskSignals') or [])[:list_cap]],
+            'agentFindings': findings,
+            'actions': [
+                _clip(action.get('title') or action.get('description') or '', text_cap)
+                for action in (fused.get('actions') or [])[:list_cap]
+            ],
+            'approvals': [
+                _clip(approval.get('title') or approval.get('description') or '', text_cap)
+                for approval in (fused.get('approvals') or [])[:list_cap]
+            ],
+            'nextSteps': [_clip(step, text_cap) for step in (fused.get('nextSteps') or [])[:list_cap]],
+            'degradedAgents': fused.get('degradedAgents') or [],
+            'staleAgents': fused.get('staleAgents') or [],
+        }
+
+    context: Dict[str, Any] = {}
+    for list_cap, text_cap in _CONTEXT_COMPACTION_LEVELS:
+        context = _build(list_cap, text_cap)
+        text = json.dumps(context, separators=(',', ':'), default=str)
+        if _estimate_tokens(text) <= budget:
+            return text
+
+    # Still too large: drop whole sections, least useful first, so the result stays valid JSON
+    for context in _reduced_briefing_contexts(context):
+        text = json.dumps(context, separators=(',', ':'), default=str)
+        if _estimate_tokens(text) <= budget:
+            return text
+    logger.warning("Briefing context still ~%d tokens with only its core fields; budget is %d", _estimate_tokens(text), budget)
+    return text
+
+
+def _reduced_briefing_contexts(context: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """Yield ever smaller copies of a compacted briefing context, ending with its core fields."""
+    context = copy.deepcopy(context)
+    findings = context.get('agentFindings') or []
+    # Findings after the first, then every finding's detail lists
+    for keep in range(len(findings) - 1, 0, -1):
+        context['agentFindings'] = findings[:keep]
+        yield copy.deepcopy(context)
+    for field in ('recommendations', 'blockers', 'metrics'):
+        for finding in context['agentFindings']:
+            finding.pop(field, None)
+        yield copy.deepcopy(context)
+    for section in ('staleAgents', 'nextSteps', 'approvals', 'actions', 'riskSignals'):
+        context.pop(section, None)
+        yield copy.deepcopy(context)
+    (context.get('decision') or {}).pop('blockers', None)
+    for finding in context['agentFindings']:
+        finding.pop('summary', None)
+    yield copy.deepcopy(context)
+    context['draftSummary'] = _clip(context.get('draftSummary') or '', 80)
+    yield context
+
+
+def _generate_briefing_with_llm(fused: Dict[str, Any], user_question: str) -> Dict[str, str]:
+    """One structured generation returning the direct-answer summary and the executive narrative."""
+    prompt = (
+        "You are the SupplySense Orchestrator Agent. The user asked: \"{question}\"\n\n"
+        "Using the structured decision data below, produce both parts of the answer in one response:\n"
+        "1. summary: a DIRECT answer to the user's question in 3-5 sentences. Start with the direct answer "
+        "(Yes/No if applicable, or the specific information requested). Include specific numbers, SKU IDs, and "
+        "quantities EXACTLY as stated in the agent findings. If agents report shortages or stockouts, you MUST "
+        "mention them. Do NOT contradict the agent findings.\n"
+        "2. narrative: a concise executive briefing with a leading statement, bullet summaries per agent, "
+        "and clear next steps. Stay factual and action-oriented.\n\n"
+        "Respond ONLY with JSON, no markdown or code fences:\n"
+        '{{"summary": "...", "narrative": "..."}}\n\n'
+        "Structured data:\n{data}"
+    ).format(question=user_question, data=_compact_briefing_context(fused))
+
+    response = _worker_agent('narrative')(prompt)
+    text = _strip_reasoning_tags(response.message["content"][0]["text"])
+    if text.startswith("```"):
+        text = "\n".join(line for line in text.splitlines() if not line.strip().startswith("```")).strip()
+    parsed = _safe_json_loads(text)
+    if not isinstance(parsed, dict):
+        raise ValueError("Synthesis response was not a JSON object")
+    return {
+        'summary': str(parsed.get('summary') or '').strip(),
+        'narrative': str(parsed.get('narrative') or '').strip(),
+    }
+
+
+async def _synthesize_briefing(fused: Dict[str, Any], user_question: str, timeout: Optional[float] = None) -> Dict[str, Any]:
+    """Attach summary and narrative to a fused response, falling back to templates per field.
+
+    The fused summary built by _build_fused_response is the summary template. The Bedrock
+    call runs on the invoke pool; the event loop only awaits it.
+    """
+    generated: Dict[str, str] = {}
+    if user_question and fused.get('agentFindings'):
+        try:
+            generated = await asyncio.wait_for(_offload(_generate_briefing_with_llm, fused, user_question), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Briefing synthesis exceeded its %.1fs budget; using templates", timeout or 0.0)
+        except Exception as exc:
+            logger.error("Briefing synthesis failed: %s", exc, exc_info=True)
+
+    summary = generated.get('summary', '')
+    narrative = generated.get('narrative', '')
+    if len(summary) > 20:
+        fused['summary'] = summary
+    fused['narrative'] = narrative or _template_narrative(fused)
+    fused['synthesis'] = {
+        'summary': 'llm' if len(summary) > 20 else 'template',
+        'narrative': 'llm' if narrative else 'template',
+    }
+    return fused
 
 
 def _build_fused_response(payload: Dict[str, Any]) -> Dict[str, Any]:
@@ -850,7 +1177,9 @@ def _build_fused_response(payload: Dict[str, Any]) -> Dict[str, Any]:
     # Check for already-completed actions and decided approvals (GLOBAL - not session-specific)
     # This ensures any user sees if an action was already taken by anyone
     completed_actions = _get_completed_actions_global()
-    decided_approvals = _get_decided_approvals_global()
+    _get_decided_approvals_global()
+    action_matcher = _get_decision_matcher('actions')
+    approval_matcher = _get_decision_matcher('approvals')
     
     def _is_action_completed(description: str, affected_skus: List[str] = None) -> Optional[Dict[str, Any]]:
         """Check if an action with this description was already completed."""
@@ -872,29 +1201,13 @@ def _build_fused_response(payload: Dict[str, Any]) -> Dict[str, Any]:
         if desc_lower in completed_actions:
             return completed_actions[desc_lower]
         
-        # Fuzzy match on description
-        for key, info in completed_actions.items():
-            key_desc = key.split('|')[0] if '|' in key else key
-            # Check if key words overlap significantly
-            if key_desc in desc_lower or desc_lower in key_desc:
-                return info
-            key_words = set(key_desc.split())
-            desc_words = set(desc_lower.split())
-            if len(key_words & desc_words) >= 3:  # At least 3 words in common
-                return info
-        return None
+        # Fuzzy match on description (substring either way, or at least 3 words in common)
+        return action_matcher.find(desc_lower) if action_matcher else None
     
     def _is_approval_decided(title: str) -> Optional[Dict[str, Any]]:
         """Check if an approval with this title was already decided."""
         title_lower = title.lower()
-        for key, info in decided_approvals.items():
-            if key in title_lower or title_lower in key:
-                return info
-            key_words = set(key.split())
-            title_words = set(title_lower.split())
-            if len(key_words & title_words) >= 3:
-                return info
-        return None
+        return approval_matcher.find(title_lower) if approval_matcher else None
     
     def _add_action_if_not_completed(action: Dict[str, Any]) -> None:
         """Add action to list, or mark as already completed if it was done before."""
@@ -1051,12 +1364,12 @@ def _build_fused_response(payload: Dict[str, Any]) -> Dict[str, Any]:
             'data': replenishment_details,
         }
         
-        # Generate notification draft in the orchestrator
-        notification = _generate_notification_draft(action, 'action')
-        if notification:
-            action['notification'] = notification
-        
         _add_action_if_not_completed(action)
+        if action['status'] != 'already_completed':
+            # Stored rows are keyed by action ID, so repeat answers in a session each get their own row
+            action['id'] = f"{action['id']}-{uuid.uuid4().hex[:12]}"
+            # Template draft now; the LLM draft is attached to the stored action when ready
+            action['notification'], action['notificationSource'] = _queue_notification_draft(action, 'action', session_id)
     
     # Expedite assessment actions
     elif 'expedite' in query_type:
@@ -1434,13 +1747,6 @@ def _build_fused_response(payload: Dict[str, Any]) -> Dict[str, Any]:
     if not any('monitor' in step.lower() for step in next_steps):
         next_steps.append('Monitor progress and update stakeholders as needed.')
 
-    # Use LLM to synthesize a direct answer to the user's question
-    if user_query and agent_findings:
-        llm_summary = _synthesize_summary_with_llm(user_query, agent_findings, risk_level_label)
-        if llm_summary:
-            summary = llm_summary
-            logger.info("Using LLM-synthesized summary: %s", summary[:100])
-
     return {
         'summary': summary,
         'decision': decision,
@@ -2071,48 +2377,398 @@ def structure_agent_response(agent_type: str, response_text: str) -> Dict[str, A
 
 
 def _get_runtime_arn(agent_type: str) -> Optional[str]:
-    if agent_type in _runtime_cache:
-        return _runtime_cache[agent_type]
-    param_name = f'/supplysense/agents/{agent_type}/invoke-arn'
-    try:
-        response = ssm.get_parameter(Name=param_name)
-        value = response['Parameter']['Value']
-        runtime_arn = value.split('/runtime-endpoint/')[0] if '/runtime-endpoint/' in value else value
-        _runtime_cache[agent_type] = runtime_arn
-        return runtime_arn
-    except Exception as exc:
-        logger.warning("Unable to resolve runtime ARN for %s: %s", agent_type, exc)
+    runtime_arn = runtime_arns.get(agent_type)
+    if not runtime_arn:
+        logger.warning("Unable to resolve runtime ARN for %s", agent_type)
+    return runtime_arn
+
+
+class SpecialistDeadlineExceeded(TimeoutError):
+    """A specialist did not answer within its share of the request budget."""
+
+    def __init__(self, agent_type: str, timeout: float):
+        super().__init__(f"{agent_type} agent missed its {timeout:.1f}s deadline")
+        self.agent_type = agent_type
+        self.timeout = timeout
+
+
+class _RequestBudget:
+    """Latency budget for one orchestrated request, split across planning, specialists and synthesis."""
+
+    def __init__(self, total_seconds: Optional[float] = None):
+        self.total = REQUEST_BUDGET_SECONDS if total_seconds is None else float(total_seconds)
+        self.started = time.monotonic()
+
+    def stage_deadline(self, stage: str) -> float:
+        share = 0.0
+        for name, fraction in REQUEST_BUDGET_SHARES:
+            share += fraction
+            if name == stage:
+                break
+        return self.started + self.total * share
+
+    def remaining(self, stage: str) -> float:
+        return max(0.0, self.stage_deadline(stage) - time.monotonic())
+
+    def specialist_timeout(self, level: int, depth: int) -> float:
+        """Split the specialists stage evenly across the DAG levels still to run."""
+        return self.remaining('specialists') / max(1, depth - level)
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+
+_invoke_pool = ThreadPoolExecutor(max_workers=INVOKE_MAX_WORKERS, thread_name_prefix='invoke')
+# Runtime attempts (including abandoned hedges) run on their own pool so they never starve _offload
+_attempt_pool = ThreadPoolExecutor(max_workers=INVOKE_MAX_WORKERS, thread_name_prefix='runtime-attempt')
+# Specialists fanned out by orchestrate_fulfillment, which may itself run on _invoke_pool
+_fulfillment_pool = ThreadPoolExecutor(max_workers=INVOKE_MAX_WORKERS, thread_name_prefix='fulfillment')
+# Bearer token of the request being served, for tools the model calls outside the orchestrated flow
+_request_bearer_token: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar('request_bearer_token', default=None)
+_latency_lock = threading.Lock()
+_latency_samples: Dict[str, deque] = {}
+
+
+class _CircuitBreaker:
+    """Closed -> open on failure rate over a sliding window; open -> half-open after a cool-down,
+    where one probe call decides between closed and open again."""
+
+    def __init__(self, agent_type: str):
+        self.agent_type = agent_type
+        self.state = 'closed'
+        self._lock = threading.Lock()
+        self._outcomes: deque = deque(maxlen=BREAKER_WINDOW)
+        self._opened_at = 0.0
+        self._probing = False
+        self.trips = 0
+
+    def allow(self) -> bool:
+        """Whether a call may go to the runtime now; in half-open only one probe is let through."""
+        with self._lock:
+            if self.state == 'open' and time.monotonic() - self._opened_at >= BREAKER_OPEN_SECONDS:
+                self.state = 'half_open'
+                self._probing = False
+            if self.state == 'closed':
+                return True
+            if self.state == 'half_open' and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record(self, ok: bool, seconds: float) -> None:
+        failed = not ok or seconds >= BREAKER_SLOW_CALL_SECONDS
+        with self._lock:
+            if self.state == 'half_open':
+                self._probing = False
+                if failed:
+                    self._trip()
+                else:
+                    logger.info("Circuit for %s agent closed after a successful probe", self.agent_type)
+                    self.state = 'closed'
+                    self._outcomes.clear()
+                return
+            self._outcomes.append(failed)
+            if (
+                self.state == 'closed'
+                and len(self._outcomes) >= BREAKER_MIN_CALLS
+                and sum(self._outcomes) / len(self._outcomes) >= BREAKER_FAILURE_RATE
+            ):
+                self._trip()
+
+    def release(self) -> None:
+        """Give up a probe slot without an outcome (the call was cancelled)."""
+        with self._lock:
+            self._probing = False
+
+    def _trip(self) -> None:
+        logger.warning("Circuit for %s agent opened; failing fast for %.0fs", self.agent_type, BREAKER_OPEN_SECONDS)
+        self.state = 'open'
+        self._opened_at = time.monotonic()
+        self._outcomes.clear()
+        self.trips += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {'state': self.state, 'trips': self.trips}
+
+
+_breakers_lock = threading.Lock()
+_breakers: Dict[str, _CircuitBreaker] = {}
+_last_good_results: Dict[str, Dict[str, Any]] = {}
+
+
+def _breaker(agent_type: str) -> _CircuitBreaker:
+    with _breakers_lock:
+        if agent_type not in _breakers:
+            _breakers[agent_type] = _CircuitBreaker(agent_type)
+        return _breakers[agent_type]
+
+
+def _remember_good_result(agent_type: str, result: Dict[str, Any]) -> None:
+    with _breakers_lock:
+        _last_good_results[agent_type] = copy.deepcopy(result)
+
+
+def _circuit_open_result(agent_type: str) -> Dict[str, Any]:
+    """Last successful result for the agent, marked stale, or an error stub when there is none."""
+    with _breakers_lock:
+        last_good = copy.deepcopy(_last_good_results.get(agent_type))
+    if not last_good:
+        logger.warning("Circuit for %s agent is open and no earlier result exists", agent_type)
+        return _specialist_error(
+            agent_type,
+            f'{agent_type} agent circuit open',
+            f'{agent_type.capitalize()} agent is temporarily unavailable (circuit open).',
+            ['Specialist runtime is failing; calls are paused while it recovers'],
+        )
+    logger.info("Circuit for %s agent is open; serving last good result from %s", agent_type, last_good.get('timestamp'))
+    structured = last_good.get('structured') or {}
+    structured['stale'] = True
+    structured['summary'] = f"(Stale result from {last_good.get('timestamp')}) {structured.get('summary') or ''}".strip()
+    last_good['structured'] = structured
+    last_good['stale'] = True
+    last_good['staleAsOf'] = last_good.get('timestamp')
+    last_good['timestamp'] = datetime.now(timezone.utc).isoformat() + 'Z'
+    return last_good
+
+
+def _record_latency(agent_type: str, seconds: float) -> None:
+    with _latency_lock:
+        _latency_samples.setdefault(agent_type, deque(maxlen=LATENCY_SAMPLE_SIZE)).append(seconds)
+
+
+def _latency_p95(agent_type: str) -> Optional[float]:
+    with _latency_lock:
+        samples = sorted(_latency_samples.get(agent_type) or ())
+    if len(samples) < HEDGE_MIN_SAMPLES:
         return None
+    return samples[int(0.95 * (len(samples) - 1))]
 
 
-def _invoke_specialist(
+def _call_runtime(
     agent_type: str,
-    query: str,
+    runtime_arn: str,
+    payload: Dict[str, Any],
     session_id: str,
-    context: Dict[str, Any],
-    bearer_token: Optional[str] = None,
-) -> Optional[Dict[str, Any]]:
-    runtime_arn = _get_runtime_arn(agent_type)
-    if not runtime_arn:
+    bearer_token: str,
+    timeout: Optional[float] = None,
+) -> Dict[str, Any]:
+    """Invoke a runtime within timeout seconds, hedging with a second request once the agent's p95 has passed.
+
+    Raises SpecialistDeadlineExceeded when no attempt answers in time. Abandoned attempts run on
+    their own pool and give up at the deadline: each HTTP call gets the time left as a total
+    bound, and the client aborts the response once it passes, however much data still arrives.
+    """
+    started = time.monotonic()
+    deadline = started + timeout if timeout is not None else None
+
+    def _call(call_session_id: str) -> Dict[str, Any]:
+        remaining = max(0.1, deadline - time.monotonic()) if deadline is not None else None
+        return http_client.invoke_endpoint(
+            runtime_arn, payload, call_session_id, bearer_token, endpoint_name='DEFAULT', timeout=remaining,
+        )
+
+    p95 = _latency_p95(agent_type) if HEDGED_REQUESTS_ENABLED else None
+    if timeout is None and p95 is None:
+        result = _call(session_id)
+        _record_latency(agent_type, time.monotonic() - started)
+        return result
+
+    hedge_at = started + p95 if p95 is not None else None
+    pending = {_attempt_pool.submit(_call, session_id)}
+    errors: List[Exception] = []
+    while pending:
+        now = time.monotonic()
+        if deadline is not None and now >= deadline:
+            break
+        wake_times = [t for t in (deadline, hedge_at) if t is not None]
+        done, pending = wait(
+            pending,
+            timeout=max(0.0, min(wake_times) - now) if wake_times else None,
+            return_when=FIRST_COMPLETED,
+        )
+        for future in done:
+            try:
+                result = future.result()
+            except Exception as exc:
+                errors.append(exc)
+                continue
+            _record_latency(agent_type, time.monotonic() - started)
+            for straggler in pending:
+                straggler.cancel()
+            return result
+        if hedge_at is not None and pending and time.monotonic() >= hedge_at:
+            logger.info("Hedging %s request after %.1fs (p95)", agent_type, p95)
+            # Separate session so the hedge is not serialized behind the first attempt
+            pending.add(_attempt_pool.submit(_call, generate_session_id()))
+            hedge_at = None
+
+    # An attempt timing out on its own capped timeout is still a missed deadline
+    if errors and not pending and (deadline is None or time.monotonic() < deadline):
+        raise errors[0]
+    raise SpecialistDeadlineExceeded(agent_type, timeout or 0.0)
+
+
+async def _offload(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Run a blocking boto3/Bedrock call on the invoke pool without blocking the event loop.
+
+    The call runs in a copy of the caller's context, so request context variables carry over.
+    """
+    call = functools.partial(contextvars.copy_context().run, func, *args, **kwargs)
+    return await asyncio.get_running_loop().run_in_executor(_invoke_pool, call)
+
+
+async def _call_runtime_async(
+    agent_type: str,
+    runtime_arn: str,
+    payload: Dict[str, Any],
+    session_id: str,
+    bearer_token: str,
+    timeout: Optional[float] = None,
+) -> Dict[str, Any]:
+    """asyncio counterpart of _call_runtime: same deadline and p95 hedging, but losing attempts are cancelled."""
+    started = time.monotonic()
+
+    def _attempt(call_session_id: str) -> "asyncio.Task[Dict[str, Any]]":
+        return asyncio.ensure_future(
+            async_http_client.invoke_endpoint(runtime_arn, payload, call_session_id, bearer_token, endpoint_name='DEFAULT')
+        )
+
+    p95 = _latency_p95(agent_type) if HEDGED_REQUESTS_ENABLED else None
+    if timeout is None and p95 is None:
+        result = await async_http_client.invoke_endpoint(runtime_arn, payload, session_id, bearer_token, endpoint_name='DEFAULT')
+        _record_latency(agent_type, time.monotonic() - started)
+        return result
+
+    deadline = started + timeout if timeout is not None else None
+    hedge_at = started + p95 if p95 is not None else None
+    pending = {_attempt(session_id)}
+    errors: List[Exception] = []
+    try:
+        while pending:
+            now = time.monotonic()
+            if deadline is not None and now >= deadline:
+                break
+            wake_times = [t for t in (deadline, hedge_at) if t is not None]
+            done, pending = await asyncio.wait(
+                pending,
+                timeout=max(0.0, min(wake_times) - now) if wake_times else None,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            for task in done:
+                try:
+                    result = task.result()
+                except Exception as exc:
+                    errors.append(exc)
+                    continue
+                _record_latency(agent_type, time.monotonic() - started)
+                return result
+            if hedge_at is not None and pending and time.monotonic() >= hedge_at:
+                logger.info("Hedging %s request after %.1fs (p95)", agent_type, p95)
+                # Separate session so the hedge is not serialized behind the first attempt
+                pending.add(_attempt(generate_session_id()))
+                hedge_at = None
+        if errors and not pending:
+            raise errors[0]
+        raise SpecialistDeadlineExceeded(agent_type, timeout or 0.0)
+    finally:
+        for straggler in pending:
+            straggler.cancel()
+
+
+_specialist_cache = TTLCache(
+    maxsize=int(os.environ.get('SUPPLYSENSE_SPECIALIST_CACHE_MAX_ENTRIES', '256')),
+    ttl=float(os.environ.get('SUPPLYSENSE_SPECIALIST_CACHE_TTL_SECONDS', '300')),
+)
+
+
+def _key_metrics(metrics: Dict[str, Any], limit: int) -> Dict[str, Any]:
+    """Scalar metrics as-is and lists as counts; nested objects and long text are dropped."""
+    selected: Dict[str, Any] = {}
+    for name, value in (metrics or {}).items():
+        if len(selected) >= limit:
+            break
+        if isinstance(value, bool) or isinstance(value, (int, float)):
+            selected[name] = round(value, 3) if isinstance(value, float) else value
+        elif isinstance(value, str) and len(value) <= 40:
+            selected[name] = value
+        elif isinstance(value, (list, tuple)):
+            selected[f"{name}Count"] = len(value)
+    return selected
+
+
+def _compact_specialist_context(agent_type: str, upstream_results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Bounded hand-off from upstream specialists: status, confidence, key metrics and a short headline.
+
+    Raw responses are not forwarded; the receiving agent reads the tables itself. Metrics, then
+    headlines, are trimmed until the JSON fits SPECIALIST_CONTEXT_MAX_CHARS.
+    """
+    context: Dict[str, Any] = {'completedAgents': []}
+    for metric_limit, headline_chars in ((SPECIALIST_CONTEXT_MAX_METRICS, 160), (3, 100), (1, 60), (0, 0)):
+        context['completedAgents'] = []
+        for result in upstream_results:
+            structured = result.get('structured') or {}
+            entry: Dict[str, Any] = {
+                'agentType': result.get('agentType'),
+                'status': structured.get('status'),
+                'confidence': result.get('confidence'),
+                'metrics': _key_metrics(structured.get('metrics') or {}, metric_limit),
+            }
+            if headline_chars:
+                entry['headline'] = _clip(structured.get('summary') or '', headline_chars)
+            context['completedAgents'].append(entry)
+        if len(json.dumps(context, separators=(',', ':'), default=str)) <= SPECIALIST_CONTEXT_MAX_CHARS:
+            break
+    return context
+
+
+def _specialist_cache_key(agent_type: str, query: str, guidance: str, context: Dict[str, Any]) -> Optional[Tuple[str, ...]]:
+    """Cache key for a specialist call, or None when the data version cannot be read."""
+    sources = SPECIALIST_DATA_SOURCES.get(agent_type) or SPECIALIST_DATA_SOURCES['risk']
+    try:
+        token = data_version_token(dynamodb, sources)
+    except Exception as exc:
+        logger.warning("Unable to read data versions for %s: %s", agent_type, exc)
         return None
-    guidance = {
-        'inventory': (
-            "Focus on current stock positions versus pending order demand. Quantify shortages or surplus by SKU, "
-            "and recommend procurement actions."
-        ),
-        'demand': (
-            "Analyze order velocity, revenue at risk, and demand trends. Highlight top products driving demand, "
-            "and note forecast or margin impacts. Avoid repeating raw inventory shortages unless demand is the driver."
-        ),
-        'logistics': (
-            "Assess fulfillment capacity, carrier constraints, and routing risks. Provide utilization metrics, impacted shipments, "
-            "and concrete mitigation options (overflow carriers, expedited lanes)."
-        ),
-        'risk': (
-            "Quantify overall risk (0-1), assign a risk level, and list top risk drivers with mitigation actions. "
-            "Incorporate dependencies between inventory, demand, and logistics."
-        ),
-    }
+    if token is None:
+        return None
+    inputs = hashlib.sha256(
+        (guidance + '\n' + json.dumps(context, sort_keys=True, default=str)).encode('utf-8')
+    ).hexdigest()
+    return agent_type, _normalize_plan_query(query), inputs, token
+
+
+def invalidate_specialist_cache(agent_type: Optional[str] = None) -> None:
+    """Drop cached specialist results for one agent, or for every agent."""
+    if agent_type is None:
+        _specialist_cache.invalidate()
+    else:
+        _specialist_cache.invalidate_where(lambda key: key[0] == agent_type)
+
+
+_SPECIALIST_GUIDANCE: Dict[str, str] = {
+    'inventory': (
+        "Focus on current stock positions versus pending order demand. Quantify shortages or surplus by SKU, "
+        "and recommend procurement actions."
+    ),
+    'demand': (
+        "Analyze order velocity, revenue at risk, and demand trends. Highlight top products driving demand, "
+        "and note forecast or margin impacts. Avoid repeating raw inventory shortages unless demand is the driver."
+    ),
+    'logistics': (
+        "Assess fulfillment capacity, carrier constraints, and routing risks. Provide utilization metrics, impacted shipments, "
+        "and concrete mitigation options (overflow carriers, expedited lanes)."
+    ),
+    'risk': (
+        "Quantify overall risk (0-1), assign a risk level, and list top risk drivers with mitigation actions. "
+        "Incorporate dependencies between inventory, demand, and logistics."
+    ),
+}
+
+
+def _specialist_prompt(agent_type: str, query: str, context: Dict[str, Any]) -> Tuple[str, str]:
+    """Return (guidance, prompt) for one specialist call."""
+    guidance = _SPECIALIST_GUIDANCE.get(agent_type, "Add unique specialist insights.")
     payload_text = (
         "You are the {agent} specialist collaborating within SupplySense.\n"
         "Primary task: {guidance}\n"
@@ -2121,64 +2777,230 @@ def _invoke_specialist(
         "Respond with specialist insights, including blockers, quantitative metrics, recommendations, and an explicit confidence indicator."
     ).format(
         agent=agent_type.capitalize(),
-        guidance=guidance.get(agent_type, "Add unique specialist insights."),
+        guidance=guidance,
         query=query,
-        context=json.dumps(context),
+        context=json.dumps(context, separators=(',', ':'), default=str),
     )
-    if not bearer_token:
-        logger.error("Missing bearer token when invoking %s agent; cannot call runtime", agent_type)
-        return {
-            'agentType': agent_type,
-            'response': 'Error invoking agent: missing bearer token',
-            'confidence': 0,
-            'timestamp': datetime.now(timezone.utc).isoformat() + 'Z',
-            'structured': {
-                'status': 'error',
-                'summary': 'Missing bearer token for specialist invocation',
-                'blockers': ['Unable to authenticate to specialist runtime without bearer token'],
-                'metrics': {},
-                'recommendations': [],
-            }
-        }
-    try:
-        result = http_client.invoke_endpoint(
-            runtime_arn,
-            {'prompt': payload_text},
-            session_id,
-            bearer_token,
-            'DEFAULT'
-        )
-    except Exception as exc:
-        logger.error("Specialist invocation failed for %s: %s", agent_type, exc, exc_info=True)
-        return {
-            'agentType': agent_type,
-            'response': f'Error invoking {agent_type}: {exc}',
-            'confidence': 0,
-            'timestamp': datetime.now(timezone.utc).isoformat() + 'Z',
-            'structured': {
-                'status': 'error',
-                'summary': str(exc),
-                'blockers': [str(exc)],
-                'metrics': {},
-                'recommendations': [],
-            }
+    return guidance, payload_text
+
+
+def _specialist_error(agent_type: str, response: str, summary: str, blockers: List[str]) -> Dict[str, Any]:
+    return {
+        'agentType': agent_type,
+        'response': response,
+        'confidence': 0,
+        'timestamp': datetime.now(timezone.utc).isoformat() + 'Z',
+        'structured': {
+            'status': 'error',
+            'summary': summary,
+            'blockers': blockers,
+            'metrics': {},
+            'recommendations': [],
         }
+    }
+
+
+def _missing_token_result(agent_type: str) -> Dict[str, Any]:
+    logger.error("Missing bearer token when invoking %s agent; cannot call runtime", agent_type)
+    return _specialist_error(
+        agent_type,
+        'Error invoking agent: missing bearer token',
+        'Missing bearer token for specialist invocation',
+        ['Unable to authenticate to specialist runtime without bearer token'],
+    )
+
+
+def _cached_specialist_result(agent_type: str, cache_key: Optional[Tuple[str, ...]]) -> Optional[Dict[str, Any]]:
+    cached = _specialist_cache.get(cache_key) if cache_key else None
+    if not cached:
+        return None
+    logger.info("Specialist cache hit for %s", agent_type)
+    return {**copy.deepcopy(cached), 'cached': True}
+
 
+def _specialist_result(agent_type: str, result: Dict[str, Any], cache_key: Optional[Tuple[str, ...]]) -> Dict[str, Any]:
+    """Structure a runtime response and cache it unless it is an error."""
     response_text = result.get('message') or result.get('response') or result.get('completion') or str(result)
     structured = structure_agent_response(agent_type, response_text)
     confidence_value = _infer_confidence(agent_type, structured)
     structured['confidence'] = confidence_value
-    return {
+    specialist_result = {
         'agentType': agent_type,
         'response': response_text,
         'confidence': confidence_value,
         'timestamp': datetime.now(timezone.utc).isoformat() + 'Z',
         'structured': structured,
     }
+    if cache_key and structured.get('status') != 'error':
+        _specialist_cache.set(cache_key, copy.deepcopy(specialist_result))
+    return specialist_result
 
 
-def _generate_plan(query: str, context: Optional[Dict[str, Any]] = None) -> Tuple[List[str], str]:
-    default_plan = ['inventory', 'demand', 'logistics', 'risk']
+def _finish_specialist_call(
+    agent_type: str,
+    result: Dict[str, Any],
+    cache_key: Optional[Tuple[str, ...]],
+    breaker: _CircuitBreaker,
+    seconds: float,
+) -> Dict[str, Any]:
+    """Structure a runtime answer, feed its outcome to the breaker and keep it as last known good."""
+    specialist_result = _specialist_result(agent_type, result, cache_key)
+    ok = specialist_result['structured'].get('status') != 'error'
+    breaker.record(ok, seconds)
+    if ok:
+        _remember_good_result(agent_type, specialist_result)
+    return specialist_result
+
+
+def _invoke_specialist(
+    agent_type: str,
+    query: str,
+    session_id: str,
+    context: Dict[str, Any],
+    bearer_token: Optional[str] = None,
+    timeout: Optional[float] = None,
+) -> Optional[Dict[str, Any]]:
+    """Blocking specialist call, used by the fulfillment tools; see _invoke_specialist_async."""
+    runtime_arn = _get_runtime_arn(agent_type)
+    if not runtime_arn:
+        return None
+    guidance, payload_text = _specialist_prompt(agent_type, query, context)
+    if not bearer_token:
+        return _missing_token_result(agent_type)
+    cache_key = _specialist_cache_key(agent_type, query, guidance, context)
+    cached = _cached_specialist_result(agent_type, cache_key)
+    if cached:
+        return cached
+    breaker = _breaker(agent_type)
+    if not breaker.allow():
+        return _circuit_open_result(agent_type)
+
+    started = time.monotonic()
+    try:
+        result = _call_runtime(agent_type, runtime_arn, {'prompt': payload_text}, session_id, bearer_token, timeout)
+    except SpecialistDeadlineExceeded:
+        breaker.record(False, time.monotonic() - started)
+        raise
+    except Exception as exc:
+        breaker.record(False, time.monotonic() - started)
+        logger.error("Specialist invocation failed for %s: %s", agent_type, exc, exc_info=True)
+        return _specialist_error(agent_type, f'Error invoking {agent_type}: {exc}', str(exc), [str(exc)])
+    return _finish_specialist_call(agent_type, result, cache_key, breaker, time.monotonic() - started)
+
+
+async def _invoke_specialist_async(
+    agent_type: str,
+    query: str,
+    session_id: str,
+    context: Dict[str, Any],
+    bearer_token: Optional[str] = None,
+    timeout: Optional[float] = None,
+) -> Optional[Dict[str, Any]]:
+    """Invoke a specialist runtime over async HTTP; SSM and DynamoDB lookups run on the invoke pool."""
+    runtime_arn = await _offload(_get_runtime_arn, agent_type)
+    if not runtime_arn:
+        return None
+    guidance, payload_text = _specialist_prompt(agent_type, query, context)
+    if not bearer_token:
+        return _missing_token_result(agent_type)
+    cache_key = await _offload(_specialist_cache_key, agent_type, query, guidance, context)
+    cached = _cached_specialist_result(agent_type, cache_key)
+    if cached:
+        return cached
+    breaker = _breaker(agent_type)
+    if not breaker.allow():
+        return _circuit_open_result(agent_type)
+
+    started = time.monotonic()
+    try:
+        result = await _call_runtime_async(agent_type, runtime_arn, {'prompt': payload_text}, session_id, bearer_token, timeout)
+    except SpecialistDeadlineExceeded:
+        breaker.record(False, time.monotonic() - started)
+        raise
+    except asyncio.CancelledError:
+        breaker.release()
+        raise
+    except Exception as exc:
+        breaker.record(False, time.monotonic() - started)
+        logger.error("Specialist invocation failed for %s: %s", agent_type, exc, exc_info=True)
+        return _specialist_error(agent_type, f'Error invoking {agent_type}: {exc}', str(exc), [str(exc)])
+    return _finish_specialist_call(agent_type, result, cache_key, breaker, time.monotonic() - started)
+
+
+DEFAULT_PLAN: Tuple[str, ...] = ('inventory', 'demand', 'logistics', 'risk')
+
+# Word-prefix keywords per specialist domain (shared with the LLM planner's guardrail logging)
+PLANNER_DOMAIN_KEYWORDS: Dict[str, Tuple[str, ...]] = {
+    'inventory': ('stock', 'inventory', 'shortage', 'replenish', 'restock', 'reorder', 'sku', 'warehouse'),
+    'demand': ('demand', 'forecast', 'trend', 'order pattern', 'surge', 'velocity'),
+    'logistics': ('carrier', 'shipping', 'shipment', 'delivery', 'deliveries', 'route', 'routing', 'logistics', 'fulfil', 'freight'),
+    'risk': ('risk', 'disruption', 'delay', 'sla', 'impact', 'exposure'),
+}
+# (queryType, implied agents, pattern) for intents the fused-response builder recognises.
+# A query resolves locally only when it matches exactly one intent, or no intent and one domain.
+PLANNER_INTENTS: Tuple[Tuple[str, Tuple[str, ...], Any], ...] = tuple(
+    (query_type, agents, re.compile(pattern))
+    for query_type, agents, pattern in (
+        ('fulfillment_check', ('inventory', 'logistics'), r'\bfulfil'),
+        ('replenishment_plan', ('inventory',), r'\b(?:replenish|reorder|restock)'),
+        ('expedite_shipments', ('logistics',), r'\bexpedit'),
+        ('stockout_risk', ('inventory', 'risk'), r'\bstock[- ]?outs?\b'),
+        ('safety_stock_review', ('inventory', 'demand'), r'\bsafety stock'),
+        ('carrier_comparison', ('logistics',), r'\bcarriers?\b'),
+        ('revenue_impact', ('demand', 'risk'), r'\brevenue'),
+        ('sla_compliance', ('logistics', 'risk'), r'\bslas?\b'),
+        ('supplier_risk', ('risk',), r'\bsuppliers?\b'),
+        ('demand_forecast', ('demand',), r'\bforecast'),
+        ('demand_surge', ('demand', 'inventory'), r'\bsurg'),
+    )
+)
+# Open-ended, comparative or negated phrasing always goes to the LLM planner
+_PLANNER_AMBIGUOUS = re.compile(
+    r"\b(?:brief|executive|overview|summar|simulat|scenario|what if|compar|versus|vs\b|realloc|prioriti|"
+    r"markdown|diversif|production|schedul|reconcil|not|without|except|excluding|ignore|don't|dont)"
+)
+_PLANNER_MAX_WORDS = 40
+_DOMAIN_PATTERNS = {
+    agent_type: re.compile(r'\b(?:' + '|'.join(re.escape(word) for word in words) + ')')
+    for agent_type, words in PLANNER_DOMAIN_KEYWORDS.items()
+}
+
+_plan_cache = TTLCache(
+    maxsize=int(os.environ.get('SUPPLYSENSE_PLAN_CACHE_MAX_ENTRIES', '256')),
+    ttl=float(os.environ.get('SUPPLYSENSE_PLAN_CACHE_TTL_SECONDS', '900')),
+)
+
+
+def _normalize_plan_query(query: str) -> str:
+    return ' '.join(re.sub(r"[^\w\s'-]", ' ', query.lower()).split())
+
+
+def _matched_domains(query: str) -> List[str]:
+    text = _normalize_plan_query(query)
+    return [agent_type for agent_type in DEFAULT_PLAN if _DOMAIN_PATTERNS[agent_type].search(text)]
+
+
+def _classify_plan(query: str) -> Optional[Tuple[List[str], str]]:
+    """Deterministically plan unambiguous queries; returns None when the LLM planner should decide."""
+    text = _normalize_plan_query(query)
+    if not text or len(text.split()) > _PLANNER_MAX_WORDS or _PLANNER_AMBIGUOUS.search(text):
+        return None
+    domains = set(_matched_domains(text))
+    intents = [(query_type, agents) for query_type, agents, pattern in PLANNER_INTENTS if pattern.search(text)]
+    if len(intents) == 1:
+        query_type, implied = intents[0]
+        agents = domains | set(implied)
+    elif not intents and len(domains) == 1:
+        agents = domains
+        query_type = f"{next(iter(domains))}_status"
+    else:
+        return None
+    return [agent_type for agent_type in DEFAULT_PLAN if agent_type in agents], query_type
+
+
+def _plan_with_llm(query: str, context: Optional[Dict[str, Any]] = None) -> Tuple[List[str], str]:
+    """Ask the planner LLM for a plan; raises when its answer cannot be used."""
+    default_plan = list(DEFAULT_PLAN)
     allowed_agents = {
         'inventory': (
             'Analyze stock positions, shortages, replenishment needs, and SKU-level inventory status. '
@@ -2240,7 +3062,7 @@ def _generate_plan(query: str, context: Optional[Dict[str, Any]] = None) -> Tupl
         planner_prompt += f"Recent context (JSON snippet): {context_snippet}\n"
 
     try:
-        response = _agent_planner(planner_prompt)
+        response = _worker_agent('planner')(planner_prompt)
         text = response.message["content"][0]["text"].strip()
         if text.startswith("```"):
             lines = [line for line in text.splitlines() if not line.strip().startswith("```")]
@@ -2262,77 +3084,328 @@ def _generate_plan(query: str, context: Optional[Dict[str, Any]] = None) -> Tupl
             plan = default_plan.copy()
         else:
             # Optional guardrails: log warnings if obvious agents are missing (for debugging)
-            query_lower = query.lower()
-            if 'inventory' not in plan and any(word in query_lower for word in ['stock', 'inventory', 'shortage', 'replenish', 'sku']):
-                logger.debug("Query mentions inventory-related terms but 'inventory' not in plan: %s", plan)
-            if 'logistics' not in plan and any(word in query_lower for word in ['carrier', 'shipping', 'delivery', 'route', 'logistics', 'fulfill']):
-                logger.debug("Query mentions logistics-related terms but 'logistics' not in plan: %s", plan)
-            if 'demand' not in plan and any(word in query_lower for word in ['demand', 'forecast', 'trend', 'order pattern']):
-                logger.debug("Query mentions demand-related terms but 'demand' not in plan: %s", plan)
-            if 'risk' not in plan and any(word in query_lower for word in ['risk', 'disruption', 'delay', 'sla', 'impact']):
-                logger.debug("Query mentions risk-related terms but 'risk' not in plan: %s", plan)
+            for agent_type in _matched_domains(query):
+                if agent_type not in plan:
+                    logger.debug("Query mentions %s-related terms but '%s' not in plan: %s", agent_type, agent_type, plan)
         
         query_type = parsed.get('queryType') or parsed.get('query_type') or 'general_query'
         query_type = str(query_type).strip() or 'general_query'
         return plan, query_type
     except Exception as exc:
-        logger.warning("Planner generation failed (%s); using default plan.", exc, exc_info=True)
-        return default_plan.copy(), 'general_query'
+        raise RuntimeError(f"Planner generation failed: {exc}") from exc
 
 
-def _run_orchestrated_flow(query: str, session_id: str, bearer_token: Optional[str] = None) -> Dict[str, Any]:
-    plan, query_type = _generate_plan(query)
-    logger.info("LLM plan: %s (query_type=%s)", plan, query_type)
-    events: List[Dict[str, Any]] = [{
-        'type': 'analysis',
-        'message': f"Orchestrator plan: executing {len(plan)} agent(s) -> {', '.join(plan)}",
-        'agents': plan,
-        'queryType': query_type,
-        'timestamp': datetime.now(timezone.utc).isoformat() + 'Z',
-    }]
+def _local_plan(query: str, context: Optional[Dict[str, Any]] = None) -> Optional[Tuple[List[str], str]]:
+    """Resolve a plan from the plan cache or the rule-based classifier; None means the LLM must decide."""
+    cache_key = _normalize_plan_query(query)
+    if context is None:
+        cached = _plan_cache.get(cache_key)
+        if cached:
+            logger.info("Plan cache hit for %r", cache_key[:80])
+            return list(cached[0]), cached[1]
+
+    classified = _classify_plan(query)
+    if not classified:
+        return None
+    plan, query_type = classified
+    logger.info("Rule planner resolved %s (query_type=%s)", plan, query_type)
+    if context is None:
+        _plan_cache.set(cache_key, (tuple(plan), query_type))
+    return plan, query_type
+
+
+def _llm_plan(query: str, context: Optional[Dict[str, Any]] = None) -> Tuple[List[str], str]:
+    """Plan with the LLM, caching usable answers and falling back to the default plan on failure."""
+    try:
+        plan, query_type = _plan_with_llm(query, context)
+    except Exception as exc:
+        logger.warning("%s; using default plan.", exc, exc_info=True)
+        return list(DEFAULT_PLAN), 'general_query'
+    if context is None:
+        _plan_cache.set(_normalize_plan_query(query), (tuple(plan), query_type))
+    return list(plan), query_type
+
+
+def _generate_plan(query: str, context: Optional[Dict[str, Any]] = None) -> Tuple[List[str], str]:
+    """Resolve a plan from the plan cache, the rule-based classifier, or the planner LLM, in that order."""
+    return _local_plan(query, context) or _llm_plan(query, context)
+
+
+_plan_history_lock = threading.Lock()
+_plan_history: deque = deque(maxlen=SPECULATIVE_HISTORY_SIZE)
+_speculation_stats = {'runs': 0, 'prefetched': 0, 'used': 0, 'discarded': 0}
+
+
+def _record_plan(plan: List[str], query_type: str) -> None:
+    with _plan_history_lock:
+        _plan_history.append((query_type, tuple(plan)))
+
+
+def _predict_specialists(query: str) -> List[str]:
+    """Rank specialists without declared inputs by keyword match, then by recent queryType plans."""
+    with _plan_history_lock:
+        history = list(_plan_history)
+    # Weight each agent by how often recent queryTypes planned it
+    type_counts = Counter(query_type for query_type, _ in history)
+    agent_scores: Counter = Counter()
+    for query_type, plan in history:
+        for agent_type in plan:
+            agent_scores[agent_type] += type_counts[query_type]
+
+    candidates = [agent_type for agent_type in DEFAULT_PLAN if not SPECIALIST_DEPENDENCIES.get(agent_type)]
+    keyword_hits = [agent_type for agent_type in _matched_domains(query) if agent_type in candidates]
+    by_history = sorted(
+        (agent_type for agent_type in candidates if agent_scores[agent_type] and agent_type not in keyword_hits),
+        key=lambda agent_type: -agent_scores[agent_type],
+    )
+    return (keyword_hits + by_history)[:SPECULATIVE_MAX_AGENTS]
+
+
+def _start_speculative_specialists(
+    query: str,
+    session_id: str,
+    bearer_token: Optional[str],
+    budget: Optional[_RequestBudget] = None,
+) -> Dict[str, Tuple["asyncio.Task[Optional[Dict[str, Any]]]", str]]:
+    """Start predicted specialists as tasks ahead of the plan; returns agent -> (task, startedAt)."""
+    predicted = _predict_specialists(query)
+    if not predicted:
+        return {}
+    logger.info("Speculatively prefetching specialists: %s", predicted)
+    # Budgeted like a first-level agent of the default plan
+    timeout = budget.specialist_timeout(0, 1 + max(_specialist_levels(list(DEFAULT_PLAN)).values())) if budget else None
+    prefetched = {}
+    for agent_type in predicted:
+        task = asyncio.ensure_future(_invoke_specialist_async(
+            agent_type, query, session_id, {'completedAgents': []}, bearer_token=bearer_token, timeout=timeout,
+        ))
+        # Discarded prefetches are never awaited; consume their outcome so it is not logged as unhandled
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        prefetched[agent_type] = (task, datetime.now(timezone.utc).isoformat() + 'Z')
+    return prefetched
+
+
+def _settle_speculation(prefetched: Dict[str, Tuple["asyncio.Task[Any]", str]], plan: List[str]) -> Dict[str, Any]:
+    """Cancel or discard prefetches the plan dropped; returns this run's speculation metrics."""
+    used = [agent_type for agent_type in prefetched if agent_type in plan]
+    discarded = [agent_type for agent_type in prefetched if agent_type not in plan]
+    for agent_type in discarded:
+        prefetched[agent_type][0].cancel()
+    with _plan_history_lock:
+        _speculation_stats['runs'] += 1
+        _speculation_stats['prefetched'] += len(prefetched)
+        _speculation_stats['used'] += len(used)
+        _speculation_stats['discarded'] += len(discarded)
+        totals = dict(_speculation_stats)
+    totals['hitRate'] = round(totals['used'] / totals['prefetched'], 3) if totals['prefetched'] else 0.0
+    return {
+        'prefetched': list(prefetched),
+        'used': used,
+        'discarded': discarded,
+        'hitRate': round(len(used) / len(prefetched), 3) if prefetched else 0.0,
+        'cumulative': totals,
+    }
+
+
+def _specialist_inputs(plan: List[str]) -> Dict[str, List[str]]:
+    """Map each planned agent to the planned agents it must wait for."""
+    return {
+        agent_type: [dep for dep in SPECIALIST_DEPENDENCIES.get(agent_type, ()) if dep in plan and dep != agent_type]
+        for agent_type in plan
+    }
 
-    agent_results: List[Dict[str, Any]] = []
-    context = {'completedAgents': []}
+
+def _specialist_levels(plan: List[str]) -> Dict[str, int]:
+    """Depth of each planned agent in the dependency DAG (0 for agents without planned inputs)."""
+    inputs = _specialist_inputs(plan)
+    levels: Dict[str, int] = {}
+
+    def _level(agent_type: str, seen: Tuple[str, ...] = ()) -> int:
+        if agent_type not in levels:
+            deps = [dep for dep in inputs.get(agent_type, []) if dep not in seen]
+            levels[agent_type] = 1 + max((_level(dep, seen + (agent_type,)) for dep in deps), default=-1)
+        return levels[agent_type]
 
     for agent_type in plan:
-        events.append({
+        _level(agent_type)
+    return levels
+
+
+async def _schedule_specialists(
+    plan: List[str],
+    query: str,
+    session_id: str,
+    bearer_token: Optional[str] = None,
+    on_event: Optional[Callable[[Dict[str, Any]], None]] = None,
+    prefetched: Optional[Dict[str, Tuple["asyncio.Task[Any]", str]]] = None,
+    budget: Optional[_RequestBudget] = None,
+) -> Dict[str, Tuple[Optional[Dict[str, Any]], Dict[str, Any], Dict[str, Any]]]:
+    """Run planned specialists as a dependency DAG of asyncio tasks.
+
+    Returns agent -> (result, agent_start event, agent_result event). Each agent awaits the
+    tasks of its declared inputs and gets their compact context. on_event, when given,
+    receives each event as it happens. Agents in prefetched were started speculatively and
+    are awaited instead of invoked again. With a budget, each agent's timeout is its DAG
+    level's share of the remaining specialists stage; agents that miss it get a 'degraded'
+    agent_result and no result. At most SPECIALIST_MAX_WORKERS calls are in flight at once.
+    """
+    prefetched = prefetched or {}
+    inputs = _specialist_inputs(plan)
+    levels = _specialist_levels(plan)
+    depth = 1 + max(levels.values(), default=0)
+    slots = asyncio.Semaphore(SPECIALIST_MAX_WORKERS)
+    tasks: Dict[str, "asyncio.Task[Tuple[Optional[Dict[str, Any]], Dict[str, Any], Dict[str, Any]]]"] = {}
+
+    def _emit(event: Dict[str, Any]) -> None:
+        if on_event:
+            try:
+                on_event(event)
+            except Exception as exc:
+                logger.warning("Failed to publish %s event: %s", event.get('type'), exc)
+
+    async def _run(agent_type: str) -> Tuple[Optional[Dict[str, Any]], Dict[str, Any], Dict[str, Any]]:
+        # Only inputs on a lower DAG level are awaited, so a dependency cycle cannot stall the run
+        deps = [dep for dep in inputs[agent_type] if levels[dep] < levels[agent_type]]
+        if deps:
+            await asyncio.wait([tasks[dep] for dep in deps])
+        speculative = prefetched.get(agent_type)
+        start_event = {
             'type': 'agent_start',
             'agent': agent_type,
             'message': f'{agent_type.capitalize()} agent analyzing...',
-            'timestamp': datetime.now(timezone.utc).isoformat() + 'Z',
-        })
+            'timestamp': speculative[1] if speculative else datetime.now(timezone.utc).isoformat() + 'Z',
+        }
+        _emit(start_event)
+        upstream = [tasks[dep].result()[0] for dep in deps]
+        context = await _offload(_compact_specialist_context, agent_type, [result for result in upstream if result])
         logger.info(
-            "Invoking specialist %s (bearer token provided=%s)",
+            "Invoking specialist %s (bearer token provided=%s, inputs=%s)",
             agent_type,
-            bool(bearer_token)
+            bool(bearer_token),
+            inputs[agent_type],
         )
         if bearer_token:
             logger.debug("Bearer token prefix for %s: %s...", agent_type, bearer_token[:12])
-        result = _invoke_specialist(agent_type, query, session_id, context, bearer_token=bearer_token)
-        if not result:
-            events.append({
+        timeout = budget.specialist_timeout(levels[agent_type], depth) if budget else None
+        missed_deadline: Optional[SpecialistDeadlineExceeded] = None
+        try:
+            if speculative:
+                try:
+                    result = await asyncio.wait_for(speculative[0], timeout)
+                except asyncio.TimeoutError:
+                    raise SpecialistDeadlineExceeded(agent_type, timeout or 0.0)
+            else:
+                async with slots:
+                    result = await _invoke_specialist_async(
+                        agent_type, query, session_id, context, bearer_token=bearer_token, timeout=timeout
+                    )
+        except SpecialistDeadlineExceeded as exc:
+            logger.warning("%s; continuing without it", exc)
+            missed_deadline = exc
+            result = None
+        except Exception as exc:
+            logger.error("Specialist %s failed: %s", agent_type, exc, exc_info=True)
+            result = None
+        if missed_deadline:
+            result_event = {
+                'type': 'agent_result',
+                'agent': agent_type,
+                'status': 'degraded',
+                'message': f'{missed_deadline}; continuing without it.',
+                'timestamp': datetime.now(timezone.utc).isoformat() + 'Z',
+            }
+        elif result:
+            result_event = {
+                'type': 'agent_result',
+                'agent': agent_type,
+                'message': result['structured'].get('summary'),
+                'status': result['structured'].get('status'),
+                'timestamp': datetime.now(timezone.utc).isoformat() + 'Z',
+            }
+            if result.get('stale'):
+                result_event['stale'] = True
+        else:
+            result_event = {
                 'type': 'agent_result',
                 'agent': agent_type,
                 'status': 'skipped',
                 'message': f'{agent_type} agent unavailable.',
                 'timestamp': datetime.now(timezone.utc).isoformat() + 'Z',
-            })
-            continue
-        agent_results.append(result)
-        context['completedAgents'].append({
-            'agentType': agent_type,
-            'summary': result['structured'].get('summary'),
-            'status': result['structured'].get('status'),
-        })
-        events.append({
-            'type': 'agent_result',
-            'agent': agent_type,
-            'message': result['structured'].get('summary'),
-            'status': result['structured'].get('status'),
-            'timestamp': datetime.now(timezone.utc).isoformat() + 'Z',
-        })
+            }
+        _emit(result_event)
+        return result, start_event, result_event
+
+    for agent_type in plan:
+        tasks[agent_type] = asyncio.ensure_future(_run(agent_type))
+    try:
+        await asyncio.gather(*tasks.values())
+    finally:
+        for task in tasks.values():
+            task.cancel()
+    return {agent_type: task.result() for agent_type, task in tasks.items()}
+
+
+async def _run_orchestrated_flow(
+    query: str,
+    session_id: str,
+    bearer_token: Optional[str] = None,
+    on_event: Optional[Callable[[Dict[str, Any]], None]] = None,
+    budget: Optional[_RequestBudget] = None,
+) -> Dict[str, Any]:
+    """Plan, run the specialists and synthesize a briefing for one query on the event loop."""
+    budget = budget or _RequestBudget()
+    prefetched: Dict[str, Tuple["asyncio.Task[Any]", str]] = {}
+    local_plan = _local_plan(query)
+    try:
+        if local_plan:
+            plan, query_type = local_plan
+        else:
+            if SPECULATIVE_PREFETCH_ENABLED:
+                prefetched = _start_speculative_specialists(query, session_id, bearer_token, budget=budget)
+            try:
+                plan, query_type = await asyncio.wait_for(_offload(_llm_plan, query), budget.remaining('planning'))
+            except asyncio.TimeoutError:
+                logger.warning("Planner exceeded its %.1fs budget; using default plan", budget.stage_deadline('planning') - budget.started)
+                plan, query_type = list(DEFAULT_PLAN), 'general_query'
+    except BaseException:
+        for task, _ in prefetched.values():
+            task.cancel()
+        raise
+    logger.info("Plan: %s (query_type=%s)", plan, query_type)
+    _record_plan(plan, query_type)
+    speculation = _settle_speculation(prefetched, plan) if prefetched else None
+    events: List[Dict[str, Any]] = [{
+        'type': 'analysis',
+        'message': f"Orchestrator plan: executing {len(plan)} agent(s) -> {', '.join(plan)}",
+        'agents': plan,
+        'queryType': query_type,
+        'timestamp': datetime.now(timezone.utc).isoformat() + 'Z',
+    }]
+    if on_event:
+        on_event(events[0])
 
-    fused = _build_fused_response({
+    agent_results: List[Dict[str, Any]] = []
+    outcomes = await _schedule_specialists(
+        plan, query, session_id, bearer_token, on_event=on_event,
+        prefetched={agent_type: prefetched[agent_type] for agent_type in speculation['used']} if speculation else None,
+        budget=budget,
+    )
+
+    # The returned event log is in plan order regardless of completion order
+    degraded_agents: List[str] = []
+    stale_agents: List[str] = []
+    for agent_type in plan:
+        result, start_event, result_event = outcomes[agent_type]
+        events.extend([start_event, result_event])
+        if result:
+            agent_results.append(result)
+            if result.get('stale'):
+                stale_agents.append(agent_type)
+        elif result_event.get('status') == 'degraded':
+            degraded_agents.append(agent_type)
+
+    # Reads the decision index from DynamoDB, so it runs off the event loop
+    fused = await _offload(_build_fused_response, {
         'agentResults': agent_results,
         'analysis': {'type': query_type},
         'sessionId': session_id,
@@ -2341,9 +3414,79 @@ def _run_orchestrated_flow(query: str, session_id: str, bearer_token: Optional[s
     fused['events'] = events
     fused['agentResults'] = agent_results
     fused['queryType'] = query_type
+    fused['degradedAgents'] = degraded_agents
+    fused['staleAgents'] = stale_agents
+
+    if on_event:
+        on_event({
+            'type': 'status',
+            'message': 'Preparing executive briefing...',
+            'timestamp': datetime.now(timezone.utc).isoformat() + 'Z',
+        })
+    await _synthesize_briefing(fused, query, timeout=budget.remaining('synthesis'))
+    fused['orchestrationMetrics'] = {
+        'budget': {
+            'totalSeconds': budget.total,
+            'elapsedSeconds': round(budget.elapsed(), 2),
+        },
+    }
+    fused['orchestrationMetrics']['specialistCache'] = _specialist_cache.stats()
+    fused['orchestrationMetrics']['httpPool'] = async_http_client.stats()
+    fused['orchestrationMetrics']['circuitBreakers'] = {
+        agent_type: _breaker(agent_type).snapshot() for agent_type in plan
+    }
+    if speculation:
+        fused['orchestrationMetrics']['speculation'] = speculation
     return fused
 
 
+def _fan_out_fulfillment_specialists(
+    prompts: Dict[str, str],
+    deadline_seconds: Optional[float] = None,
+    bearer_token: Optional[str] = None,
+) -> Tuple[Dict[str, Dict[str, Any]], List[str]]:
+    """Invoke independent specialists concurrently; returns (structured analyses, agents that missed their deadline or failed).
+
+    The token defaults to the one of the request being served. Each call gets the time left
+    as its timeout, which the runtime client enforces as a total bound, so a straggler's
+    worker and invocation slot are released at the deadline even after this returns.
+    """
+    deadline = FULFILLMENT_AGENT_DEADLINE_SECONDS if deadline_seconds is None else deadline_seconds
+    token = bearer_token or _request_bearer_token.get()
+    analyses: Dict[str, Dict[str, Any]] = {agent_type: {} for agent_type in prompts}
+    missing: List[str] = []
+    started = time.monotonic()
+
+    def _remaining() -> float:
+        return max(0.0, deadline - (time.monotonic() - started))
+
+    futures = {
+        agent_type: _fulfillment_pool.submit(
+            _invoke_specialist, agent_type, prompt, "", {}, bearer_token=token, timeout=max(0.1, _remaining()),
+        )
+        for agent_type, prompt in prompts.items()
+    }
+    for agent_type, future in futures.items():
+        try:
+            result = future.result(timeout=_remaining())
+        except FuturesTimeoutError:
+            logger.warning("%s specialist missed its %.0fs fulfillment deadline", agent_type, deadline)
+            # Drops calls still queued behind a busy pool; running ones stop at their own timeout
+            future.cancel()
+            missing.append(agent_type)
+            continue
+        except Exception as exc:
+            logger.error("%s specialist failed during fulfillment orchestration: %s", agent_type, exc)
+            missing.append(agent_type)
+            continue
+        structured = (result or {}).get('structured') or {}
+        if not result or structured.get('status') == 'error':
+            missing.append(agent_type)
+        else:
+            analyses[agent_type] = structured
+    return analyses, missing
+
+
 @tool
 def orchestrate_fulfillment(
     timeframe: str = "weekly",
@@ -2358,20 +3501,11 @@ def orchestrate_fulfillment(
         orders_table = dynamodb.Table('supplysense-orders')
         
         if order_ids:
-            # Get specific orders
-            orders = []
-            for order_id in order_ids:
-                response = orders_table.get_item(Key={'orderId': order_id})
-                if 'Item' in response:
-                    orders.append(response['Item'])
+            # Get specific orders (batched, concurrent BatchGetItem)
+            orders = get_orders_by_ids(orders_table, order_ids)
         else:
             # Get all pending orders
-            response = orders_table.scan(
-                FilterExpression='#status = :status',
-                ExpressionAttributeNames={'#status': 'status'},
-                ExpressionAttributeValues={':status': 'pending'}
-            )
-            orders = response.get('Items', [])
+            orders = query_orders_by_status(orders_table, 'pending')
         
         if not orders:
             return json.dumps({
@@ -2381,26 +3515,19 @@ def orchestrate_fulfillment(
                 "timeframe": timeframe
             })
         
-        # Step 2: Call real Inventory Agent
-        inventory_result = _invoke_specialist('inventory', f"Analyze fulfillment capacity for {len(orders)} orders in {timeframe}", "", {}, bearer_token=None)
-        inventory_analysis = inventory_result.get('structured', {}) if inventory_result else {}
-        
-        # Step 3: Call real Demand Agent
-        demand_result = _invoke_specialist('demand', f"Analyze demand patterns for {len(orders)} orders in {timeframe}", "", {}, bearer_token=None)
-        demand_analysis = demand_result.get('structured', {}) if demand_result else {}
-        
-        # Step 4: Call real Logistics Agent
-        logistics_result = _invoke_specialist('logistics', f"Assess logistics capability for {len(orders)} orders in {timeframe}", "", {}, bearer_token=None)
-        logistics_analysis = logistics_result.get('structured', {}) if logistics_result else {}
-        
-        # Step 5: Call real Risk Agent
-        risk_result = _invoke_specialist('risk', f"Assess supply chain risks for {len(orders)} orders in {timeframe}", "", {}, bearer_token=None)
-        risk_analysis = risk_result.get('structured', {}) if risk_result else {}
+        # Steps 2-5: Call the real specialists concurrently, each under its own deadline
+        analyses, missing_agents = _fan_out_fulfillment_specialists({
+            'inventory': f"Analyze fulfillment capacity for {len(orders)} orders in {timeframe}",
+            'demand': f"Analyze demand patterns for {len(orders)} orders in {timeframe}",
+            'logistics': f"Assess logistics capability for {len(orders)} orders in {timeframe}",
+            'risk': f"Assess supply chain risks for {len(orders)} orders in {timeframe}",
+        })
         
-        # Step 6: Synthesize comprehensive fulfillment plan
+        # Step 6: Synthesize comprehensive fulfillment plan from whatever arrived in time
         fulfillment_plan = synthesize_fulfillment_plan(
-            orders, inventory_analysis, demand_analysis, 
-            logistics_analysis, risk_analysis, timeframe, constraints
+            orders, analyses['inventory'], analyses['demand'],
+            analyses['logistics'], analyses['risk'], timeframe, constraints,
+            missing_agents=missing_agents,
         )
         
         return json.dumps(fulfillment_plan, indent=2)
@@ -2525,8 +3652,9 @@ def synthesize_multi_agent_response(
 # Helper functions for orchestration
 # Note: orchestrate_fulfillment tool now calls real agents via _invoke_specialist
 
-def synthesize_fulfillment_plan(orders, inventory, demand, logistics, risk, timeframe, constraints):
+def synthesize_fulfillment_plan(orders, inventory, demand, logistics, risk, timeframe, constraints, missing_agents=None):
     """Synthesize all agent inputs into a comprehensive fulfillment plan."""
+    missing_agents = list(missing_agents or [])
     total_orders = len(orders)
     total_value = sum(float(order.get('value', 0)) for order in orders)
     
@@ -2566,16 +3694,29 @@ def synthesize_fulfillment_plan(orders, inventory, demand, logistics, risk, time
             }
         ])
     
+    # Partial results: only specialists that answered contribute to confidence
+    received = [
+        analysis for agent_type, analysis in
+        (('inventory', inventory), ('demand', demand), ('logistics', logistics), ('risk', risk))
+        if agent_type not in missing_agents
+    ]
+    recommendations = [
+        "Proceed with fulfillment as planned" if can_fulfill else "Address critical issues before proceeding",
+        "Monitor key metrics during execution",
+        "Review and adjust plan based on real-time data"
+    ]
+    if missing_agents:
+        recommendations.append(f"Re-run once {', '.join(missing_agents)} analysis is available")
+    
     return {
         "fulfillmentAssessment": {
             "canFulfill": can_fulfill,
             "fulfillmentPercentage": round(overall_capability * 100, 1),
-            "confidence": round(sum([
-                inventory.get('confidence', 0.8),
-                demand.get('confidence', 0.8),
-                logistics.get('confidence', 0.8),
-                risk.get('confidence', 0.8)
-            ]) / 4, 2)
+            "confidence": round(
+                sum(analysis.get('confidence', 0.8) for analysis in received) / len(received), 2
+            ) if received else 0.0,
+            "partial": bool(missing_agents),
+            "missingAgents": missing_agents
         },
         "orderSummary": {
             "totalOrders": total_orders,
@@ -2589,11 +3730,7 @@ def synthesize_fulfillment_plan(orders, inventory, demand, logistics, risk, time
             "risk": risk
         },
         "actionItems": action_items,
-        "recommendations": [
-            "Proceed with fulfillment as planned" if can_fulfill else "Address critical issues before proceeding",
-            "Monitor key metrics during execution",
-            "Review and adjust plan based on real-time data"
-        ],
+        "recommendations": recommendations,
         "timestamp": datetime.now().isoformat()
     }
 
@@ -2789,46 +3926,76 @@ def generate_next_steps(query, context):
         "Document lessons learned"
     ]
 
+def _notification_context(action_or_approval: Dict[str, Any]) -> Tuple[str, str, List[str]]:
+    """Return (description, owner, context lines) used by both the LLM and template drafts."""
+    description = action_or_approval.get('description') or action_or_approval.get('title', '')
+    owner = action_or_approval.get('owner') or action_or_approval.get('requires', 'Team')
+    data = action_or_approval.get('data') or action_or_approval.get('details') or {}
+
+    # Build context
+    context_parts = [f"Action: {description}", f"Owner: {owner}"]
+
+    # Add shortage details
+    shortages = data.get('shortages', [])
+    if shortages:
+        context_parts.append(f"\nShortage Details:")
+        for item in shortages[:5]:
+            if isinstance(item, dict):
+                product_id = item.get('productId')
+                shortage_qty = item.get('shortage') or item.get('delta') or 0
+                if product_id:
+                    context_parts.append(f"  - {product_id}: {shortage_qty} units short")
+
+    # Add high-demand products
+    high_demand = data.get('highDemandProducts', [])
+    if high_demand:
+        products = ', '.join(p.get('productId', '') for p in high_demand[:3] if isinstance(p, dict))
+        if products:
+            context_parts.append(f"\nHigh-Demand Products: {products}")
+
+    # Add financial impact
+    revenue_at_risk = data.get('revenueAtRisk')
+    if revenue_at_risk:
+        context_parts.append(f"\nRevenue at Risk: ${revenue_at_risk:,.2f}")
+
+    demand_trend = data.get('demandTrend')
+    if demand_trend:
+        context_parts.append(f"\nDemand Trend: {demand_trend}")
+
+    return description, owner, context_parts
+
+
+def _template_notification_draft(action_or_approval: Dict[str, Any], notification_type: str) -> Dict[str, str]:
+    """Deterministic notification draft built from the same details the LLM prompt uses."""
+    description, owner, context_parts = _notification_context(action_or_approval)
+    label = 'Approval requested' if notification_type == 'approval' else 'Action ready'
+    body_lines = [
+        f"Dear {owner},",
+        "",
+        f"SupplySense has prepared the following {notification_type}:",
+        "",
+        *[line.strip('\n') for line in context_parts],
+        "",
+        "Next Steps:",
+        "- Review the details above and confirm the plan with the affected teams",
+        "- Record the outcome in the SupplySense console",
+        "",
+        "Best regards,",
+        "SupplySense AI Platform",
+    ]
+    return {
+        'subject': f"[SupplySense] {label}: {description}"[:80],
+        'body': '\n'.join(body_lines),
+    }
+
+
 def _generate_notification_draft(action_or_approval: Dict[str, Any], notification_type: str) -> Optional[Dict[str, str]]:
     """
     Generate notification draft using LLM for actions/approvals.
-    This is called by the orchestrator to pre-draft notifications.
+    Runs on the notification pool; see _queue_notification_draft.
     """
     try:
-        description = action_or_approval.get('description') or action_or_approval.get('title', '')
-        owner = action_or_approval.get('owner') or action_or_approval.get('requires', 'Team')
-        data = action_or_approval.get('data') or action_or_approval.get('details') or {}
-        
-        # Build context
-        context_parts = [f"Action: {description}", f"Owner: {owner}"]
-        
-        # Add shortage details
-        shortages = data.get('shortages', [])
-        if shortages:
-            context_parts.append(f"\nShortage Details:")
-            for item in shortages[:5]:
-                if isinstance(item, dict):
-                    product_id = item.get('productId')
-                    shortage_qty = item.get('shortage') or item.get('delta') or 0
-                    if product_id:
-                        context_parts.append(f"  - {product_id}: {shortage_qty} units short")
-        
-        # Add high-demand products
-        high_demand = data.get('highDemandProducts', [])
-        if high_demand:
-            products = ', '.join(p.get('productId', '') for p in high_demand[:3] if isinstance(p, dict))
-            if products:
-                context_parts.append(f"\nHigh-Demand Products: {products}")
-        
-        # Add financial impact
-        revenue_at_risk = data.get('revenueAtRisk')
-        if revenue_at_risk:
-            context_parts.append(f"\nRevenue at Risk: ${revenue_at_risk:,.2f}")
-        
-        demand_trend = data.get('demandTrend')
-        if demand_trend:
-            context_parts.append(f"\nDemand Trend: {demand_trend}")
-        
+        description, owner, context_parts = _notification_context(action_or_approval)
         context_str = '\n'.join(context_parts)
         
         # Create prompt for notification
@@ -2848,8 +4015,7 @@ Respond ONLY with JSON:
 
 Be specific and include actual SKU IDs and quantities."""
 
-        # Use the narrative agent to generate
-        response = _agent_narrative(prompt)
+        response = _worker_agent('notification')(prompt)
         text = response.message["content"][0]["text"]
         
         # Clean and parse
@@ -2870,6 +4036,186 @@ Be specific and include actual SKU IDs and quantities."""
     return None
 
 
+_notification_pool = ThreadPoolExecutor(max_workers=NOTIFICATION_DRAFT_WORKERS, thread_name_prefix='notification-draft')
+_notification_cache = TTLCache(
+    maxsize=int(os.environ.get('SUPPLYSENSE_NOTIFICATION_CACHE_MAX_ENTRIES', '256')),
+    ttl=float(os.environ.get('SUPPLYSENSE_NOTIFICATION_CACHE_TTL_SECONDS', '3600')),
+)
+_notification_lock = threading.Lock()
+# cache key -> (session ID, action/approval ID) rows waiting for the draft to be attached
+_notification_inflight: Dict[Tuple[str, str], set] = {}
+_events_topic_arns: Dict[str, str] = {}
+
+
+def _notification_key(action_or_approval: Dict[str, Any], notification_type: str) -> Tuple[str, str]:
+    """Key drafts by type and the details they describe (IDs are unique per response)."""
+    content = {
+        field: action_or_approval.get(field)
+        for field in ('description', 'title', 'owner', 'requires', 'data', 'details')
+    }
+    digest = hashlib.sha256(json.dumps(content, sort_keys=True, default=str).encode('utf-8')).hexdigest()[:16]
+    return notification_type, digest
+
+
+def _events_topic_arn(notification_type: str) -> Optional[str]:
+    """SNS topic for action/approval events: the env override, else the chat stack's topic name."""
+    configured = APPROVAL_EVENTS_TOPIC_ARN if notification_type == 'approval' else ACTION_EVENTS_TOPIC_ARN
+    if configured:
+        return configured
+    if notification_type not in _events_topic_arns:
+        try:
+            account = boto3.client('sts').get_caller_identity()['Account']
+        except Exception as e:
+            logger.warning(f"Unable to resolve {notification_type} events topic: {str(e)}")
+            return None
+        region = sns.meta.region_name
+        _events_topic_arns[notification_type] = (
+            f"arn:aws:sns:{region}:{account}:supplysense-{notification_type}-events-{account}-{region}"
+        )
+    return _events_topic_arns[notification_type]
+
+
+def _publish_notification_drafted(notification_type: str, item_id: str, session_id: str, notification: Dict[str, str]) -> None:
+    """Send the attached draft as a follow-up event; the recorded event carried the template."""
+    topic_arn = _events_topic_arn(notification_type)
+    if not topic_arn:
+        return
+    event_type = f"{notification_type.upper()}_NOTIFICATION_DRAFTED"
+    try:
+        sns.publish(
+            TopicArn=topic_arn,
+            Subject=notification['subject'][:100],
+            Message=notification['body'],
+            MessageAttributes={
+                'eventType': {'DataType': 'String', 'StringValue': event_type},
+                'sessionId': {'DataType': 'String', 'StringValue': session_id},
+                f"{notification_type}Id": {'DataType': 'String', 'StringValue': item_id},
+            },
+        )
+        logger.info(f"Published {event_type} for {item_id} ({session_id})")
+    except Exception as e:
+        logger.warning(f"Failed to publish {event_type} for {item_id}: {str(e)}")
+
+
+def _retry_attach_later(delay: float, *args: Any) -> None:
+    """Re-queue an attach on the drafting pool after delay, without holding a worker meanwhile."""
+    def _requeue() -> None:
+        try:
+            _notification_pool.submit(_attach_notification_draft, *args)
+        except RuntimeError as e:  # pool shut down
+            logger.warning(f"Notification attach abandoned: {str(e)}")
+
+    timer = threading.Timer(delay, _requeue)
+    timer.daemon = True
+    timer.start()
+
+
+def _attach_notification_draft(
+    notification_type: str,
+    item_id: str,
+    session_id: str,
+    notification: Dict[str, str],
+    attempt: int = 0,
+) -> None:
+    """Write a draft onto the stored action/approval row and announce it.
+
+    The chat service persists the row after the response is returned, so a missing row is
+    retried with backoff (re-queued on the pool, not slept on) before keeping the template.
+    """
+    if notification_type == 'approval':
+        table = dynamodb.Table(APPROVALS_TABLE_NAME)
+        key = {'PK': f"SESSION#{session_id}", 'SK': f"APPROVAL#{item_id}"}
+    else:
+        table = dynamodb.Table(ACTIONS_TABLE_NAME)
+        key = {'PK': f"SESSION#{session_id}", 'SK': f"ACTION#{item_id}"}
+
+    try:
+        table.update_item(
+            Key=key,
+            UpdateExpression=(
+                'SET notificationSubject = :subject, notificationBody = :body, '
+                'notificationSource = :source, #payload.#notification = :notification, '
+                '#payload.#source = :source'
+            ),
+            ConditionExpression='attribute_exists(PK) AND attribute_exists(#payload)',
+            ExpressionAttributeNames={'#payload': 'payload', '#notification': 'notification', '#source': 'notificationSource'},
+            ExpressionAttributeValues={
+                ':subject': notification['subject'],
+                ':body': notification['body'],
+                ':source': 'llm',
+                ':notification': notification,
+            },
+        )
+    except ClientError as e:
+        if e.response.get('Error', {}).get('Code') != 'ConditionalCheckFailedException':
+            logger.warning(f"Failed to attach notification draft to {notification_type} {item_id}: {str(e)}")
+            return
+        if attempt + 1 >= NOTIFICATION_ATTACH_ATTEMPTS:
+            logger.info(f"{notification_type} {item_id} was never persisted for {session_id}; keeping the template draft")
+            return
+        # Row not persisted yet
+        _retry_attach_later(min(8.0, 0.5 * (2 ** attempt)), notification_type, item_id, session_id, notification, attempt + 1)
+        return
+
+    logger.info(f"Attached notification draft to {notification_type} {item_id} ({session_id})")
+    _publish_notification_drafted(notification_type, item_id, session_id, notification)
+
+
+def _draft_notification_in_background(
+    key: Tuple[str, str],
+    action_or_approval: Dict[str, Any],
+    notification_type: str,
+) -> None:
+    notification = None
+    try:
+        notification = _generate_notification_draft(action_or_approval, notification_type)
+        if notification:
+            _notification_cache.set(key, notification)
+    finally:
+        with _notification_lock:
+            targets = _notification_inflight.pop(key, set())
+    if notification:
+        for session_id, item_id in targets:
+            _attach_notification_draft(notification_type, item_id, session_id, notification)
+
+
+def _queue_notification_draft(
+    action_or_approval: Dict[str, Any],
+    notification_type: str,
+    session_id: Optional[str],
+) -> Tuple[Dict[str, str], str]:
+    """Return (draft, source) without waiting on the LLM.
+
+    A cached LLM draft is returned directly ('llm'). Otherwise the template draft is
+    returned ('pending') and the LLM draft is generated on the notification pool, then
+    attached to the stored row and published as a follow-up event.
+    """
+    key = _notification_key(action_or_approval, notification_type)
+    cached = _notification_cache.get(key)
+    if cached:
+        return cached, 'llm'
+
+    item_id = str(action_or_approval.get('id') or '')
+    with _notification_lock:
+        waiting = _notification_inflight.get(key)
+        submit = waiting is None
+        if submit:
+            waiting = _notification_inflight[key] = set()
+        if session_id and item_id:
+            waiting.add((session_id, item_id))
+    if submit:
+        try:
+            _notification_pool.submit(
+                _draft_notification_in_background, key, copy.deepcopy(action_or_approval), notification_type
+            )
+        except RuntimeError as e:  # pool shut down
+            logger.warning(f"Notification drafting unavailable: {str(e)}")
+            with _notification_lock:
+                _notification_inflight.pop(key, None)
+            return _template_notification_draft(action_or_approval, notification_type), 'template'
+    return _template_notification_draft(action_or_approval, notification_type), 'pending'
+
+
 def _build_agent(*, with_tools: bool = True) -> Agent:
     """Build the Orchestrator Agent."""
     model_id = os.getenv("BEDROCK_MODEL_ID", "amazon.nova-pro-v1:0")
@@ -2895,8 +4241,67 @@ Be strategic, comprehensive, and action-oriented."""
     tools = [orchestrate_fulfillment, create_action_plan, synthesize_multi_agent_response] if with_tools else []
     return Agent(model=model, tools=tools, system_prompt=system_prompt)
 
-_agent_planner = _build_agent(with_tools=False)
-_agent_narrative = _build_agent(with_tools=False)
+
+_worker_agents = threading.local()
+
+
+def _worker_agent(role: str) -> Agent:
+    """Per-worker agent for one LLM role (planner, narrative, notification), starting from no messages.
+
+    strands agents reject overlapping invocations and keep every exchange in their history, so
+    concurrent requests each get their worker's own agent and no prompt carries earlier calls.
+    """
+    agents = getattr(_worker_agents, 'agents', None)
+    if agents is None:
+        agents = _worker_agents.agents = {}
+    agent = agents.get(role)
+    if agent is None:
+        agent = agents[role] = _build_agent(with_tools=False)
+    agent.messages.clear()
+    return agent
+
+
+_STREAM_DONE = object()
+
+
+async def _stream_orchestrated_flow(
+    query: str,
+    session_id: str,
+    bearer_token: Optional[str] = None,
+) -> AsyncIterator[Dict[str, Any]]:
+    """Yield orchestration events as they occur, ending with a fused_response (or error) event."""
+    pending: "asyncio.Queue[Any]" = asyncio.Queue()
+
+    async def _produce() -> None:
+        try:
+            fused = await _run_orchestrated_flow(query, session_id, bearer_token=bearer_token, on_event=pending.put_nowait)
+            fused['mode'] = 'orchestrator_conversation'
+            pending.put_nowait({
+                'type': 'fused_response',
+                'response': fused,
+                'timestamp': datetime.now(timezone.utc).isoformat() + 'Z',
+            })
+        except Exception as exc:
+            logger.error("Streaming orchestration failed: %s", exc, exc_info=True)
+            pending.put_nowait({
+                'type': 'error',
+                'error': str(exc),
+                'timestamp': datetime.now(timezone.utc).isoformat() + 'Z',
+            })
+        finally:
+            pending.put_nowait(_STREAM_DONE)
+
+    producer = asyncio.ensure_future(_produce())
+    try:
+        while True:
+            event = await pending.get()
+            if event is _STREAM_DONE:
+                return
+            yield event
+    finally:
+        # Client disconnected mid-stream: stop the in-flight specialists and synthesis
+        producer.cancel()
+
 
 def _normalize_bearer_token(token: Optional[str]) -> Optional[str]:
     if not token:
@@ -2908,8 +4313,8 @@ def _normalize_bearer_token(token: Optional[str]) -> Optional[str]:
 
 
 @app.entrypoint
-def orchestrator_agent(request: RequestContext) -> Dict[str, Any]:
-    """AgentCore entrypoint for orchestrator agent."""
+async def orchestrator_agent(request: RequestContext) -> Dict[str, Any] | AsyncIterator[Dict[str, Any]]:
+    """AgentCore entrypoint for orchestrator agent; runs on the app's event loop."""
     prompt = (request.get("prompt") or request.get("input") or "").strip()
     logger.info("Runtime received prompt: %s", prompt)
     if not prompt:
@@ -2935,28 +4340,23 @@ def orchestrator_agent(request: RequestContext) -> Dict[str, Any]:
         maybe_token = metadata.get("bearer_token") or metadata.get("token")
         if isinstance(maybe_token, str):
             bearer_token = _normalize_bearer_token(maybe_token)
+    _request_bearer_token.set(bearer_token)
     try:
         logger.debug("Request context keys: %s", list(request.keys()))
     except Exception:  # pragma: no cover
         logger.debug("Unable to introspect request context keys")
+    if isinstance(structured_payload, dict) and structured_payload.get('mode') == 'invalidate_specialist_cache':
+        agent_type = structured_payload.get('agentType')
+        invalidate_specialist_cache(agent_type)
+        return {
+            "brand": "SupplySense",
+            "message": json.dumps({'invalidated': agent_type or 'all', 'cache': _specialist_cache.stats()}),
+        }
     if isinstance(structured_payload, dict) and structured_payload.get('mode') == 'multi_agent_synthesis':
-        fused = _build_fused_response(structured_payload)
+        fused = await _offload(_build_fused_response, structured_payload)
         fused['mode'] = 'multi_agent_synthesis'
-
-        narrative_prompt = (
-            "You are the SupplySense Orchestrator Agent. Using the structured decision data below, "
-            "craft a concise executive briefing that includes a leading statement, bullet summaries for each agent, "
-            "and a short next-steps section. Stay factual and action-oriented. "
-            f"\n\nStructured data:\n{json.dumps(fused, indent=2)}"
-        )
-        response = _agent_narrative(narrative_prompt)
-        text = response.message["content"][0]["text"]
-        logger.info("Runtime synthesis narrative generated successfully")
-
-        clean_text = re.sub(r'<(thinking|analysis|response)>.*?</\1>', '', text, flags=re.DOTALL | re.IGNORECASE).strip()
-        clean_text = re.sub(r'</?(thinking|analysis|response)>', '', clean_text, flags=re.IGNORECASE).strip()
-
-        fused['narrative'] = clean_text
+        await _synthesize_briefing(fused, structured_payload.get('userQuery') or '')
+        logger.info("Runtime synthesis narrative generated (%s)", fused['synthesis'])
         return {
             "brand": "SupplySense",
             "message": json.dumps(fused),
@@ -2964,18 +4364,10 @@ def orchestrator_agent(request: RequestContext) -> Dict[str, Any]:
     if isinstance(structured_payload, dict) and structured_payload.get('mode') == 'orchestrator_conversation':
         query = structured_payload.get('query') or prompt
         session_id = structured_payload.get('sessionId') or f"session-{datetime.now(timezone.utc).timestamp()}"
-        fused = _run_orchestrated_flow(query, session_id, bearer_token=bearer_token)
-        narrative_prompt = (
-            "You are the SupplySense Orchestrator Agent. Using the structured decision data below, "
-            "craft a concise executive briefing with a leading statement, bullet summaries per agent, "
-            "and clear next steps.\n\nStructured data:\n"
-            f"{json.dumps(fused, indent=2)}"
-        )
-        response = _agent_narrative(narrative_prompt)
-        text = response.message["content"][0]["text"]
-        clean_text = re.sub(r'<(thinking|analysis|response)>.*?</\1>', '', text, flags=re.DOTALL | re.IGNORECASE).strip()
-        clean_text = re.sub(r'</?(thinking|analysis|response)>', '', clean_text, flags=re.IGNORECASE).strip()
-        fused['narrative'] = clean_text
+        if structured_payload.get('stream'):
+            # Streamed back as SSE: plan, agent_start/agent_result as they happen, then the fused response
+            return _stream_orchestrated_flow(query, session_id, bearer_token)
+        fused = await _run_orchestrated_flow(query, session_id, bearer_token=bearer_token)
         fused['mode'] = 'orchestrator_conversation'
         return {
             "brand": "SupplySense",
@@ -2983,18 +4375,7 @@ def orchestrator_agent(request: RequestContext) -> Dict[str, Any]:
         }
 
     session_id = request.get("sessionId") or f"session-{datetime.now(timezone.utc).timestamp()}"
-    fused = _run_orchestrated_flow(prompt, session_id, bearer_token=bearer_token)
-    narrative_prompt = (
-        "You are the SupplySense Orchestrator Agent. Using the structured decision data below, "
-        "craft a concise executive briefing with a leading statement, bullet summaries per agent, "
-        "and clear next steps.\n\nStructured data:\n"
-        f"{json.dumps(fused, indent=2)}"
-    )
-    response = _agent_narrative(narrative_prompt)
-    text = response.message["content"][0]["text"]
-    clean_text = re.sub(r'<(thinking|analysis|response)>.*?</\1>', '', text, flags=re.DOTALL | re.IGNORECASE).strip()
-    clean_text = re.sub(r'</?(thinking|analysis|response)>', '', clean_text, flags=re.IGNORECASE).strip()
-    fused['narrative'] = clean_text
+    fused = await _run_orchestrated_flow(prompt, session_id, bearer_token=bearer_token)
     fused['mode'] = 'orchestrator_conversation'
 
     return {
@@ -11,6 +11,16 @@ from strands import Agent, tool
 from strands.models import BedrockModel
 import boto3
 
+from common.dynamo import scan_all
+from common.inventory import get_inventory_snapshot
+from common.orders import (
+    PENDING_DEMAND_SUMMARY_KEY,
+    UNRESOLVED_DEMAND_KEY,
+    load_pending_demand,
+    query_orders_by_status,
+    query_pending_order_ids,
+)
+
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
@@ -58,7 +68,8 @@ def _normalize_order_items(order: Dict[str, Any]) -> List[Dict[str, int]]:
 
 def _compute_inventory_exposure(
     inventory_data: List[Dict[str, Any]],
-    orders_data: List[Dict[str, Any]],
+    pending_orders: List[Dict[str, Any]],
+    pending_demand: Dict[str, Dict[str, Any]] | None = None,
 ) -> Dict[str, Any]:
     inventory_by_product: Dict[str, int] = {}
     for item in inventory_data:
@@ -72,19 +83,27 @@ def _compute_inventory_exposure(
     product_revenue: Dict[str, float] = {}
     product_to_orders: Dict[str, List[str]] = {}
 
-    for order in orders_data:
-        order_id = order.get('orderId', 'UNKNOWN')
-        normalized_items = _normalize_order_items(order)
-        total_qty = sum(item['quantity'] for item in normalized_items) or 1
-        order_value = float(order.get('value') or 0)
-        unit_price_hint = (order_value / total_qty) if total_qty else 50.0
-
-        for item in normalized_items:
-            product_id = item['productId']
-            quantity = item['quantity']
-            product_demand[product_id] = product_demand.get(product_id, 0) + quantity
-            product_revenue[product_id] = product_revenue.get(product_id, 0.0) + quantity * unit_price_hint
-            product_to_orders.setdefault(product_id, []).append(order_id)
+    if pending_demand is not None:
+        # Stream-maintained aggregate: O(SKUs) instead of walking every order line
+        for product_id, row in pending_demand.items():
+            if product_id in (UNRESOLVED_DEMAND_KEY, PENDING_DEMAND_SUMMARY_KEY):
+                continue
+            product_demand[product_id] = row['pendingUnits']
+            product_revenue[product_id] = row['pendingValue']
+    else:
+        for order in pending_orders:
+            order_id = order.get('orderId', 'UNKNOWN')
+            normalized_items = _normalize_order_items(order)
+            total_qty = sum(item['quantity'] for item in normalized_items) or 1
+            order_value = float(order.get('value') or 0)
+            unit_price_hint = (order_value / total_qty) if total_qty else 50.0
+
+            for item in normalized_items:
+                product_id = item['productId']
+                quantity = item['quantity']
+                product_demand[product_id] = product_demand.get(product_id, 0) + quantity
+                product_revenue[product_id] = product_revenue.get(product_id, 0.0) + quantity * unit_price_hint
+                product_to_orders.setdefault(product_id, []).append(order_id)
 
     shortages: List[Dict[str, Any]] = []
     orders_impacted: set[str] = set()
@@ -103,7 +122,12 @@ def _compute_inventory_exposure(
                 'available': available,
                 'shortage': shortage,
             })
-            orders_impacted.update(product_to_orders.get(product_id, []))
+
+    if pending_demand is not None and shortages:
+        # Only the short SKUs need their orders; look those up per SKU
+        product_to_orders = query_pending_order_ids(dynamodb, [shortage['productId'] for shortage in shortages])
+    for shortage in shortages:
+        orders_impacted.update(product_to_orders.get(shortage['productId'], []))
 
     return {
         'shortages': shortages,
@@ -151,18 +175,20 @@ def assess_supply_chain_risks(timeframe: str = "weekly", focus_area: str = "all"
         orders_table = dynamodb.Table('supplysense-orders')
         
         # Scan for risk assessment data
-        inventory_data = inventory_table.scan().get('Items', [])
-        suppliers_data = suppliers_table.scan().get('Items', [])
-        orders_data = orders_table.scan().get('Items', [])
+        inventory_data = get_inventory_snapshot(inventory_table)
+        suppliers_data = scan_all(suppliers_table)
+        # Pending orders via the status index; also rebuilds demand when the aggregate is unavailable
+        pending_orders = query_orders_by_status(orders_table, 'pending')
         
         # Compute exposures
-        inventory_exposure = _compute_inventory_exposure(inventory_data, orders_data)
-        logistics_exposure = _compute_logistics_exposure(orders_data)
+        pending_demand = load_pending_demand(dynamodb)
+        inventory_exposure = _compute_inventory_exposure(inventory_data, pending_orders, pending_demand)
+        logistics_exposure = _compute_logistics_exposure(pending_orders)
 
         # Assess different risk categories
         inventory_risks = assess_inventory_risks(inventory_data, inventory_exposure)
         supplier_risks = assess_supplier_risks(suppliers_data)
-        demand_risks = assess_demand_risks(orders_data)
+        demand_risks = assess_demand_risks(pending_orders)
         logistics_risks = assess_logistics_risks(logistics_exposure)
         
         # Calculate overall risk score
@@ -6,11 +6,13 @@ Uses the AgentCore HTTP client pattern for agent invocation
 import json
 import logging
 import os
+import queue
 import re
+import threading
 from datetime import datetime
 from decimal import Decimal
 from statistics import mean
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 from uuid import uuid4
 
 import boto3
@@ -20,7 +22,10 @@ from flask import Flask, Response, jsonify, request, stream_with_context
 from flask_cors import CORS
 
 # Import AgentCore starter toolkit
-from bedrock_agentcore_starter_toolkit.services.runtime import HttpBedrockAgentCoreClient, generate_session_id
+from bedrock_agentcore_starter_toolkit.services.runtime import generate_session_id
+
+from common.agentcore_http import PooledAgentCoreClient
+from common.runtime_arns import RuntimeArnResolver
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -33,11 +38,18 @@ CORS(app, resources={r"/*": {"origins": "*"}})
 region = os.getenv('AWS_REGION', 'us-east-1')
 cloudformation = boto3.client('cloudformation', region_name=region)
 ssm = boto3.client('ssm', region_name=region)
+# Agent runtime ARNs from /supplysense/agents/*/invoke-arn, refreshed off the request path
+runtime_arns = RuntimeArnResolver(ssm)
 dynamodb = boto3.resource('dynamodb', region_name=region)
 sns_client = boto3.client('sns', region_name=region)
 
-# Initialize AgentCore HTTP client
-http_client = HttpBedrockAgentCoreClient(region)
+# AgentCore HTTP client: one keep-alive pool shared by every chat session in this worker
+http_client = PooledAgentCoreClient(region)
+
+# Seconds without orchestrator events before an SSE keep-alive comment is sent
+STREAM_KEEPALIVE_SECONDS = float(os.getenv('STREAM_KEEPALIVE_SECONDS', '15'))
+# Orchestrator events buffered ahead of a slow client before the reader waits
+STREAM_QUEUE_SIZE = 256
 
 actions_table_name = os.getenv('ACTIONS_TABLE_NAME', 'supplysense-actions')
 approvals_table_name = os.getenv('APPROVALS_TABLE_NAME', 'supplysense-approvals')
@@ -377,6 +389,9 @@ def persist_actions_and_approvals(session_id: str, user_id: str, final_response:
                 record['notificationSubject'] = notification.get('subject')
                 record['notificationBody'] = notification.get('body')
                 normalized['notification'] = notification
+            if normalized.get('notificationSource'):
+                # 'pending': the orchestrator attaches its drafted notification later and publishes a follow-up event
+                record['notificationSource'] = normalized['notificationSource']
             try:
                 actions_table.put_item(Item=_to_dynamo_item(record))
                 _publish_action_event('ACTION_RECORDED', _from_dynamo_value(record))
@@ -416,6 +431,8 @@ def persist_actions_and_approvals(session_id: str, user_id: str, final_response:
                 record['notificationSubject'] = notification.get('subject')
                 record['notificationBody'] = notification.get('body')
                 normalized['notification'] = notification
+            if normalized.get('notificationSource'):
+                record['notificationSource'] = normalized['notificationSource']
             try:
                 approvals_table.put_item(Item=_to_dynamo_item(record))
                 _publish_approval_event('APPROVAL_REQUESTED', _from_dynamo_value(record))
@@ -703,31 +720,9 @@ def structure_agent_response(agent_type: str, response_text: str) -> Dict[str, A
     }
 
 
-def get_runtime_endpoint_arns():
-    """Get runtime ARNs from SSM (simple approach)."""
-    try:
-        agent_endpoints = {}
-        for agent_type in ['inventory', 'demand', 'logistics', 'risk', 'orchestrator']:
-            try:
-                # Get the endpoint ARN from SSM and strip /runtime-endpoint/DEFAULT
-                endpoint_param = ssm.get_parameter(Name=f'/supplysense/agents/{agent_type}/invoke-arn')
-                endpoint_arn = endpoint_param['Parameter']['Value']
-                
-                # Extract runtime ARN by stripping /runtime-endpoint/DEFAULT
-                if '/runtime-endpoint/' in endpoint_arn:
-                    runtime_arn = endpoint_arn.split('/runtime-endpoint/')[0]
-                else:
-                    runtime_arn = endpoint_arn
-                
-                agent_endpoints[agent_type] = runtime_arn
-                logger.info(f"Found {agent_type} runtime ARN: {runtime_arn}")
-            except Exception as e:
-                logger.warning(f"Could not get {agent_type} endpoint: {e}")
-        
-        return agent_endpoints
-    except Exception as e:
-        logger.error(f"Error getting runtime endpoints: {e}")
-        return {}
+def get_runtime_endpoint_arns() -> Dict[str, str]:
+    """Runtime ARNs per agent type, served from the background-refreshed resolver."""
+    return runtime_arns.all()
 
 
 def invoke_agent(agent_type: str, query: Any, session_id: str, runtime_arn: str, bearer_token: str = None) -> Dict[str, Any]:
@@ -735,7 +730,7 @@ def invoke_agent(agent_type: str, query: Any, session_id: str, runtime_arn: str,
     try:
         logger.info(f"Invoking {agent_type} agent with runtime ARN: {runtime_arn}")
         
-        # Use HttpBedrockAgentCoreClient for agent invocation
+        # Use the pooled AgentCore client for agent invocation
         if isinstance(query, dict):
             payload = query
         else:
@@ -781,6 +776,73 @@ def invoke_agent(agent_type: str, query: Any, session_id: str, runtime_arn: str,
         }
 
 
+def _agent_events(response: Any) -> Iterator[Dict[str, Any]]:
+    """Yield the JSON events of an AgentCore SSE response.
+
+    A runtime that answers with a single JSON body yields one fused_response event carrying the raw text.
+    """
+    if 'text/event-stream' not in response.headers.get('content-type', ''):
+        yield {'type': 'fused_response', 'raw': response.text}
+        return
+    for line in response.iter_lines(decode_unicode=True):
+        if not line or not line.startswith('data:'):
+            continue
+        event = _safe_json_loads(line[5:].strip())
+        if isinstance(event, dict):
+            yield event
+        else:
+            logger.debug("Ignoring non-JSON stream chunk: %s", line[:200])
+
+
+class _AgentStreamRelay:
+    """Reads an agent event stream on a daemon thread into a bounded queue.
+
+    Messages are ('event', event), ('done', None) or ('error', exc). close() stops the
+    reader, including one blocked on the socket, so an abandoned client stops the stream.
+    """
+
+    def __init__(self, runtime_arn: str, payload: Dict[str, Any], session_id: str, bearer_token: Optional[str]):
+        self.messages: "queue.Queue[tuple[str, Any]]" = queue.Queue(maxsize=STREAM_QUEUE_SIZE)
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._response: Any = None
+        self._args = (runtime_arn, payload, session_id, bearer_token)
+        threading.Thread(target=self._read, daemon=True).start()
+
+    def _put(self, message: Tuple[str, Any]) -> bool:
+        while not self._stop.is_set():
+            try:
+                self.messages.put(message, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _read(self) -> None:
+        runtime_arn, payload, session_id, bearer_token = self._args
+        try:
+            with http_client.stream(runtime_arn, payload, session_id, bearer_token, timeout=900) as response:
+                with self._lock:
+                    self._response = response
+                if self._stop.is_set():
+                    return
+                for event in _agent_events(response):
+                    if not self._put(('event', event)):
+                        return
+            self._put(('done', None))
+        except Exception as exc:
+            if not self._stop.is_set():
+                self._put(('error', exc))
+
+    def close(self) -> None:
+        self._stop.set()
+        with self._lock:
+            response = self._response
+        if response is not None:
+            # The reader thread closes the response as it unwinds
+            http_client.abort(response)
+
+
 @app.route('/health', methods=['GET'])
 @app.route('/api/health', methods=['GET'])
 def health():
@@ -788,6 +850,7 @@ def health():
     return {
         'status': 'healthy',
         'service': 'SupplySense Chat Orchestration Service (Python)',
+        'agentCorePool': http_client.stats(),
         'timestamp': datetime.utcnow().isoformat() + 'Z'
     }
 
@@ -828,6 +891,7 @@ def chat():
             orchestrator_payload: Dict[str, Any] = {
                 'prompt': json.dumps({
                     'mode': 'orchestrator_conversation',
+                    'stream': True,
                     'query': query,
                     'sessionId': session_id,
                     'userId': user_id,
@@ -835,72 +899,55 @@ def chat():
                 })
             }
 
-            import threading
-            import queue
-            import time
-
-            result_queue: "queue.Queue[tuple[str, Any]]" = queue.Queue()
-
-            def run_orchestrator():
-                try:
-                    result = invoke_agent('orchestrator', orchestrator_payload, session_id, orchestrator_arn, bearer_token)
-                    result_queue.put(('result', result))
-                except Exception as exc:
-                    result_queue.put(('error', exc))
-
-            worker = threading.Thread(target=run_orchestrator, daemon=True)
-            worker.start()
-
-            orchestrator_result = None
-            progress_messages = [
-                'Analyzing inventory signals...',
-                'Reviewing order backlog...',
-                'Assessing demand trends...',
-                'Evaluating logistics capacity...',
-                'Checking supplier reliability...',
-                'Quantifying overall risk...',
-                'Reconciling agent findings...',
-                'Drafting recommended actions...',
-                'Preparing executive briefing...',
-                'Finalizing multi-agent response...'
-            ]
-            progress_index = 0
-            while True:
-                try:
-                    message_type, payload_value = result_queue.get(timeout=8)
-                except queue.Empty:
-                    heartbeat_message = progress_messages[progress_index % len(progress_messages)]
-                    progress_index += 1
-                    heartbeat = {
-                        'type': 'status',
-                        'message': heartbeat_message,
-                        'timestamp': datetime.utcnow().isoformat() + 'Z'
-                    }
-                    yield f"data: {json.dumps(heartbeat)}\n\n"
-                    continue
-
-                if message_type == 'result':
-                    orchestrator_result = payload_value
-                    break
-                if message_type == 'error':
-                    raise payload_value
-
-            structured_response = orchestrator_result.get('structured') or {}
-            events = []
-            if isinstance(structured_response, dict):
-                events = structured_response.get('events') or []
-            for event in events:
-                try:
-                    event_payload = dict(event)
+            # Relay orchestrator events from a reader thread so idle gaps can carry keep-alives
+            relay = _AgentStreamRelay(orchestrator_arn, orchestrator_payload, session_id, bearer_token)
+            try:
+                events: List[Dict[str, Any]] = []
+                fused_event: Optional[Dict[str, Any]] = None
+                while True:
+                    try:
+                        message_type, payload_value = relay.messages.get(timeout=STREAM_KEEPALIVE_SECONDS)
+                    except queue.Empty:
+                        yield ": keep-alive\n\n"
+                        continue
+
+                    if message_type == 'done':
+                        break
+                    if message_type == 'error':
+                        raise payload_value
+
+                    event_type = payload_value.get('type')
+                    if event_type == 'fused_response':
+                        fused_event = payload_value
+                        continue
+                    if event_type == 'error':
+                        raise RuntimeError(payload_value.get('error') or 'Orchestrator failed')
+                    event_payload = dict(payload_value)
                     event_payload.setdefault('timestamp', datetime.utcnow().isoformat() + 'Z')
+                    events.append(event_payload)
                     yield f"data: {json.dumps(event_payload)}\n\n"
-                except Exception as exc:
-                    logger.warning("Failed to stream orchestrator event: %s", exc)
-
-            if isinstance(structured_response, dict):
-                fusion_result = structured_response.get('fusion') or structured_response
+            finally:
+                # Also runs when the client disconnects and the generator is closed
+                relay.close()
+
+            if not fused_event:
+                raise RuntimeError('Orchestrator stream ended without a response')
+            if isinstance(fused_event.get('response'), dict):
+                fusion_result = fused_event['response']
             else:
-                fusion_result = structured_response
+                # Non-streaming runtime: a single JSON body wrapping the fused response
+                structured_response = structure_agent_response('orchestrator', fused_event.get('raw') or '')
+                fusion_result = structured_response.get('fusion') or structured_response
+                if not events:
+                    # Nothing was relayed live, so replay the agent events before the final response
+                    for event in structured_response.get('events') or fusion_result.get('events') or []:
+                        try:
+                            event_payload = dict(event)
+                            event_payload.setdefault('timestamp', datetime.utcnow().isoformat() + 'Z')
+                            events.append(event_payload)
+                            yield f"data: {json.dumps(event_payload)}\n\n"
+                        except Exception as exc:
+                            logger.warning("Failed to stream orchestrator event: %s", exc)
 
             actions = fusion_result.get('actions') if isinstance(fusion_result, dict) else []
             approvals = fusion_result.get('approvals') if isinstance(fusion_result, dict) else []
@@ -908,7 +955,7 @@ def chat():
             narrative = fusion_result.get('narrative') if isinstance(fusion_result, dict) else None
             final_payload = {
                 'query': query,
-                'queryType': fusion_result.get('queryType') if isinstance(fusion_result, dict) else structured_response.get('queryType'),
+                'queryType': fusion_result.get('queryType') if isinstance(fusion_result, dict) else None,
                 'fusion': fusion_result,
                 'actions': actions,
                 'approvals': approvals,
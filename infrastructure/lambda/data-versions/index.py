@@ -0,0 +1,58 @@
+"""
+SupplySense Data Versions
+
+Consumes the inventory, logistics and suppliers DynamoDB streams and bumps a
+per-table version counter in supplysense-data-versions (PK source = table name).
+Readers combine these counters into a data-version token, so anything cached
+against an older token is ignored once the underlying data changes.
+
+The orders table is versioned by the order-rollups stream consumer, which keeps
+the orders stream at two readers.
+"""
+
+import logging
+import os
+from datetime import datetime, timezone
+from typing import Any, Dict, Tuple
+
+import boto3
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+DATA_VERSIONS_TABLE = os.environ.get('DATA_VERSIONS_TABLE', 'supplysense-data-versions')
+
+dynamodb = boto3.resource('dynamodb')
+versions_table = dynamodb.Table(DATA_VERSIONS_TABLE)
+
+
+def _source_table(record: Dict[str, Any]) -> str:
+    # arn:aws:dynamodb:<region>:<account>:table/<name>/stream/<label>
+    return record['eventSourceARN'].split(':table/', 1)[1].split('/', 1)[0]
+
+
+def bump_version(source: str, changes: int, sequence_number: str) -> None:
+    """Advance a source's version. Redelivered batches bump it again, which only invalidates early."""
+    versions_table.update_item(
+        Key={'source': source},
+        UpdateExpression='SET lastSequenceNumber = :seq, updatedAt = :ts ADD version :changes',
+        ExpressionAttributeValues={
+            ':seq': sequence_number,
+            ':ts': datetime.now(timezone.utc).isoformat(),
+            ':changes': changes,
+        },
+    )
+
+
+def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """Stream batch handler; one version bump per source table per batch."""
+    changes: Dict[str, Tuple[int, str]] = {}
+    for record in event.get('Records', []):
+        source = _source_table(record)
+        count, _ = changes.get(source, (0, ''))
+        changes[source] = (count + 1, record['dynamodb']['SequenceNumber'])
+
+    for source, (count, sequence_number) in changes.items():
+        bump_version(source, count, sequence_number)
+        logger.info(f"Bumped {source} data version by {count} (sequence {sequence_number})")
+    return {'sourcesUpdated': len(changes)}
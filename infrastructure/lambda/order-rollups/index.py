@@ -0,0 +1,380 @@
+"""
+SupplySense Order Rollups
+
+Consumes the supplysense-orders DynamoDB stream and maintains two order-history
+projections:
+
+- supplysense-order-daily-rollup, keyed by scope (ROLLUP_ALL, or PRODUCT#<productId>)
+  and day (YYYY-MM-DD). Each row carries orderCount, units and value (ALL rows also list
+  the productIds seen that day), so demand windows of any length become key-range
+  queries over days.
+- supplysense-order-lines, one row per (productId, order) keyed by productId and
+  lineKey ("<orderDate>#<orderId>"), so per-SKU order history is a date-range query.
+
+Per-order state lives in supplysense-order-rollup-orders: the (scope, day) contributions
+and order-line keys last applied for each order and the stream sequence number they came
+from, so rollup rows stay counters however many orders a day holds. Deleted orders keep an
+empty row until expiresAt, past the stream's 24h retention.
+
+It also bumps the orders version in supplysense-data-versions once per batch, so
+readers can tell when cached analyses are stale.
+
+Invoke with {"backfill": true} to seed both projections from existing orders. A completed
+backfill writes the BACKFILL_MARKER_SCOPE row to the rollup table; readers only trust either
+projection once it exists.
+"""
+
+import json
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Any, Dict, List, Set, Tuple
+
+import boto3
+from boto3.dynamodb.types import TypeDeserializer
+from botocore.exceptions import ClientError
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+ROLLUP_TABLE = os.environ.get('ROLLUP_TABLE', 'supplysense-order-daily-rollup')
+ORDERS_TABLE = os.environ.get('ORDERS_TABLE', 'supplysense-orders')
+# Orders the consumer cannot apply are parked here instead of blocking the shard
+FAILURE_QUEUE_URL = os.environ.get('FAILURE_QUEUE_URL', '')
+ORDER_STATE_TABLE = os.environ.get('ORDER_STATE_TABLE', 'supplysense-order-rollup-orders')
+ORDER_LINES_TABLE = os.environ.get('ORDER_LINES_TABLE', 'supplysense-order-lines')
+DATA_VERSIONS_TABLE = os.environ.get('DATA_VERSIONS_TABLE', 'supplysense-data-versions')
+ROLLUP_ALL = 'ALL'
+PRODUCT_SCOPE_PREFIX = 'PRODUCT#'
+# Row written once a backfill has seeded both projections from every order
+BACKFILL_MARKER_SCOPE = '#BACKFILL'
+BACKFILL_MARKER_DAY = '#'
+# Stream sequence numbers are at most 40 digits; padding keeps string comparison numeric
+SEQUENCE_WIDTH = 40
+BACKFILL_SEQUENCE = '0'
+# Emptied order state rows outlive the 24h stream retention before TTL removes them
+TOMBSTONE_TTL_SECONDS = 2 * 24 * 60 * 60
+# Re-reads of an order's state row when another writer changes it mid-apply
+MAX_APPLY_ATTEMPTS = 3
+_RETRYABLE_CANCELLATIONS = {'None', 'ConditionalCheckFailed', 'TransactionConflict'}
+# TransactWriteItems accepts at most this many actions
+MAX_TRANSACTION_ACTIONS = 100
+
+dynamodb = boto3.resource('dynamodb')
+rollup_table = dynamodb.Table(ROLLUP_TABLE)
+state_table = dynamodb.Table(ORDER_STATE_TABLE)
+versions_table = dynamodb.Table(DATA_VERSIONS_TABLE)
+# The resource's client (de)serializes attribute values, as Table calls do
+_client = dynamodb.meta.client
+_deserializer = TypeDeserializer()
+sqs = boto3.client('sqs')
+
+
+class OversizedOrderError(ValueError):
+    """An order change needs more writes than one transaction can hold."""
+
+
+def _to_int(value: Any) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _to_float(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _contributions(order: Dict[str, Any] | None) -> Dict[Tuple[str, str], Tuple[int, float]]:
+    """Map (scope, day) -> (units, value) for one order.
+
+    Units follow the demand agent's attribution: the order quantity counts toward the
+    global rollup and toward every product listed on the order.
+    """
+    if not order:
+        return {}
+    day = str(order.get('orderDate') or '')[:10]
+    if len(day) != 10:
+        return {}
+
+    units = _to_int(order.get('quantity', 0))
+    value = _to_float(order.get('value'))
+    contributions = {(ROLLUP_ALL, day): (units, value)}
+    for product_id in set(order.get('productIds') or []):
+        contributions[(f"{PRODUCT_SCOPE_PREFIX}{product_id}", day)] = (units, value)
+    return contributions
+
+
+def _rollup_update(scope: str, day: str, units: int, value: float, orders: int,
+                   product_ids: Set[str], timestamp: str) -> Dict[str, Any]:
+    """Transaction action adding one order's delta to a day row's counters."""
+    expression = 'SET updatedAt = :ts ADD orderCount :count, units :units, #value :value'
+    values: Dict[str, Any] = {
+        ':ts': timestamp,
+        ':count': orders,
+        ':units': units,
+        ':value': Decimal(str(round(value, 2))),
+    }
+    if product_ids:
+        # Products seen on this day, so readers can discover per-product scopes
+        expression += ', productIds :products'
+        values[':products'] = product_ids
+    return {'Update': {
+        'TableName': ROLLUP_TABLE,
+        'Key': {'scope': scope, 'day': day},
+        'UpdateExpression': expression,
+        'ExpressionAttributeNames': {'#value': 'value'},
+        'ExpressionAttributeValues': values,
+    }}
+
+
+def _state_put(order_id: str, parts: Dict[Tuple[str, str], Tuple[int, float]], line_keys: List[Tuple[str, str]],
+               sequence: str, state: Dict[str, Any] | None, timestamp: str) -> Dict[str, Any]:
+    """Transaction action replacing the order's state row, conditioned on the row that was read."""
+    item: Dict[str, Any] = {
+        'orderId': order_id,
+        'appliedSeq': sequence,
+        'contributions': [
+            {'scope': scope, 'day': day, 'units': units, 'value': Decimal(str(round(value, 2)))}
+            for (scope, day), (units, value) in sorted(parts.items())
+        ],
+        'lineKeys': [{'productId': product_id, 'lineKey': line_key} for product_id, line_key in sorted(line_keys)],
+        'updatedAt': timestamp,
+    }
+    if not parts and not line_keys:
+        item['expiresAt'] = int(time.time()) + TOMBSTONE_TTL_SECONDS
+    action: Dict[str, Any] = {'TableName': ORDER_STATE_TABLE, 'Item': item}
+    if state:
+        action['ConditionExpression'] = 'appliedSeq = :prev'
+        action['ExpressionAttributeValues'] = {':prev': state['appliedSeq']}
+    else:
+        action['ConditionExpression'] = 'attribute_not_exists(orderId)'
+    return {'Put': action}
+
+
+def _stored_contributions(state: Dict[str, Any] | None) -> Dict[Tuple[str, str], Tuple[int, float]]:
+    return {
+        (part['scope'], part['day']): (_to_int(part.get('units')), _to_float(part.get('value')))
+        for part in (state or {}).get('contributions') or []
+    }
+
+
+def _stored_line_keys(state: Dict[str, Any] | None) -> Set[Tuple[str, str]]:
+    return {(line['productId'], line['lineKey']) for line in (state or {}).get('lineKeys') or []}
+
+
+def _prune_day_product(product_id: str, day: str) -> None:
+    """Drop a product from a day's ALL row once no order on that day lists it.
+
+    The check and the delete run in one transaction, and an order adds a product to the ALL
+    row in the same transaction that counts it on the product row, so a concurrent add
+    either fails the check or lands after the delete.
+    """
+    try:
+        _client.transact_write_items(TransactItems=[
+            {'ConditionCheck': {
+                'TableName': ROLLUP_TABLE,
+                'Key': {'scope': f"{PRODUCT_SCOPE_PREFIX}{product_id}", 'day': day},
+                'ConditionExpression': 'attribute_not_exists(orderCount) OR orderCount <= :zero',
+                'ExpressionAttributeValues': {':zero': 0},
+            }},
+            {'Update': {
+                'TableName': ROLLUP_TABLE,
+                'Key': {'scope': ROLLUP_ALL, 'day': day},
+                'UpdateExpression': 'DELETE productIds :products',
+                'ExpressionAttributeValues': {':products': {product_id}},
+            }},
+        ])
+    except ClientError as e:
+        if e.response.get('Error', {}).get('Code') != 'TransactionCanceledException':
+            raise
+        logger.info(f"Keeping {product_id} on {day}: other orders still list it")
+
+
+def _order_lines(order: Dict[str, Any] | None) -> Dict[Tuple[str, str], Dict[str, Any]]:
+    """Map (productId, lineKey) -> order-line row (the order's attributes plus line keys)."""
+    if not order or not order.get('orderId'):
+        return {}
+    line_quantities: Dict[str, int] = {}
+    for item in order.get('items') or []:
+        product_id = item.get('productId')
+        if product_id:
+            line_quantities[product_id] = line_quantities.get(product_id, 0) + _to_int(item.get('quantity', 0))
+
+    line_key = f"{order.get('orderDate') or ''}#{order['orderId']}"
+    product_ids = set(order.get('productIds') or []) | set(line_quantities)
+    return {
+        (product_id, line_key): {
+            **order,
+            'productId': product_id,
+            'lineKey': line_key,
+            'lineQuantity': line_quantities.get(product_id),
+        }
+        for product_id in product_ids
+    }
+
+
+def _apply_order_change(order_id: str, order: Dict[str, Any] | None, sequence: str) -> None:
+    """Move the rollups and order lines from the order's last applied state to this image.
+
+    The day-row deltas, the line puts and deletes and the order's new state row are written in
+    one transaction conditioned on the state row that was read, so a redelivered record or a
+    backfill image older than the applied one changes nothing, lines the order no longer has
+    are deleted from the stored line keys, and a concurrent writer makes the diff be recomputed.
+    """
+    padded = sequence.zfill(SEQUENCE_WIDTH)
+    new_parts = _contributions(order)
+    new_lines = _order_lines(order)
+
+    for _ in range(MAX_APPLY_ATTEMPTS):
+        state = state_table.get_item(Key={'orderId': order_id}, ConsistentRead=True).get('Item')
+        if state and str(state.get('appliedSeq', '')) >= padded:
+            logger.info(f"Skipping already-applied record {sequence} for {order_id}")
+            return
+        old_parts = _stored_contributions(state)
+        timestamp = datetime.now(timezone.utc).isoformat()
+
+        added_products: Dict[str, Set[str]] = {}
+        removed_products: List[Tuple[str, str]] = []
+        for scope, day in set(new_parts) ^ set(old_parts):
+            if scope.startswith(PRODUCT_SCOPE_PREFIX):
+                product_id = scope[len(PRODUCT_SCOPE_PREFIX):]
+                if (scope, day) in new_parts:
+                    added_products.setdefault(day, set()).add(product_id)
+                else:
+                    removed_products.append((product_id, day))
+
+        actions: List[Dict[str, Any]] = []
+        for scope, day in set(old_parts) | set(new_parts):
+            new_units, new_value = new_parts.get((scope, day), (0, 0.0))
+            old_units, old_value = old_parts.get((scope, day), (0, 0.0))
+            orders = int((scope, day) in new_parts) - int((scope, day) in old_parts)
+            products = added_products.get(day, set()) if scope == ROLLUP_ALL else set()
+            if orders or products or (new_units, round(new_value, 2)) != (old_units, round(old_value, 2)):
+                actions.append(_rollup_update(
+                    scope, day, new_units - old_units, new_value - old_value, orders, products, timestamp,
+                ))
+        for product_id, line_key in _stored_line_keys(state) - set(new_lines):
+            actions.append({'Delete': {
+                'TableName': ORDER_LINES_TABLE, 'Key': {'productId': product_id, 'lineKey': line_key},
+            }})
+        for line in new_lines.values():
+            actions.append({'Put': {'TableName': ORDER_LINES_TABLE, 'Item': line}})
+        if not actions:
+            return
+        actions.append(_state_put(order_id, new_parts, list(new_lines), padded, state, timestamp))
+        if len(actions) > MAX_TRANSACTION_ACTIONS:
+            raise OversizedOrderError(
+                f"Order {order_id} needs {len(actions)} writes, over the {MAX_TRANSACTION_ACTIONS}-action transaction limit"
+            )
+
+        try:
+            _client.transact_write_items(TransactItems=actions)
+        except ClientError as e:
+            reasons = {reason.get('Code') for reason in e.response.get('CancellationReasons', [])}
+            if e.response.get('Error', {}).get('Code') != 'TransactionCanceledException' or not reasons <= _RETRYABLE_CANCELLATIONS:
+                raise
+            logger.info(f"State for {order_id} changed while applying {sequence}; retrying")
+            continue
+
+        for product_id, day in removed_products:
+            _prune_day_product(product_id, day)
+        return
+    raise RuntimeError(f"Could not apply record {sequence} for {order_id} after {MAX_APPLY_ATTEMPTS} attempts")
+
+
+def _apply_or_reject(order_id: str, order: Dict[str, Any] | None, sequence: str, payload: Dict[str, Any]) -> bool:
+    """Apply the change, or park an order too large for one transaction on the failure queue.
+
+    Returns False when the order was rejected. Without a failure queue the error propagates,
+    so the record is retried and reaches the event source's on-failure destination instead.
+    """
+    try:
+        _apply_order_change(order_id, order, sequence)
+        return True
+    except OversizedOrderError as e:
+        if not FAILURE_QUEUE_URL:
+            raise
+        logger.error(f"Rejecting order {order_id}: {str(e)}")
+        sqs.send_message(
+            QueueUrl=FAILURE_QUEUE_URL,
+            MessageBody=json.dumps({'orderId': order_id, 'sequence': sequence, 'reason': str(e), 'record': payload}, default=str),
+        )
+        return False
+
+
+def _image(record: Dict[str, Any], name: str) -> Dict[str, Any] | None:
+    raw = record.get('dynamodb', {}).get(name)
+    if not raw:
+        return None
+    return {key: _deserializer.deserialize(value) for key, value in raw.items()}
+
+
+def _bump_orders_version(changes: int, sequence_number: str) -> None:
+    """Advance the orders data version; a failure here only delays cache invalidation."""
+    try:
+        versions_table.update_item(
+            Key={'source': ORDERS_TABLE},
+            UpdateExpression='SET lastSequenceNumber = :seq, updatedAt = :ts ADD version :changes',
+            ExpressionAttributeValues={
+                ':seq': sequence_number,
+                ':ts': datetime.now(timezone.utc).isoformat(),
+                ':changes': changes,
+            },
+        )
+    except ClientError as e:
+        logger.warning(f"Failed to bump orders data version: {str(e)}")
+
+
+def _backfill() -> Dict[str, Any]:
+    orders_table = dynamodb.Table(ORDERS_TABLE)
+    request: Dict[str, Any] = {}
+    processed = rejected = 0
+    while True:
+        response = orders_table.scan(**request)
+        for order in response.get('Items', []):
+            if _apply_or_reject(order['orderId'], order, BACKFILL_SEQUENCE, order):
+                processed += 1
+            else:
+                rejected += 1
+        if 'LastEvaluatedKey' not in response:
+            break
+        request['ExclusiveStartKey'] = response['LastEvaluatedKey']
+    rollup_table.put_item(Item={
+        'scope': BACKFILL_MARKER_SCOPE,
+        'day': BACKFILL_MARKER_DAY,
+        'completedAt': datetime.now(timezone.utc).isoformat(),
+        'ordersProcessed': processed,
+        'ordersRejected': rejected,
+    })
+    logger.info(f"Backfilled daily rollups and order lines from {processed} orders ({rejected} rejected)")
+    return {'statusCode': 200, 'ordersProcessed': processed, 'ordersRejected': rejected}
+
+
+def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """Stream batch handler; reports the first failed record so later records are retried in order."""
+    if event.get('backfill'):
+        return _backfill()
+
+    applied = 0
+    last_sequence = ''
+    failures: List[Dict[str, str]] = []
+    for record in event.get('Records', []):
+        try:
+            keys = record.get('dynamodb', {}).get('Keys', {})
+            order_id = _deserializer.deserialize(keys['orderId'])
+            if _apply_or_reject(order_id, _image(record, 'NewImage'), record['dynamodb']['SequenceNumber'], record):
+                applied += 1
+                last_sequence = record['dynamodb']['SequenceNumber']
+        except Exception as e:
+            logger.error(f"Failed to roll up stream record {record.get('eventID')}: {str(e)}")
+            failures = [{'itemIdentifier': record['dynamodb']['SequenceNumber']}]
+            break
+    if applied:
+        _bump_orders_version(applied, last_sequence)
+    return {'batchItemFailures': failures}
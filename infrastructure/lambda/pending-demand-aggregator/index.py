@@ -0,0 +1,308 @@
+"""
+SupplySense Pending-Demand Aggregator
+
+Consumes the supplysense-orders DynamoDB stream and keeps a per-SKU aggregate of
+outstanding demand (productId -> pendingUnits, pendingValue, orderCount) in
+supplysense-pending-demand. Pending orders without line items are tracked under
+the UNRESOLVED_KEY row so readers can still report them, and the SUMMARY_KEY row
+counts distinct pending orders.
+
+Per-order state lives in supplysense-pending-demand-orders, one row per pending order
+holding the lines it contributes and the stream sequence number last applied, so SKU
+rows stay a fixed size however many orders they cover. Orders that leave the pending
+set keep an empty row until expiresAt, past the stream's 24h retention, so a
+redelivered older record cannot add them back. supplysense-pending-demand-lines holds
+one (productId, orderId) row per pending order line, so readers can query the orders
+behind a SKU without scanning the per-order state.
+
+Invoke with {"backfill": true} to seed the aggregate from existing pending orders. A
+completed backfill writes the BACKFILL_MARKER_KEY row; readers only trust the aggregate
+once it exists.
+"""
+
+import json
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Any, Dict, List, Tuple
+
+import boto3
+from boto3.dynamodb.types import TypeDeserializer
+from botocore.exceptions import ClientError
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+PENDING_DEMAND_TABLE = os.environ.get('PENDING_DEMAND_TABLE', 'supplysense-pending-demand')
+ORDER_STATE_TABLE = os.environ.get('ORDER_STATE_TABLE', 'supplysense-pending-demand-orders')
+PENDING_LINES_TABLE = os.environ.get('PENDING_LINES_TABLE', 'supplysense-pending-demand-lines')
+ORDERS_TABLE = os.environ.get('ORDERS_TABLE', 'supplysense-orders')
+# Orders the consumer cannot apply are parked here instead of blocking the shard
+FAILURE_QUEUE_URL = os.environ.get('FAILURE_QUEUE_URL', '')
+UNRESOLVED_KEY = '#UNRESOLVED'
+# Row whose orderCount is the number of distinct pending orders
+SUMMARY_KEY = '#SUMMARY'
+# Row written once a backfill has seeded the aggregate from every pending order
+BACKFILL_MARKER_KEY = '#BACKFILL'
+# Stream sequence numbers are at most 40 digits; padding keeps string comparison numeric
+SEQUENCE_WIDTH = 40
+BACKFILL_SEQUENCE = '0'
+# Emptied order state rows outlive the 24h stream retention before TTL removes them
+TOMBSTONE_TTL_SECONDS = 2 * 24 * 60 * 60
+# Re-reads of an order's state row when another writer changes it mid-apply
+MAX_APPLY_ATTEMPTS = 3
+_RETRYABLE_CANCELLATIONS = {'None', 'ConditionalCheckFailed', 'TransactionConflict'}
+# TransactWriteItems accepts at most this many actions
+MAX_TRANSACTION_ACTIONS = 100
+
+dynamodb = boto3.resource('dynamodb')
+demand_table = dynamodb.Table(PENDING_DEMAND_TABLE)
+state_table = dynamodb.Table(ORDER_STATE_TABLE)
+# The resource's client (de)serializes attribute values, as Table calls do
+_client = dynamodb.meta.client
+_deserializer = TypeDeserializer()
+sqs = boto3.client('sqs')
+
+
+class OversizedOrderError(ValueError):
+    """An order change needs more writes than one transaction can hold."""
+
+
+def _to_int(value: Any) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _to_float(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _pending_lines(order: Dict[str, Any] | None) -> Dict[str, Tuple[int, float]]:
+    """Map productId -> (units, value) for a pending order; empty for any other status."""
+    if not order or str(order.get('status', '')).lower() != 'pending':
+        return {}
+
+    lines: List[Tuple[str, int, float | None]] = []
+    for item in order.get('items') or []:
+        product_id = item.get('productId')
+        if not product_id:
+            continue
+        quantity = max(_to_int(item.get('quantity', 0)), 0)
+        unit_price = item.get('unitPrice')
+        lines.append((product_id, quantity, _to_float(unit_price) if unit_price is not None else None))
+
+    if not lines:
+        # Same even split the agents apply to orders that only carry productIds + quantity
+        product_ids = order.get('productIds') or []
+        total_quantity = _to_int(order.get('quantity', 0))
+        if product_ids and total_quantity > 0:
+            base_quantity = max(1, total_quantity // len(product_ids))
+            remaining = total_quantity
+            for index, product_id in enumerate(product_ids):
+                allocated = base_quantity if index < len(product_ids) - 1 else max(remaining, 0)
+                lines.append((product_id, max(allocated, 0), None))
+                remaining -= allocated
+        else:
+            lines = [(product_id, 0, None) for product_id in product_ids]
+
+    if not lines:
+        return {UNRESOLVED_KEY: (0, 0.0)}
+
+    total_units = sum(quantity for _, quantity, _ in lines) or 1
+    unit_price_hint = _to_float(order.get('value')) / total_units
+
+    aggregated: Dict[str, Tuple[int, float]] = {}
+    for product_id, quantity, unit_price in lines:
+        value = quantity * (unit_price if unit_price is not None else unit_price_hint)
+        units_so_far, value_so_far = aggregated.get(product_id, (0, 0.0))
+        aggregated[product_id] = (units_so_far + quantity, value_so_far + value)
+    return aggregated
+
+
+def _sku_update(product_id: str, units: int, value: float, orders: int, timestamp: str) -> Dict[str, Any]:
+    """Transaction action adding one order's delta to a SKU row's counters."""
+    return {'Update': {
+        'TableName': PENDING_DEMAND_TABLE,
+        'Key': {'productId': product_id},
+        'UpdateExpression': 'SET updatedAt = :ts ADD pendingUnits :units, pendingValue :value, orderCount :orders',
+        'ExpressionAttributeValues': {
+            ':ts': timestamp,
+            ':units': units,
+            ':value': Decimal(str(round(value, 2))),
+            ':orders': orders,
+        },
+    }}
+
+
+def _summary_update(orders: int, timestamp: str) -> Dict[str, Any]:
+    """Transaction action moving the distinct pending-order count as an order enters or leaves."""
+    return {'Update': {
+        'TableName': PENDING_DEMAND_TABLE,
+        'Key': {'productId': SUMMARY_KEY},
+        'UpdateExpression': 'SET updatedAt = :ts ADD orderCount :orders',
+        'ExpressionAttributeValues': {':ts': timestamp, ':orders': orders},
+    }}
+
+
+def _line_membership(product_id: str, order_id: str, pending: bool) -> Dict[str, Any]:
+    """Transaction action adding or removing the order from the SKU's pending lines."""
+    key = {'productId': product_id, 'orderId': order_id}
+    if pending:
+        return {'Put': {'TableName': PENDING_LINES_TABLE, 'Item': key}}
+    return {'Delete': {'TableName': PENDING_LINES_TABLE, 'Key': key}}
+
+
+def _state_put(order_id: str, lines: Dict[str, Tuple[int, float]], sequence: str,
+               state: Dict[str, Any] | None, timestamp: str) -> Dict[str, Any]:
+    """Transaction action replacing the order's state row, conditioned on the row that was read."""
+    item: Dict[str, Any] = {
+        'orderId': order_id,
+        'appliedSeq': sequence,
+        'lines': {
+            product_id: {'units': units, 'value': Decimal(str(round(value, 2)))}
+            for product_id, (units, value) in lines.items()
+        },
+        'updatedAt': timestamp,
+    }
+    if not lines:
+        item['expiresAt'] = int(time.time()) + TOMBSTONE_TTL_SECONDS
+    action: Dict[str, Any] = {'TableName': ORDER_STATE_TABLE, 'Item': item}
+    if state:
+        action['ConditionExpression'] = 'appliedSeq = :prev'
+        action['ExpressionAttributeValues'] = {':prev': state['appliedSeq']}
+    else:
+        action['ConditionExpression'] = 'attribute_not_exists(orderId)'
+    return {'Put': action}
+
+
+def _stored_lines(state: Dict[str, Any] | None) -> Dict[str, Tuple[int, float]]:
+    return {
+        product_id: (_to_int(line.get('units')), _to_float(line.get('value')))
+        for product_id, line in ((state or {}).get('lines') or {}).items()
+    }
+
+
+def _apply_order_change(order_id: str, order: Dict[str, Any] | None, sequence: str) -> None:
+    """Move the aggregate from the order's last applied lines to the lines of this image.
+
+    The SKU deltas, line rows, summary count and the order's new state row are written in
+    one transaction conditioned on the state row that was read, so a redelivered record (sequence not newer than the
+    applied one) changes nothing, and a concurrent writer makes the diff be recomputed.
+    """
+    padded = sequence.zfill(SEQUENCE_WIDTH)
+    new_lines = _pending_lines(order)
+
+    for _ in range(MAX_APPLY_ATTEMPTS):
+        state = state_table.get_item(Key={'orderId': order_id}, ConsistentRead=True).get('Item')
+        if state and str(state.get('appliedSeq', '')) >= padded:
+            logger.info(f"Skipping already-applied record {sequence} for {order_id}")
+            return
+        old_lines = _stored_lines(state)
+        timestamp = datetime.now(timezone.utc).isoformat()
+
+        actions: List[Dict[str, Any]] = []
+        for product_id in set(old_lines) | set(new_lines):
+            new_units, new_value = new_lines.get(product_id, (0, 0.0))
+            old_units, old_value = old_lines.get(product_id, (0, 0.0))
+            orders = int(product_id in new_lines) - int(product_id in old_lines)
+            if orders or (new_units, round(new_value, 2)) != (old_units, round(old_value, 2)):
+                actions.append(_sku_update(product_id, new_units - old_units, new_value - old_value, orders, timestamp))
+            if orders:
+                actions.append(_line_membership(product_id, order_id, orders > 0))
+        if bool(new_lines) != bool(old_lines):
+            actions.append(_summary_update(1 if new_lines else -1, timestamp))
+        if not actions:
+            return
+        actions.append(_state_put(order_id, new_lines, padded, state, timestamp))
+        if len(actions) > MAX_TRANSACTION_ACTIONS:
+            raise OversizedOrderError(
+                f"Order {order_id} needs {len(actions)} writes, over the {MAX_TRANSACTION_ACTIONS}-action transaction limit"
+            )
+
+        try:
+            _client.transact_write_items(TransactItems=actions)
+            return
+        except ClientError as e:
+            reasons = {reason.get('Code') for reason in e.response.get('CancellationReasons', [])}
+            if e.response.get('Error', {}).get('Code') != 'TransactionCanceledException' or not reasons <= _RETRYABLE_CANCELLATIONS:
+                raise
+            logger.info(f"State for {order_id} changed while applying {sequence}; retrying")
+    raise RuntimeError(f"Could not apply record {sequence} for {order_id} after {MAX_APPLY_ATTEMPTS} attempts")
+
+
+def _apply_or_reject(order_id: str, order: Dict[str, Any] | None, sequence: str, payload: Dict[str, Any]) -> bool:
+    """Apply the change, or park an order too large for one transaction on the failure queue.
+
+    Returns False when the order was rejected. Without a failure queue the error propagates,
+    so the record is retried and reaches the event source's on-failure destination instead.
+    """
+    try:
+        _apply_order_change(order_id, order, sequence)
+        return True
+    except OversizedOrderError as e:
+        if not FAILURE_QUEUE_URL:
+            raise
+        logger.error(f"Rejecting order {order_id}: {str(e)}")
+        sqs.send_message(
+            QueueUrl=FAILURE_QUEUE_URL,
+            MessageBody=json.dumps({'orderId': order_id, 'sequence': sequence, 'reason': str(e), 'record': payload}, default=str),
+        )
+        return False
+
+
+def _image(record: Dict[str, Any], name: str) -> Dict[str, Any] | None:
+    raw = record.get('dynamodb', {}).get(name)
+    if not raw:
+        return None
+    return {key: _deserializer.deserialize(value) for key, value in raw.items()}
+
+
+def _backfill() -> Dict[str, Any]:
+    orders_table = dynamodb.Table(ORDERS_TABLE)
+    request: Dict[str, Any] = {
+        'FilterExpression': '#status = :status',
+        'ExpressionAttributeNames': {'#status': 'status'},
+        'ExpressionAttributeValues': {':status': 'pending'},
+    }
+    processed = rejected = 0
+    while True:
+        response = orders_table.scan(**request)
+        for order in response.get('Items', []):
+            if _apply_or_reject(order['orderId'], order, BACKFILL_SEQUENCE, order):
+                processed += 1
+            else:
+                rejected += 1
+        if 'LastEvaluatedKey' not in response:
+            break
+        request['ExclusiveStartKey'] = response['LastEvaluatedKey']
+    demand_table.put_item(Item={
+        'productId': BACKFILL_MARKER_KEY,
+        'completedAt': datetime.now(timezone.utc).isoformat(),
+        'ordersProcessed': processed,
+        'ordersRejected': rejected,
+    })
+    logger.info(f"Backfilled pending demand from {processed} orders ({rejected} rejected)")
+    return {'statusCode': 200, 'ordersProcessed': processed, 'ordersRejected': rejected}
+
+
+def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """Stream batch handler; reports the first failed record so later records are retried in order."""
+    if event.get('backfill'):
+        return _backfill()
+
+    for record in event.get('Records', []):
+        try:
+            keys = record.get('dynamodb', {}).get('Keys', {})
+            order_id = _deserializer.deserialize(keys['orderId'])
+            _apply_or_reject(order_id, _image(record, 'NewImage'), record['dynamodb']['SequenceNumber'], record)
+        except Exception as e:
+            logger.error(f"Failed to aggregate stream record {record.get('eventID')}: {str(e)}")
+            return {'batchItemFailures': [{'itemIdentifier': record['dynamodb']['SequenceNumber']}]}
+    return {'batchItemFailures': []}
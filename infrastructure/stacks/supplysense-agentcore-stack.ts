@@ -62,10 +62,12 @@ export class SupplySenseAgentCoreStack extends Stack {
         agentRole.addToPolicy(new iam.PolicyStatement({
             actions: [
                 'ssm:GetParameter',
-                'ssm:GetParameters'
+                'ssm:GetParameters',
+                'ssm:GetParametersByPath'
             ],
             resources: [
-                `arn:aws:ssm:${this.region}:${this.account}:parameter/supplysense/agents/*/invoke-arn`
+                `arn:aws:ssm:${this.region}:${this.account}:parameter/supplysense/agents`,
+                `arn:aws:ssm:${this.region}:${this.account}:parameter/supplysense/agents/*`
             ],
         }));
 
@@ -85,6 +87,24 @@ export class SupplySenseAgentCoreStack extends Stack {
             ],
         }));
 
+        // Orchestrator attaches notification drafts to persisted actions/approvals
+        agentRole.addToPolicy(new iam.PolicyStatement({
+            actions: ['dynamodb:UpdateItem'],
+            resources: [
+                `arn:aws:dynamodb:${this.region}:${this.account}:table/supplysense-actions`,
+                `arn:aws:dynamodb:${this.region}:${this.account}:table/supplysense-approvals`
+            ],
+        }));
+
+        // ...and announces attached drafts on the chat stack's action/approval event topics
+        agentRole.addToPolicy(new iam.PolicyStatement({
+            actions: ['sns:Publish'],
+            resources: [
+                `arn:aws:sns:${this.region}:${this.account}:supplysense-action-events-${this.account}-${this.region}`,
+                `arn:aws:sns:${this.region}:${this.account}:supplysense-approval-events-${this.account}-${this.region}`
+            ],
+        }));
+
         // Grant CloudWatch logging permissions
         agentRole.addToPolicy(new iam.PolicyStatement({
             actions: [
@@ -288,9 +308,14 @@ export class SupplySenseAgentCoreStack extends Stack {
                 resources: [runtimeRepo.repositoryArn],
             }));
 
-            // Package runtime source and build ARM64 image in CodeBuild
+            // Package runtime source (agent dir + shared helpers) and build ARM64 image in CodeBuild
             const runtimeSrc = new s3assets.Asset(this, `${config.name}AgentRuntimeSrc`, {
-                path: path.join(__dirname, `../../agents/${config.agentPath}`),
+                path: path.join(__dirname, '../../agents'),
+                exclude: [
+                    'README.md',
+                    '**/__pycache__',
+                    ...agentConfigs.filter(other => other.agentPath !== config.agentPath).map(other => other.agentPath),
+                ],
             });
 
             const buildProject = new codebuild.Project(this, `${config.name}AgentRuntimeBuild`, {
@@ -316,7 +341,7 @@ export class SupplySenseAgentCoreStack extends Stack {
                         },
                         build: {
                             commands: [
-                                'docker buildx build --platform linux/arm64 -t $REPO_URI:$IMAGE_TAG --push .',
+                                `docker buildx build --platform linux/arm64 -f ${config.agentPath}/Dockerfile -t $REPO_URI:$IMAGE_TAG --push .`,
                             ],
                         },
                     },
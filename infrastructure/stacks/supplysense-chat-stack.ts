@@ -198,7 +198,10 @@ def handler(event, context):
         'ssm:GetParameters',
         'ssm:GetParametersByPath',
       ],
-      resources: [`arn:aws:ssm:${this.region}:${this.account}:parameter/supplysense/agents/*`],
+      resources: [
+        `arn:aws:ssm:${this.region}:${this.account}:parameter/supplysense/agents`,
+        `arn:aws:ssm:${this.region}:${this.account}:parameter/supplysense/agents/*`,
+      ],
     }));
 
     // Grant DynamoDB permissions for session management and data access
@@ -271,8 +274,28 @@ def handler(event, context):
     });
 
     // CodeBuild project for Chat Service image (Python Flask passthrough to AgentCore)
+    // Packaged from the repository root: chat-service/ plus the agents' shared helpers in agents/common
     const chatSrc = new s3assets.Asset(this, 'ChatServiceSrc', {
-      path: path.join(__dirname, '../../chat-service'),
+      path: path.join(__dirname, '../..'),
+      exclude: [
+        '.*',
+        '*.md',
+        '*.json',
+        '*.jsonl',
+        '*.patch',
+        '*.sh',
+        '**/__pycache__',
+        'node_modules',
+        'cdk.out',
+        'agentcore',
+        'data',
+        'docs',
+        'infrastructure',
+        'scripts',
+        'tests',
+        'ui',
+        'agents/*_agent',
+      ],
     });
 
     const chatBuildProject = new codebuild.Project(this, 'ChatOrchestrationBuild', {
@@ -301,7 +324,7 @@ def handler(event, context):
           build: {
             commands: [
               'echo "Building Docker image with retry logic"',
-              'for i in 1 2 3; do docker build -t $REPO_URI:$IMAGE_TAG . && break || sleep 30; done',
+              'for i in 1 2 3; do docker build -f chat-service/Dockerfile -t $REPO_URI:$IMAGE_TAG . && break || sleep 30; done',
               'docker push $REPO_URI:$IMAGE_TAG',
             ],
           },
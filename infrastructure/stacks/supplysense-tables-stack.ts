@@ -1,7 +1,13 @@
-import { Stack, StackProps, CfnOutput } from 'aws-cdk-lib';
+import { Stack, StackProps, CfnOutput, Duration } from 'aws-cdk-lib';
 import * as cdk from 'aws-cdk-lib';
 import { Construct } from 'constructs';
 import * as dynamodb from 'aws-cdk-lib/aws-dynamodb';
+import * as iam from 'aws-cdk-lib/aws-iam';
+import * as lambda from 'aws-cdk-lib/aws-lambda';
+import { DynamoEventSource, SqsDlq } from 'aws-cdk-lib/aws-lambda-event-sources';
+import * as sqs from 'aws-cdk-lib/aws-sqs';
+import * as cr from 'aws-cdk-lib/custom-resources';
+import * as path from 'path';
 
 export class SupplySenseTablesStack extends Stack {
   constructor(scope: Construct, id: string, props?: StackProps) {
@@ -13,6 +19,7 @@ export class SupplySenseTablesStack extends Stack {
       partitionKey: { name: 'productId', type: dynamodb.AttributeType.STRING },
       sortKey: { name: 'locationId', type: dynamodb.AttributeType.STRING },
       billingMode: dynamodb.BillingMode.PAY_PER_REQUEST,
+      stream: dynamodb.StreamViewType.KEYS_ONLY,
       removalPolicy: cdk.RemovalPolicy.DESTROY,
     });
 
@@ -21,14 +28,181 @@ export class SupplySenseTablesStack extends Stack {
       tableName: 'supplysense-orders',
       partitionKey: { name: 'orderId', type: dynamodb.AttributeType.STRING },
       billingMode: dynamodb.BillingMode.PAY_PER_REQUEST,
+      stream: dynamodb.StreamViewType.NEW_AND_OLD_IMAGES,
       removalPolicy: cdk.RemovalPolicy.DESTROY,
     });
 
+    // Orders by status, newest first (replaces status-filtered scans)
+    ordersTable.addGlobalSecondaryIndex({
+      indexName: 'status-orderDate-index',
+      partitionKey: { name: 'status', type: dynamodb.AttributeType.STRING },
+      sortKey: { name: 'orderDate', type: dynamodb.AttributeType.STRING },
+      projectionType: dynamodb.ProjectionType.ALL,
+    });
+
+    // Pending Demand Table (per-SKU aggregate maintained from the orders stream)
+    const pendingDemandTable = new dynamodb.Table(this, 'PendingDemandTable', {
+      tableName: 'supplysense-pending-demand',
+      partitionKey: { name: 'productId', type: dynamodb.AttributeType.STRING },
+      billingMode: dynamodb.BillingMode.PAY_PER_REQUEST,
+      removalPolicy: cdk.RemovalPolicy.DESTROY,
+    });
+
+    // Pending Demand Orders Table (per-order lines and applied stream sequence for the aggregate)
+    const pendingDemandOrdersTable = new dynamodb.Table(this, 'PendingDemandOrdersTable', {
+      tableName: 'supplysense-pending-demand-orders',
+      partitionKey: { name: 'orderId', type: dynamodb.AttributeType.STRING },
+      billingMode: dynamodb.BillingMode.PAY_PER_REQUEST,
+      timeToLiveAttribute: 'expiresAt',
+      removalPolicy: cdk.RemovalPolicy.DESTROY,
+    });
+
+    // Pending Demand Lines Table (productId + orderId for every pending order line, queried per SKU)
+    const pendingDemandLinesTable = new dynamodb.Table(this, 'PendingDemandLinesTable', {
+      tableName: 'supplysense-pending-demand-lines',
+      partitionKey: { name: 'productId', type: dynamodb.AttributeType.STRING },
+      sortKey: { name: 'orderId', type: dynamodb.AttributeType.STRING },
+      billingMode: dynamodb.BillingMode.PAY_PER_REQUEST,
+      removalPolicy: cdk.RemovalPolicy.DESTROY,
+    });
+
+    // Orders stream records the pending-demand aggregator rejected or exhausted its retries on
+    const pendingDemandFailureQueue = new sqs.Queue(this, 'PendingDemandFailureQueue', {
+      queueName: 'supplysense-pending-demand-failures',
+      retentionPeriod: Duration.days(14),
+    });
+
+    const pendingDemandAggregator = new lambda.Function(this, 'PendingDemandAggregatorFn', {
+      runtime: lambda.Runtime.PYTHON_3_12,
+      handler: 'index.handler',
+      code: lambda.Code.fromAsset(path.join(__dirname, '../lambda/pending-demand-aggregator')),
+      timeout: Duration.seconds(60),
+      environment: {
+        PENDING_DEMAND_TABLE: pendingDemandTable.tableName,
+        ORDER_STATE_TABLE: pendingDemandOrdersTable.tableName,
+        PENDING_LINES_TABLE: pendingDemandLinesTable.tableName,
+        ORDERS_TABLE: ordersTable.tableName,
+        FAILURE_QUEUE_URL: pendingDemandFailureQueue.queueUrl,
+      },
+    });
+    pendingDemandFailureQueue.grantSendMessages(pendingDemandAggregator);
+    pendingDemandTable.grantReadWriteData(pendingDemandAggregator);
+    pendingDemandOrdersTable.grantReadWriteData(pendingDemandAggregator);
+    pendingDemandLinesTable.grantReadWriteData(pendingDemandAggregator);
+    ordersTable.grantReadData(pendingDemandAggregator);
+    pendingDemandAggregator.addEventSource(new DynamoEventSource(ordersTable, {
+      startingPosition: lambda.StartingPosition.TRIM_HORIZON,
+      batchSize: 100,
+      retryAttempts: 5,
+      reportBatchItemFailures: true,
+      onFailure: new SqsDlq(pendingDemandFailureQueue),
+    }));
+
+    // Order Daily Rollup Table (scope = ALL | PRODUCT#<productId>, day = YYYY-MM-DD)
+    const orderDailyRollupTable = new dynamodb.Table(this, 'OrderDailyRollupTable', {
+      tableName: 'supplysense-order-daily-rollup',
+      partitionKey: { name: 'scope', type: dynamodb.AttributeType.STRING },
+      sortKey: { name: 'day', type: dynamodb.AttributeType.STRING },
+      billingMode: dynamodb.BillingMode.PAY_PER_REQUEST,
+      removalPolicy: cdk.RemovalPolicy.DESTROY,
+    });
+
+    // Order Rollup Orders Table (per-order contributions and applied stream sequence for the rollups)
+    const orderRollupOrdersTable = new dynamodb.Table(this, 'OrderRollupOrdersTable', {
+      tableName: 'supplysense-order-rollup-orders',
+      partitionKey: { name: 'orderId', type: dynamodb.AttributeType.STRING },
+      billingMode: dynamodb.BillingMode.PAY_PER_REQUEST,
+      timeToLiveAttribute: 'expiresAt',
+      removalPolicy: cdk.RemovalPolicy.DESTROY,
+    });
+
+    // Order Lines Table (per-SKU order history: productId + "<orderDate>#<orderId>")
+    const orderLinesTable = new dynamodb.Table(this, 'OrderLinesTable', {
+      tableName: 'supplysense-order-lines',
+      partitionKey: { name: 'productId', type: dynamodb.AttributeType.STRING },
+      sortKey: { name: 'lineKey', type: dynamodb.AttributeType.STRING },
+      billingMode: dynamodb.BillingMode.PAY_PER_REQUEST,
+      removalPolicy: cdk.RemovalPolicy.DESTROY,
+    });
+
+    // Data Versions Table (source = table name; version bumps on every change to that table)
+    const dataVersionsTable = new dynamodb.Table(this, 'DataVersionsTable', {
+      tableName: 'supplysense-data-versions',
+      partitionKey: { name: 'source', type: dynamodb.AttributeType.STRING },
+      billingMode: dynamodb.BillingMode.PAY_PER_REQUEST,
+      removalPolicy: cdk.RemovalPolicy.DESTROY,
+    });
+
+    // Orders stream records the order-rollups consumer rejected or exhausted its retries on
+    const orderRollupsFailureQueue = new sqs.Queue(this, 'OrderRollupsFailureQueue', {
+      queueName: 'supplysense-order-rollups-failures',
+      retentionPeriod: Duration.days(14),
+    });
+
+    const orderRollups = new lambda.Function(this, 'OrderRollupsFn', {
+      runtime: lambda.Runtime.PYTHON_3_12,
+      handler: 'index.handler',
+      code: lambda.Code.fromAsset(path.join(__dirname, '../lambda/order-rollups')),
+      timeout: Duration.seconds(60),
+      environment: {
+        ROLLUP_TABLE: orderDailyRollupTable.tableName,
+        ORDER_STATE_TABLE: orderRollupOrdersTable.tableName,
+        ORDER_LINES_TABLE: orderLinesTable.tableName,
+        ORDERS_TABLE: ordersTable.tableName,
+        DATA_VERSIONS_TABLE: dataVersionsTable.tableName,
+        FAILURE_QUEUE_URL: orderRollupsFailureQueue.queueUrl,
+      },
+    });
+    orderRollupsFailureQueue.grantSendMessages(orderRollups);
+    orderDailyRollupTable.grantReadWriteData(orderRollups);
+    orderRollupOrdersTable.grantReadWriteData(orderRollups);
+    dataVersionsTable.grantWriteData(orderRollups);
+    orderLinesTable.grantReadWriteData(orderRollups);
+    ordersTable.grantReadData(orderRollups);
+    orderRollups.addEventSource(new DynamoEventSource(ordersTable, {
+      startingPosition: lambda.StartingPosition.TRIM_HORIZON,
+      batchSize: 100,
+      retryAttempts: 5,
+      reportBatchItemFailures: true,
+      onFailure: new SqsDlq(orderRollupsFailureQueue),
+    }));
+
+    // Backfill both orders-stream projections on first deploy. Readers ignore them until a
+    // backfill writes its marker row; after that the stream keeps them current.
+    const streamConsumers: Array<[string, lambda.Function]> = [
+      ['PendingDemandBackfill', pendingDemandAggregator],
+      ['OrderRollupsBackfill', orderRollups],
+    ];
+    for (const [id, consumer] of streamConsumers) {
+      const backfillCall: cr.AwsSdkCall = {
+        service: 'Lambda',
+        action: 'invoke',
+        parameters: {
+          FunctionName: consumer.functionName,
+          InvocationType: 'RequestResponse',
+          Payload: JSON.stringify({ backfill: true }),
+        },
+        physicalResourceId: cr.PhysicalResourceId.of(id),
+      };
+      const backfill = new cr.AwsCustomResource(this, id, {
+        onCreate: backfillCall,
+        policy: cr.AwsCustomResourcePolicy.fromStatements([
+          new iam.PolicyStatement({
+            actions: ['lambda:InvokeFunction'],
+            resources: [consumer.functionArn],
+          }),
+        ]),
+        timeout: Duration.minutes(2),
+      });
+      backfill.node.addDependency(consumer);
+    }
+
     // Suppliers Table
     const suppliersTable = new dynamodb.Table(this, 'SuppliersTable', {
       tableName: 'supplysense-suppliers',
       partitionKey: { name: 'supplierId', type: dynamodb.AttributeType.STRING },
       billingMode: dynamodb.BillingMode.PAY_PER_REQUEST,
+      stream: dynamodb.StreamViewType.KEYS_ONLY,
       removalPolicy: cdk.RemovalPolicy.DESTROY,
     });
 
@@ -37,9 +211,37 @@ export class SupplySenseTablesStack extends Stack {
       tableName: 'supplysense-logistics',
       partitionKey: { name: 'shipmentId', type: dynamodb.AttributeType.STRING },
       billingMode: dynamodb.BillingMode.PAY_PER_REQUEST,
+      stream: dynamodb.StreamViewType.KEYS_ONLY,
       removalPolicy: cdk.RemovalPolicy.DESTROY,
     });
 
+    // Shipments by order (partition key only, so shipments without dates are still indexed)
+    logisticsTable.addGlobalSecondaryIndex({
+      indexName: 'orderId-index',
+      partitionKey: { name: 'orderId', type: dynamodb.AttributeType.STRING },
+      projectionType: dynamodb.ProjectionType.ALL,
+    });
+
+    // Inventory, logistics and supplier changes bump their data versions (orders are bumped by OrderRollupsFn)
+    const dataVersions = new lambda.Function(this, 'DataVersionsFn', {
+      runtime: lambda.Runtime.PYTHON_3_12,
+      handler: 'index.handler',
+      code: lambda.Code.fromAsset(path.join(__dirname, '../lambda/data-versions')),
+      timeout: Duration.seconds(30),
+      environment: {
+        DATA_VERSIONS_TABLE: dataVersionsTable.tableName,
+      },
+    });
+    dataVersionsTable.grantWriteData(dataVersions);
+    for (const versionedTable of [inventoryTable, logisticsTable, suppliersTable]) {
+      dataVersions.addEventSource(new DynamoEventSource(versionedTable, {
+        startingPosition: lambda.StartingPosition.LATEST,
+        batchSize: 100,
+        maxBatchingWindow: Duration.seconds(1),
+        retryAttempts: 5,
+      }));
+    }
+
     // Demand Forecast Table
     const demandForecastTable = new dynamodb.Table(this, 'DemandForecastTable', {
       tableName: 'supplysense-demand-forecast',
@@ -74,6 +276,22 @@ export class SupplySenseTablesStack extends Stack {
       removalPolicy: cdk.RemovalPolicy.DESTROY,
     });
 
+    // Completed actions / decided approvals by status, ordered by when they were resolved.
+    // Each table holds a single entity type, so status alone partitions entityType/status.
+    actionsTable.addGlobalSecondaryIndex({
+      indexName: 'status-completedAt-index',
+      partitionKey: { name: 'status', type: dynamodb.AttributeType.STRING },
+      sortKey: { name: 'completedAt', type: dynamodb.AttributeType.STRING },
+      projectionType: dynamodb.ProjectionType.ALL,
+    });
+
+    approvalsTable.addGlobalSecondaryIndex({
+      indexName: 'status-decisionAt-index',
+      partitionKey: { name: 'status', type: dynamodb.AttributeType.STRING },
+      sortKey: { name: 'decisionAt', type: dynamodb.AttributeType.STRING },
+      projectionType: dynamodb.ProjectionType.ALL,
+    });
+
     // Outputs
     new CfnOutput(this, 'InventoryTableName', {
       value: inventoryTable.tableName,
@@ -85,6 +303,46 @@ export class SupplySenseTablesStack extends Stack {
       description: 'Orders DynamoDB Table Name',
     });
 
+    new CfnOutput(this, 'PendingDemandTableName', {
+      value: pendingDemandTable.tableName,
+      description: 'Pending Demand Aggregate DynamoDB Table Name',
+    });
+
+    new CfnOutput(this, 'PendingDemandAggregatorFunctionName', {
+      value: pendingDemandAggregator.functionName,
+      description: 'Orders stream consumer maintaining pending demand (backfilled on first deploy; invoke with {"backfill": true} to re-seed)',
+    });
+
+    new CfnOutput(this, 'PendingDemandFailureQueueUrl', {
+      value: pendingDemandFailureQueue.queueUrl,
+      description: 'Orders stream records the pending-demand aggregator could not apply',
+    });
+
+    new CfnOutput(this, 'OrderDailyRollupTableName', {
+      value: orderDailyRollupTable.tableName,
+      description: 'Order Daily Rollup DynamoDB Table Name',
+    });
+
+    new CfnOutput(this, 'OrderLinesTableName', {
+      value: orderLinesTable.tableName,
+      description: 'Order Lines DynamoDB Table Name',
+    });
+
+    new CfnOutput(this, 'OrderRollupsFunctionName', {
+      value: orderRollups.functionName,
+      description: 'Orders stream consumer maintaining daily rollups and order lines (backfilled on first deploy; invoke with {"backfill": true} to re-seed)',
+    });
+
+    new CfnOutput(this, 'OrderRollupsFailureQueueUrl', {
+      value: orderRollupsFailureQueue.queueUrl,
+      description: 'Orders stream records the order-rollups consumer could not apply',
+    });
+
+    new CfnOutput(this, 'DataVersionsTableName', {
+      value: dataVersionsTable.tableName,
+      description: 'Data Versions DynamoDB Table Name',
+    });
+
     new CfnOutput(this, 'SuppliersTableName', {
       value: suppliersTable.tableName,
       description: 'Suppliers DynamoDB Table Name',
@@ -65,10 +65,35 @@ const tableNames = {
   suppliers: 'supplysense-suppliers',
   logistics: 'supplysense-logistics',
   demandForecast: 'supplysense-demand-forecast',
+  orderLines: 'supplysense-order-lines',
   actions: 'supplysense-actions',
   approvals: 'supplysense-approvals',
 };
 
+// Order-line index rows: one per (productId, order), sorted by orderDate.
+// Must match the key format written by the order-rollups stream consumer.
+function buildOrderLines(orders) {
+  const lines = [];
+  for (const order of orders) {
+    const lineQuantities = {};
+    for (const item of order.items || []) {
+      if (item.productId) {
+        lineQuantities[item.productId] = (lineQuantities[item.productId] || 0) + (Number(item.quantity) || 0);
+      }
+    }
+    const productIds = new Set([...(order.productIds || []), ...Object.keys(lineQuantities)]);
+    for (const productId of productIds) {
+      lines.push({
+        ...order,
+        productId,
+        lineKey: `${order.orderDate || ''}#${order.orderId}`,
+        lineQuantity: lineQuantities[productId] ?? null,
+      });
+    }
+  }
+  return lines;
+}
+
 async function checkTableExists(tableName) {
   try {
     const { DynamoDBClient } = require('@aws-sdk/client-dynamodb');
@@ -142,6 +167,9 @@ async function seedTable(tableName, data, options = {}) {
         } else if (tableName.includes('demand-forecast')) {
           conditionExpression = 'attribute_not_exists(#productId) AND attribute_not_exists(#forecastDate)';
           expressionAttributeNames = { '#productId': 'productId', '#forecastDate': 'forecastDate' };
+        } else if (tableName.includes('order-lines')) {
+          conditionExpression = 'attribute_not_exists(#productId) AND attribute_not_exists(#lineKey)';
+          expressionAttributeNames = { '#productId': 'productId', '#lineKey': 'lineKey' };
         }
       }
       
@@ -219,6 +247,8 @@ async function clearTable(tableName) {
           key = { shipmentId: item.shipmentId };
         } else if (tableName === tableNames.demandForecast) {
           key = { productId: item.productId, forecastDate: item.forecastDate };
+        } else if (tableName === tableNames.orderLines) {
+          key = { productId: item.productId, lineKey: item.lineKey };
         }
         
         if (key) {
@@ -263,6 +293,7 @@ async function seedAllTables(options = {}) {
     const seedResults = await Promise.all([
       seedTable(tableNames.inventory, mockData.inventory, options),
       seedTable(tableNames.orders, mockData.orders, options),
+      seedTable(tableNames.orderLines, buildOrderLines(mockData.orders), options),
       seedTable(tableNames.suppliers, mockData.suppliers, options),
       seedTable(tableNames.logistics, mockData.logistics, options),
       seedTable(tableNames.demandForecast, mockData.demandForecast, options)
@@ -0,0 +1,108 @@
+import importlib.util
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from types import ModuleType
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+AGENTS_DIR = REPO_ROOT / 'agents'
+LAMBDA_DIR = REPO_ROOT / 'infrastructure' / 'lambda'
+
+if str(AGENTS_DIR) not in sys.path:
+    sys.path.insert(0, str(AGENTS_DIR))
+
+
+@pytest.fixture(autouse=True)
+def aws_environment(monkeypatch):
+    """Keep boto3 off real credentials and pinned to one region."""
+    monkeypatch.setenv('AWS_DEFAULT_REGION', 'us-east-1')
+    monkeypatch.setenv('AWS_REGION', 'us-east-1')
+    monkeypatch.setenv('AWS_ACCESS_KEY_ID', 'testing')
+    monkeypatch.setenv('AWS_SECRET_ACCESS_KEY', 'testing')
+    monkeypatch.delenv('AWS_PROFILE', raising=False)
+
+
+def load_lambda(name: str) -> ModuleType:
+    """Import infrastructure/lambda/<name>/index.py as a fresh module."""
+    spec = importlib.util.spec_from_file_location(f"lambda_{name.replace('-', '_')}", LAMBDA_DIR / name / 'index.py')
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def load_chat_service() -> ModuleType:
+    """Import chat-service/app.py; its shared helpers resolve from agents/common as in its container."""
+    spec = importlib.util.spec_from_file_location('chat_service_app', REPO_ROOT / 'chat-service' / 'app.py')
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+# Body of a non-streaming orchestrator runtime (the pre-streaming response shape)
+FUSED_RESPONSE = {
+    'queryType': 'inventory_status',
+    'summary': 'Inventory is healthy.',
+    'decision': {'status': 'info'},
+    'actions': [],
+    'approvals': [],
+    'events': [
+        {'type': 'agent_start', 'agent': 'inventory'},
+        {'type': 'agent_result', 'agent': 'inventory', 'status': 'success'},
+    ],
+}
+
+
+class _FakeRuntime(BaseHTTPRequestHandler):
+    """Answers /runtimes/<arn>/invocations.
+
+    'hang' ARNs stream one event then stall, 'drip' ARNs keep streaming an event every 50ms,
+    'fused' ARNs return FUSED_RESPONSE as one JSON body, and anything else returns {"ok": true}.
+    """
+
+    protocol_version = 'HTTP/1.1'
+    release: threading.Event
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        if 'hang' in self.path or 'drip' in self.path:
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+            chunk = b'data: {"type": "agent_start", "agent": "inventory"}\n\n'
+            while True:
+                try:
+                    self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+                    self.wfile.flush()
+                except OSError:
+                    return
+                if 'hang' in self.path or self.release.wait(0.05):
+                    break
+            self.release.wait(30)
+            return
+        body = json.dumps(FUSED_RESPONSE if 'fused' in self.path else {'ok': True}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def fake_runtime():
+    """Local AgentCore data-plane stand-in; yields its base URL."""
+    release = threading.Event()
+    handler = type('_Handler', (_FakeRuntime,), {'release': release})
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    release.set()
+    server.shutdown()
@@ -0,0 +1,104 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from common.agentcore_http import AsyncAgentCoreClient, PooledAgentCoreClient
+
+
+def _client(base_url, **kwargs):
+    client = PooledAgentCoreClient('us-east-1', **kwargs)
+    client.dp_endpoint = base_url
+    return client
+
+
+def test_open_streams_do_not_take_invocation_slots(fake_runtime):
+    client = _client(fake_runtime, pool_size=1, max_concurrency=1, timeout=10)
+
+    with client.stream('arn:hang', {}, 'session-1') as first, client.stream('arn:hang', {}, 'session-2') as second:
+        assert first.status_code == second.status_code == 200
+        assert client.stats()['openStreams'] == 2
+
+        started = time.monotonic()
+        assert client.invoke_endpoint('arn:fast', {}, 'session-3') == {'response': '{"ok": true}'}
+        assert time.monotonic() - started < 2
+        client.abort(first)
+        client.abort(second)
+
+    stats = client.stats()
+    assert stats['openStreams'] == 0
+    assert stats['inFlight'] == 0
+
+
+def test_invocations_reuse_pooled_connections(fake_runtime):
+    client = _client(fake_runtime, pool_size=2, timeout=10)
+
+    for index in range(10):
+        client.invoke_endpoint('arn:fast', {'n': index}, 'session-1')
+
+    stats = client.stats()
+    assert stats['requests'] == 10
+    assert stats['connectionsOpened'] == 1
+
+
+def test_abort_unblocks_a_reader_thread(fake_runtime):
+    client = _client(fake_runtime, timeout=30)
+    lines = []
+    finished = threading.Event()
+
+    with client.stream('arn:hang', {}, 'session-1') as response:
+        def _read():
+            try:
+                lines.extend(line for line in response.iter_lines(decode_unicode=True) if line)
+            except Exception:
+                pass
+            finished.set()
+
+        threading.Thread(target=_read, daemon=True).start()
+        time.sleep(0.2)
+        client.abort(response)
+        assert finished.wait(2)
+
+    assert lines == ['data: {"type": "agent_start", "agent": "inventory"}']
+
+
+def test_timeout_bounds_a_stream_that_keeps_sending(fake_runtime):
+    client = _client(fake_runtime, pool_size=1, max_concurrency=1, timeout=30)
+    started = time.monotonic()
+
+    with pytest.raises(TimeoutError):
+        client.invoke_endpoint('arn:drip', {}, 'session-1', timeout=0.3)
+
+    assert time.monotonic() - started < 1.5
+    assert client.stats()['inFlight'] == 0
+    # The slot was released, so the next call does not queue behind the aborted one
+    assert client.invoke_endpoint('arn:fast', {}, 'session-2', timeout=5) == {'response': '{"ok": true}'}
+
+
+def test_async_client_closes_the_session_of_a_previous_loop(fake_runtime):
+    client = AsyncAgentCoreClient(fake_runtime, timeout=10)
+    other_loop = asyncio.new_event_loop()
+    loop_thread = threading.Thread(target=other_loop.run_forever, daemon=True)
+    loop_thread.start()
+    try:
+        first = asyncio.run_coroutine_threadsafe(client.invoke_endpoint('arn:fast', {}, 'session-1'), other_loop)
+        assert first.result(timeout=10) == {'response': '{"ok": true}'}
+        old_session = client._session
+
+        async def invoke_and_close():
+            try:
+                return await client.invoke_endpoint('arn:fast', {}, 'session-2')
+            finally:
+                await client.close()
+
+        assert asyncio.run(invoke_and_close()) == {'response': '{"ok": true}'}
+        deadline = time.monotonic() + 5
+        while not old_session.closed and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert old_session.closed
+        assert client._session is not old_session
+    finally:
+        other_loop.call_soon_threadsafe(other_loop.stop)
+        loop_thread.join(timeout=5)
+        other_loop.close()
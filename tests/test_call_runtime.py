@@ -0,0 +1,130 @@
+import threading
+import time
+
+import pytest
+
+from orchestrator_agent import app as orchestrator
+
+
+@pytest.fixture
+def runtime(monkeypatch):
+    calls = []
+    release = threading.Event()
+    delays = {}
+
+    def _invoke(runtime_arn, payload, session_id, bearer_token=None, endpoint_name='DEFAULT', timeout=None):
+        calls.append({'session': session_id, 'timeout': timeout, 'thread': threading.current_thread().name})
+        delay = delays.get(len(calls), 30)
+        if release.wait(min(delay, timeout or delay)):
+            return {'response': 'released'}
+        if timeout is not None and delay >= timeout:
+            raise TimeoutError('read timed out')
+        return {'response': f"attempt {len(calls)}"}
+
+    monkeypatch.setattr(orchestrator.http_client, 'invoke_endpoint', _invoke)
+    monkeypatch.setattr(orchestrator, '_latency_samples', {})
+    yield calls, delays
+    release.set()
+
+
+@pytest.fixture
+def live_client(fake_runtime, monkeypatch):
+    monkeypatch.setattr(orchestrator.http_client, 'dp_endpoint', fake_runtime)
+    monkeypatch.setattr(orchestrator, '_latency_samples', {})
+    return orchestrator.http_client
+
+
+def _wait_idle(client, limit=2.0):
+    stop = time.monotonic() + limit
+    while client.stats()['inFlight'] and time.monotonic() < stop:
+        time.sleep(0.02)
+    return client.stats()['inFlight'] == 0
+
+
+def test_missed_deadline_raises_while_the_runtime_keeps_sending(live_client):
+    started = time.monotonic()
+
+    with pytest.raises(orchestrator.SpecialistDeadlineExceeded):
+        orchestrator._call_runtime('inventory', 'arn:drip', {}, 'session-1', 'token', timeout=0.3)
+
+    assert time.monotonic() - started < 1.0
+    # The abandoned attempt stops at the deadline too, releasing its invocation slot
+    assert _wait_idle(live_client)
+
+
+def test_abandoned_attempts_leave_the_pools_free(live_client):
+    for _ in range(orchestrator.INVOKE_MAX_WORKERS):
+        with pytest.raises(orchestrator.SpecialistDeadlineExceeded):
+            orchestrator._call_runtime('inventory', 'arn:drip', {}, 'session-1', 'token', timeout=0.05)
+
+    assert orchestrator._invoke_pool.submit(lambda: 'offloaded').result(timeout=1) == 'offloaded'
+    assert _wait_idle(live_client)
+    assert orchestrator._attempt_pool.submit(lambda: 'attempt').result(timeout=1) == 'attempt'
+    assert live_client.invoke_endpoint('arn:fast', {}, 'session-2', timeout=2) == {'response': '{"ok": true}'}
+
+
+def test_hedge_wins_when_first_attempt_stalls(runtime, monkeypatch):
+    calls, delays = runtime
+    delays[2] = 0.05
+    monkeypatch.setattr(orchestrator, 'HEDGED_REQUESTS_ENABLED', True)
+    for _ in range(orchestrator.HEDGE_MIN_SAMPLES):
+        orchestrator._record_latency('demand', 0.1)
+
+    result = orchestrator._call_runtime('demand', 'arn', {}, 'session-1', 'token', timeout=5)
+
+    assert result == {'response': 'attempt 2'}
+    assert len(calls) == 2
+    assert calls[1]['session'] != 'session-1'
+    assert calls[1]['timeout'] < 5
+
+
+def test_fast_failure_is_raised_as_is(monkeypatch):
+    def _invoke(*args, **kwargs):
+        raise RuntimeError('403 Forbidden: bearer token may be expired or invalid')
+
+    monkeypatch.setattr(orchestrator.http_client, 'invoke_endpoint', _invoke)
+
+    with pytest.raises(RuntimeError, match='403'):
+        orchestrator._call_runtime('inventory', 'arn', {}, 'session-1', 'token', timeout=5)
+
+
+def test_fulfillment_fan_out_uses_request_token_and_deadline(monkeypatch):
+    calls = {}
+
+    def _invoke(agent_type, query, session_id, context, bearer_token=None, timeout=None):
+        calls[agent_type] = {'token': bearer_token, 'timeout': timeout, 'thread': threading.current_thread().name}
+        if agent_type == 'risk':
+            return orchestrator._missing_token_result(agent_type)
+        return {'structured': {'status': 'success', 'summary': agent_type}}
+
+    monkeypatch.setattr(orchestrator, '_invoke_specialist', _invoke)
+    token = orchestrator._request_bearer_token.set('request-token')
+    try:
+        analyses, missing = orchestrator._fan_out_fulfillment_specialists(
+            {'inventory': 'q', 'demand': 'q', 'risk': 'q'}, deadline_seconds=5,
+        )
+    finally:
+        orchestrator._request_bearer_token.reset(token)
+
+    assert missing == ['risk']
+    assert analyses['inventory'] == {'status': 'success', 'summary': 'inventory'}
+    assert analyses['risk'] == {}
+    assert {call['token'] for call in calls.values()} == {'request-token'}
+    assert all(0 < call['timeout'] <= 5 for call in calls.values())
+    assert all(call['thread'].startswith('fulfillment') for call in calls.values())
+
+
+def test_fulfillment_stragglers_release_their_workers_at_the_deadline(live_client, monkeypatch):
+    monkeypatch.setattr(orchestrator, '_get_runtime_arn', lambda agent_type: 'arn:drip')
+    monkeypatch.setattr(orchestrator, 'data_version_token', lambda *args: None)
+    monkeypatch.setattr(orchestrator, '_breakers', {})
+    started = time.monotonic()
+
+    analyses, missing = orchestrator._fan_out_fulfillment_specialists(
+        {'inventory': 'q', 'demand': 'q'}, deadline_seconds=0.3, bearer_token='token',
+    )
+
+    assert sorted(missing) == ['demand', 'inventory']
+    assert analyses == {'inventory': {}, 'demand': {}}
+    assert time.monotonic() - started < 1.0
+    assert _wait_idle(live_client)
@@ -0,0 +1,72 @@
+import json
+import time
+
+import pytest
+
+from conftest import FUSED_RESPONSE, load_chat_service
+
+
+@pytest.fixture
+def chat_service(fake_runtime, monkeypatch):
+    module = load_chat_service()
+    module.http_client.dp_endpoint = fake_runtime
+    return module
+
+
+def _wait_for(predicate, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def test_relay_delivers_events_and_stops_on_close(chat_service):
+    relay = chat_service._AgentStreamRelay('arn:hang', {}, 'session-1', None)
+
+    assert relay.messages.get(timeout=5) == ('event', {'type': 'agent_start', 'agent': 'inventory'})
+    assert chat_service.http_client.stats()['openStreams'] == 1
+
+    relay.close()
+    assert _wait_for(lambda: chat_service.http_client.stats()['openStreams'] == 0)
+    assert relay.messages.empty()
+
+
+def test_relay_reports_single_json_body_then_done(chat_service):
+    relay = chat_service._AgentStreamRelay('arn:fast', {}, 'session-1', None)
+
+    assert relay.messages.get(timeout=5) == ('event', {'type': 'fused_response', 'raw': '{"ok": true}'})
+    assert relay.messages.get(timeout=5) == ('done', None)
+    relay.close()
+
+
+def test_closed_generator_stops_the_orchestrator_stream(chat_service, monkeypatch):
+    monkeypatch.setattr(chat_service, 'get_runtime_endpoint_arns', lambda: {'orchestrator': 'arn:hang'})
+    client = chat_service.app.test_client()
+
+    response = client.post('/api/chat', json={'query': 'status?', 'sessionId': 'session-1'}, buffered=False)
+    chunks = response.response
+    assert b'Routing to orchestrator' in next(chunks)
+    assert b'agent_start' in next(chunks)
+    assert chat_service.http_client.stats()['openStreams'] == 1
+
+    # Browser disconnect: the WSGI server closes the response iterator
+    response.close()
+    assert _wait_for(lambda: chat_service.http_client.stats()['openStreams'] == 0)
+
+
+def test_non_streaming_runtime_events_are_relayed_before_final_response(chat_service, monkeypatch):
+    monkeypatch.setattr(chat_service, 'get_runtime_endpoint_arns', lambda: {'orchestrator': 'arn:fused'})
+    monkeypatch.setattr(chat_service, 'actions_table', None)
+    monkeypatch.setattr(chat_service, 'approvals_table', None)
+    client = chat_service.app.test_client()
+
+    body = client.post('/api/chat', json={'query': 'status?', 'sessionId': 'session-1'}).get_data(as_text=True)
+    events = [json.loads(line[5:]) for line in body.splitlines() if line.startswith('data:')]
+
+    assert [event['type'] for event in events] == [
+        'status', 'agent_start', 'agent_result', 'final_response', 'complete',
+    ]
+    assert [event['type'] for event in events[3]['response']['events']] == ['agent_start', 'agent_result']
+    assert events[3]['response']['queryType'] == FUSED_RESPONSE['queryType']
@@ -0,0 +1,77 @@
+import pytest
+
+from orchestrator_agent import app as orchestrator
+
+
+@pytest.fixture
+def breaker(monkeypatch):
+    monkeypatch.setattr(orchestrator, 'BREAKER_MIN_CALLS', 4)
+    monkeypatch.setattr(orchestrator, 'BREAKER_FAILURE_RATE', 0.5)
+    monkeypatch.setattr(orchestrator, 'BREAKER_SLOW_CALL_SECONDS', 5.0)
+    monkeypatch.setattr(orchestrator, 'BREAKER_OPEN_SECONDS', 3600.0)
+    return orchestrator._CircuitBreaker('inventory')
+
+
+def _trip(breaker):
+    for _ in range(4):
+        breaker.record(False, 0.1)
+
+
+def test_opens_once_failure_rate_reaches_threshold_over_min_calls(breaker):
+    breaker.record(False, 0.1)
+    breaker.record(False, 0.1)
+    assert breaker.state == 'closed'
+    breaker.record(True, 0.1)
+    breaker.record(True, 0.1)
+
+    assert breaker.snapshot() == {'state': 'open', 'trips': 1}
+    assert breaker.allow() is False
+
+
+def test_slow_successes_count_as_failures(breaker):
+    for _ in range(4):
+        breaker.record(True, 5.0)
+
+    assert breaker.state == 'open'
+
+
+def test_stays_closed_below_failure_rate(breaker):
+    for ok in (True, False, True, True, False, True):
+        breaker.record(ok, 0.1)
+
+    assert breaker.state == 'closed'
+    assert breaker.allow() is True
+
+
+def test_half_open_lets_one_probe_through_then_closes(breaker, monkeypatch):
+    _trip(breaker)
+    monkeypatch.setattr(orchestrator, 'BREAKER_OPEN_SECONDS', 0.0)
+
+    assert breaker.allow() is True
+    assert breaker.state == 'half_open'
+    assert breaker.allow() is False
+    breaker.record(True, 0.1)
+
+    assert breaker.state == 'closed'
+    assert breaker.allow() is True
+
+
+def test_failed_probe_reopens(breaker, monkeypatch):
+    _trip(breaker)
+    monkeypatch.setattr(orchestrator, 'BREAKER_OPEN_SECONDS', 0.0)
+    assert breaker.allow() is True
+    monkeypatch.setattr(orchestrator, 'BREAKER_OPEN_SECONDS', 3600.0)
+    breaker.record(False, 0.1)
+
+    assert breaker.snapshot() == {'state': 'open', 'trips': 2}
+    assert breaker.allow() is False
+
+
+def test_released_probe_frees_the_slot(breaker, monkeypatch):
+    _trip(breaker)
+    monkeypatch.setattr(orchestrator, 'BREAKER_OPEN_SECONDS', 0.0)
+    assert breaker.allow() is True
+    breaker.release()
+
+    assert breaker.allow() is True
+    assert breaker.state == 'half_open'
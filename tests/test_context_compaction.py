@@ -0,0 +1,102 @@
+import json
+import threading
+
+import pytest
+
+from orchestrator_agent import app as orchestrator
+
+
+def _fused(findings: int = 12, items: int = 20) -> dict:
+    words = 'stock cover for the top skus is below the reorder point at two warehouses ' * 20
+    return {
+        'queryType': 'inventory_status',
+        'summary': words,
+        'decision': {'status': 'warning', 'canFulfill': False, 'blockers': [f"blocker {i} {words}" for i in range(items)]},
+        'riskScore': 71,
+        'riskSignals': [f"signal {i} {words}" for i in range(items)],
+        'agentFindings': [
+            {
+                'agent': f"agent-{n}",
+                'status': 'success',
+                'summary': words,
+                'insights': {'metrics': [f"metric {n}-{i}: {words}" for i in range(items)]},
+                'blockers': [f"blocker {i} {words}" for i in range(items)],
+                'recommendations': [f"recommendation {i} {words}" for i in range(items)],
+            }
+            for n in range(findings)
+        ],
+        'actions': [{'title': f"action {i} {words}"} for i in range(items)],
+        'approvals': [{'title': f"approval {i} {words}"} for i in range(items)],
+        'nextSteps': [f"step {i} {words}" for i in range(items)],
+    }
+
+
+@pytest.mark.parametrize('budget', [4000, 1200, 400, 150, 100])
+def test_briefing_context_is_valid_json_within_budget(budget):
+    text = orchestrator._compact_briefing_context(_fused(), max_tokens=budget)
+
+    context = json.loads(text)
+    assert orchestrator._estimate_tokens(text) <= budget
+    assert context['queryType'] == 'inventory_status'
+    assert context['decision']['status'] == 'warning'
+    assert context['agentFindings'][0]['agent'] == 'agent-0'
+
+
+def test_briefing_context_drops_findings_before_their_details():
+    # Below what the tightest cap level produces for twelve findings
+    text = orchestrator._compact_briefing_context(_fused(), max_tokens=700)
+
+    context = json.loads(text)
+    assert 1 < len(context['agentFindings']) < 12
+    assert all('metrics' in finding for finding in context['agentFindings'])
+    assert context['actions']
+
+
+def test_briefing_context_over_budget_still_returns_json():
+    text = orchestrator._compact_briefing_context(_fused(findings=1), max_tokens=1)
+
+    context = json.loads(text)
+    assert set(context) >= {'queryType', 'decision', 'agentFindings'}
+    assert 'actions' not in context and 'summary' not in context['agentFindings'][0]
+
+
+def test_specialist_context_fits_its_char_limit(monkeypatch):
+    monkeypatch.setattr(orchestrator, 'data_version_token', lambda *args: None)
+    upstream = [
+        {
+            'agentType': f"agent-{n}",
+            'confidence': 0.8,
+            'structured': {
+                'status': 'success',
+                'summary': 'demand is rising for the top skus ' * 40,
+                'metrics': {f"metric{i}": i * 1.5 for i in range(40)},
+            },
+        }
+        for n in range(4)
+    ]
+
+    context = orchestrator._compact_specialist_context('risk', upstream)
+
+    assert len(json.dumps(context, separators=(',', ':'), default=str)) <= orchestrator.SPECIALIST_CONTEXT_MAX_CHARS
+    assert [entry['agentType'] for entry in context['completedAgents']] == [f"agent-{n}" for n in range(4)]
+
+
+def test_worker_agents_are_per_thread_and_start_empty(monkeypatch):
+    class _FakeAgent:
+        def __init__(self):
+            self.messages = []
+
+    monkeypatch.setattr(orchestrator, '_build_agent', lambda **kwargs: _FakeAgent())
+    monkeypatch.setattr(orchestrator, '_worker_agents', threading.local())
+
+    planner = orchestrator._worker_agent('planner')
+    planner.messages.extend([{'role': 'user'}, {'role': 'assistant'}])
+    assert orchestrator._worker_agent('planner') is planner
+    assert planner.messages == []
+    assert orchestrator._worker_agent('narrative') is not planner
+
+    other_thread = []
+    worker = threading.Thread(target=lambda: other_thread.append(orchestrator._worker_agent('planner')))
+    worker.start()
+    worker.join()
+    assert other_thread[0] is not planner
@@ -0,0 +1,67 @@
+import random
+
+from orchestrator_agent import app as orchestrator
+
+WORDS = ['restock', 'stock', 'sku', 'sku-1', 'warehouse', 'expedite', 'order', 'po', 're', 'ship', 'hub', 'east']
+
+
+def _linear_find(entries, query):
+    """The scan _DedupMatcher replaced: first key contained in / containing the query, or sharing 3 words."""
+    for key, info in entries.items():
+        text = orchestrator._action_match_text(key)
+        if text in query or query in text:
+            return info
+        if len(set(text.split()) & set(query.split())) >= 3:
+            return info
+    return None
+
+
+def _phrase(rng, low, high):
+    return ' '.join(rng.choice(WORDS) for _ in range(rng.randint(low, high)))
+
+
+def test_matches_linear_scan_on_random_keys():
+    rng = random.Random(7)
+    for _ in range(200):
+        entries = {}
+        matcher = orchestrator._DedupMatcher(orchestrator._action_match_text)
+        for n in range(rng.randint(0, 12)):
+            key = _phrase(rng, 1, 6)
+            if rng.random() < 0.3:
+                key += '|sku-1,sku-2'
+            info = {'actionId': f"act-{n}"}
+            entries[key] = info
+            matcher.upsert(key, info)
+        for _ in range(10):
+            query = _phrase(rng, 0, 6)
+            assert matcher.find(query) == _linear_find(entries, query), (list(entries), query)
+
+
+def test_substring_of_a_word_matches_short_key():
+    matcher = orchestrator._DedupMatcher(str)
+    matcher.upsert('stock', {'approvalId': 'a-1'})
+
+    assert matcher.find('approve restock order') == {'approvalId': 'a-1'}
+
+
+def test_upsert_keeps_first_insertion_position():
+    matcher = orchestrator._DedupMatcher(str)
+    matcher.upsert('expedite east hub order', {'approvalId': 'a-1'})
+    matcher.upsert('expedite east hub', {'approvalId': 'a-2'})
+    matcher.upsert('expedite east hub order', {'approvalId': 'a-3'})
+
+    assert matcher.find('expedite east hub order now') == {'approvalId': 'a-3'}
+
+
+def test_upserting_a_copy_leaves_the_published_matcher_untouched():
+    published = orchestrator._DedupMatcher(str)
+    published.upsert('expedite east hub', {'approvalId': 'a-1'})
+
+    updated = published.copy()
+    updated.upsert('restock sku-1', {'approvalId': 'a-2'})
+    updated.upsert('expedite east hub', {'approvalId': 'a-3'})
+
+    assert published.find('restock sku-1') is None
+    assert published.find('expedite east hub') == {'approvalId': 'a-1'}
+    assert updated.find('restock sku-1') == {'approvalId': 'a-2'}
+    assert updated.find('expedite east hub') == {'approvalId': 'a-3'}
@@ -0,0 +1,87 @@
+import threading
+import time
+
+import boto3
+import pytest
+from boto3.dynamodb.conditions import Key
+from moto import mock_aws
+
+from common import dynamo
+
+
+@pytest.fixture
+def table():
+    with mock_aws():
+        table = boto3.resource('dynamodb').create_table(
+            TableName='supplysense-test',
+            KeySchema=[{'AttributeName': 'pk', 'KeyType': 'HASH'}, {'AttributeName': 'sk', 'KeyType': 'RANGE'}],
+            AttributeDefinitions=[
+                {'AttributeName': 'pk', 'AttributeType': 'S'},
+                {'AttributeName': 'sk', 'AttributeType': 'S'},
+            ],
+            BillingMode='PAY_PER_REQUEST',
+        )
+        with table.batch_writer() as batch:
+            for index in range(250):
+                batch.put_item(Item={'pk': f"P{index % 5}", 'sk': f"{index:04d}", 'n': index})
+        yield table
+
+
+def test_parallel_scan_returns_every_item(table):
+    items = dynamo.scan_all(table, segments=4, Limit=20)
+
+    assert sorted(item['n'] for item in items) == list(range(250))
+
+
+def test_batch_get_keeps_input_order_and_dedupes(table):
+    keys = [{'pk': f"P{index % 5}", 'sk': f"{index:04d}"} for index in reversed(range(250))]
+    keys += keys[:10] + [{'pk': 'P0', 'sk': 'missing'}]
+
+    items = dynamo.batch_get_items(table, keys, max_workers=3)
+
+    assert [item['n'] for item in items] == list(reversed(range(250)))
+
+
+def test_query_many_lines_up_with_requests(table):
+    requests = [{'KeyConditionExpression': Key('pk').eq(f"P{index}")} for index in (3, 0, 4)]
+
+    results = dynamo.query_many(table, requests, max_workers=2)
+
+    assert [sorted({item['pk'] for item in result}) for result in results] == [['P3'], ['P0'], ['P4']]
+    assert [len(result) for result in results] == [50, 50, 50]
+
+
+def test_worker_resources_are_reused_across_calls(table, monkeypatch):
+    created = []
+    session_class = boto3.session.Session
+
+    class _CountingSession(session_class):
+        def resource(self, *args, **kwargs):
+            created.append(args)
+            return super().resource(*args, **kwargs)
+
+    monkeypatch.setattr(boto3.session, 'Session', _CountingSession)
+    keys = [{'pk': f"P{index % 5}", 'sk': f"{index:04d}"} for index in range(250)]
+    for _ in range(10):
+        dynamo.scan_all(table, segments=4)
+        dynamo.batch_get_items(table, keys, max_workers=3)
+
+    # At most one resource per shared worker, however many calls run
+    assert len(created) <= dynamo.DYNAMO_POOL_WORKERS
+
+
+def test_run_bounded_caps_in_flight():
+    lock = threading.Lock()
+    state = {'running': 0, 'peak': 0}
+
+    def _work(value):
+        with lock:
+            state['running'] += 1
+            state['peak'] = max(state['peak'], state['running'])
+        time.sleep(0.01)
+        with lock:
+            state['running'] -= 1
+        return value * 2
+
+    assert dynamo._run_bounded(_work, list(range(20)), 3) == [value * 2 for value in range(20)]
+    assert state['peak'] <= 3
@@ -0,0 +1,136 @@
+import json
+import threading
+import time
+
+import boto3
+import pytest
+from moto import mock_aws
+
+ACCOUNT = '123456789012'
+
+
+@pytest.fixture
+def notifications(monkeypatch):
+    with mock_aws():
+        from orchestrator_agent import app as orchestrator
+
+        dynamodb = boto3.resource('dynamodb', region_name='us-east-1')
+        table = dynamodb.create_table(
+            TableName='supplysense-actions',
+            KeySchema=[{'AttributeName': 'PK', 'KeyType': 'HASH'}, {'AttributeName': 'SK', 'KeyType': 'RANGE'}],
+            AttributeDefinitions=[
+                {'AttributeName': 'PK', 'AttributeType': 'S'},
+                {'AttributeName': 'SK', 'AttributeType': 'S'},
+            ],
+            BillingMode='PAY_PER_REQUEST',
+        )
+        topic_arn = boto3.client('sns').create_topic(Name=f"supplysense-action-events-{ACCOUNT}-us-east-1")['TopicArn']
+        sqs = boto3.client('sqs')
+        queue_url = sqs.create_queue(QueueName='events')['QueueUrl']
+        queue_arn = sqs.get_queue_attributes(QueueUrl=queue_url, AttributeNames=['QueueArn'])['Attributes']['QueueArn']
+        boto3.client('sns').subscribe(TopicArn=topic_arn, Protocol='sqs', Endpoint=queue_arn)
+
+        drafts = []
+        release = threading.Event()
+
+        def _draft(item, notification_type):
+            release.wait(5)
+            drafts.append(item['id'])
+            return {'subject': f"Drafted: {item['description']}", 'body': 'LLM body'}
+
+        monkeypatch.setattr(orchestrator, 'dynamodb', dynamodb)
+        monkeypatch.setattr(orchestrator, 'sns', boto3.client('sns', region_name='us-east-1'))
+        monkeypatch.setattr(orchestrator, '_generate_notification_draft', _draft)
+        monkeypatch.setattr(orchestrator, '_events_topic_arns', {})
+        orchestrator._notification_cache.invalidate_where(lambda key: True)
+        yield orchestrator, table, sqs, queue_url, drafts, release
+        release.set()
+
+
+def _action(suffix):
+    return {
+        'id': f"execute_replenishment_plan-{suffix}",
+        'description': 'Execute replenishment plan based on demand trends',
+        'owner': 'Procurement',
+        'data': {'totalShortageUnits': 40},
+    }
+
+
+def _persist(table, session_id, action, draft, source):
+    table.put_item(Item={
+        'PK': f"SESSION#{session_id}",
+        'SK': f"ACTION#{action['id']}",
+        'notificationSubject': draft['subject'],
+        'payload': {**action, 'notification': draft, 'notificationSource': source},
+    })
+
+
+def _wait_for(predicate, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def test_draft_attaches_to_each_response_row_and_is_published(notifications):
+    orchestrator, table, sqs, queue_url, drafts, release = notifications
+    first, second = _action('aaa'), _action('bbb')
+
+    draft, source = orchestrator._queue_notification_draft(first, 'action', 'session-1')
+    assert source == 'pending'
+    assert draft['subject']
+    # A repeat answer in the same session waits on the same in-flight draft
+    second_draft, second_source = orchestrator._queue_notification_draft(second, 'action', 'session-1')
+    assert second_source == 'pending'
+
+    # The chat service persists the rows after the response is returned
+    release.set()
+    time.sleep(0.3)
+    _persist(table, 'session-1', first, draft, 'pending')
+    _persist(table, 'session-1', second, second_draft, 'pending')
+
+    def _attached(action):
+        item = table.get_item(Key={'PK': 'SESSION#session-1', 'SK': f"ACTION#{action['id']}"})['Item']
+        return item.get('notificationSource') == 'llm'
+
+    assert _wait_for(lambda: _attached(first) and _attached(second))
+    assert len(drafts) == 1
+    row = table.get_item(Key={'PK': 'SESSION#session-1', 'SK': f"ACTION#{first['id']}"})['Item']
+    assert row['payload']['notification']['body'] == 'LLM body'
+    assert row['payload']['notificationSource'] == 'llm'
+
+    messages = []
+    assert _wait_for(lambda: messages.extend(
+        sqs.receive_message(QueueUrl=queue_url, MaxNumberOfMessages=10).get('Messages', [])
+    ) or len(messages) >= 2)
+    envelopes = [json.loads(message['Body']) for message in messages]
+    assert {envelope['MessageAttributes']['actionId']['Value'] for envelope in envelopes} == {first['id'], second['id']}
+    assert all(envelope['MessageAttributes']['eventType']['Value'] == 'ACTION_NOTIFICATION_DRAFTED' for envelope in envelopes)
+    assert all(envelope['Message'] == 'LLM body' for envelope in envelopes)
+
+
+def test_cached_draft_is_returned_directly(notifications):
+    orchestrator, _, _, _, drafts, _ = notifications
+    key = orchestrator._notification_key(_action('aaa'), 'action')
+    orchestrator._notification_cache.set(key, {'subject': 'cached', 'body': 'cached body'})
+
+    # Same details under a new per-response ID hit the same cache entry
+    assert orchestrator._queue_notification_draft(_action('ccc'), 'action', 's') == (
+        {'subject': 'cached', 'body': 'cached body'}, 'llm',
+    )
+    assert drafts == []
+
+
+def test_missing_row_is_retried_without_holding_a_worker(notifications, monkeypatch):
+    orchestrator, _, _, _, _, _ = notifications
+    monkeypatch.setattr(orchestrator, 'NOTIFICATION_ATTACH_ATTEMPTS', 2)
+    scheduled = []
+    monkeypatch.setattr(orchestrator, '_retry_attach_later', lambda delay, *args: scheduled.append((delay, args)))
+
+    orchestrator._attach_notification_draft('action', 'missing', 'session-1', {'subject': 's', 'body': 'b'})
+    assert scheduled == [(0.5, ('action', 'missing', 'session-1', {'subject': 's', 'body': 'b'}, 1))]
+
+    orchestrator._attach_notification_draft(*scheduled[0][1])
+    assert len(scheduled) == 1
@@ -0,0 +1,55 @@
+import boto3
+import pytest
+from moto import mock_aws
+
+from common.orders import ROLLUP_BACKFILL_KEY, query_daily_rollups, query_order_lines, query_product_rollups
+
+
+@pytest.fixture
+def dynamodb():
+    with mock_aws():
+        resource = boto3.resource('dynamodb')
+        table = resource.create_table(
+            TableName='supplysense-order-daily-rollup',
+            KeySchema=[{'AttributeName': 'scope', 'KeyType': 'HASH'}, {'AttributeName': 'day', 'KeyType': 'RANGE'}],
+            AttributeDefinitions=[
+                {'AttributeName': 'scope', 'AttributeType': 'S'},
+                {'AttributeName': 'day', 'AttributeType': 'S'},
+            ],
+            BillingMode='PAY_PER_REQUEST',
+        )
+        for product_id, day, units in [('P1', '2026-03-01', 4), ('P1', '2026-03-05', 2), ('P2', '2026-03-05', 7)]:
+            table.put_item(Item={'scope': f"PRODUCT#{product_id}", 'day': day, 'orderCount': 1, 'units': units, 'value': 10})
+        table.put_item(Item={'scope': 'PRODUCT#P3', 'day': '2026-03-05', 'orderCount': 0, 'units': 0, 'value': 0})
+        table.put_item(Item={**ROLLUP_BACKFILL_KEY, 'ordersProcessed': 4})
+        yield resource
+
+
+def test_product_rollups_match_single_scope_queries(dynamodb):
+    products = ['P1', 'P2', 'P3', 'P4', 'P1']
+    combined = query_product_rollups(dynamodb, products, start_day='2026-03-02')
+
+    assert list(combined) == ['P1', 'P2', 'P3', 'P4']
+    for product_id, days in combined.items():
+        assert days == query_daily_rollups(dynamodb, start_day='2026-03-02', product_id=product_id)
+    assert combined['P1'] == {'2026-03-05': {'orderCount': 1, 'units': 2, 'value': 10.0, 'productIds': []}}
+    assert combined['P3'] == {}
+
+
+def test_product_rollups_unavailable():
+    with mock_aws():
+        assert query_product_rollups(boto3.resource('dynamodb'), ['P1']) is None
+        assert query_product_rollups(boto3.resource('dynamodb'), []) == {}
+
+
+def test_rollups_and_order_lines_are_not_trusted_before_the_backfill(dynamodb):
+    dynamodb.Table('supplysense-order-daily-rollup').delete_item(Key=ROLLUP_BACKFILL_KEY)
+
+    assert query_daily_rollups(dynamodb, start_day='2026-03-02') is None
+    assert query_product_rollups(dynamodb, ['P1']) is None
+    assert query_order_lines(dynamodb, 'P1') is None
+
+
+def test_backfilled_rollups_report_a_quiet_window_as_empty(dynamodb):
+    assert query_daily_rollups(dynamodb, start_day='2026-04-01') == {}
+    assert query_product_rollups(dynamodb, ['P1'], start_day='2026-04-01') == {'P1': {}}
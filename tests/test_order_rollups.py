@@ -0,0 +1,147 @@
+import boto3
+import pytest
+from moto import mock_aws
+
+from conftest import load_lambda
+
+TABLES = {
+    'supplysense-order-daily-rollup': ('scope', 'day'),
+    'supplysense-order-lines': ('productId', 'lineKey'),
+    'supplysense-order-rollup-orders': ('orderId', None),
+    'supplysense-data-versions': ('source', None),
+    'supplysense-orders': ('orderId', None),
+}
+
+
+@pytest.fixture
+def rollups():
+    with mock_aws():
+        client = boto3.client('dynamodb')
+        for name, (hash_key, range_key) in TABLES.items():
+            keys = [{'AttributeName': hash_key, 'KeyType': 'HASH'}]
+            attributes = [{'AttributeName': hash_key, 'AttributeType': 'S'}]
+            if range_key:
+                keys.append({'AttributeName': range_key, 'KeyType': 'RANGE'})
+                attributes.append({'AttributeName': range_key, 'AttributeType': 'S'})
+            client.create_table(
+                TableName=name, KeySchema=keys, AttributeDefinitions=attributes, BillingMode='PAY_PER_REQUEST',
+            )
+        yield load_lambda('order-rollups')
+
+
+def _order(quantity, order_id='ORD-1', day='2026-03-02', products=('PROD-1',)):
+    return {
+        'orderId': {'S': order_id},
+        'orderDate': {'S': f"{day}T10:00:00Z"},
+        'status': {'S': 'pending'},
+        'quantity': {'N': str(quantity)},
+        'value': {'N': str(quantity * 10)},
+        'productIds': {'L': [{'S': product_id} for product_id in products]},
+    }
+
+
+def _record(sequence, old=None, new=None, order_id='ORD-1'):
+    image = {'Keys': {'orderId': {'S': order_id}}, 'SequenceNumber': sequence}
+    if old:
+        image['OldImage'] = old
+    if new:
+        image['NewImage'] = new
+    return {'eventID': sequence, 'dynamodb': image}
+
+
+def _row(rollups, scope, day='2026-03-02'):
+    return rollups.rollup_table.get_item(Key={'scope': scope, 'day': day}).get('Item')
+
+
+def test_redelivered_batch_is_applied_once(rollups):
+    batch = {'Records': [
+        _record('100', new=_order(5)),
+        _record('200', old=_order(5), new=_order(8)),
+    ]}
+    assert rollups.handler(batch, None) == {'batchItemFailures': []}
+    assert rollups.handler(batch, None) == {'batchItemFailures': []}
+
+    for scope in ('ALL', 'PRODUCT#PROD-1'):
+        row = _row(rollups, scope)
+        assert row['orderCount'] == 1
+        assert row['units'] == 8
+        assert float(row['value']) == 80.0
+        assert 'orderIds' not in row
+    assert _row(rollups, 'ALL')['productIds'] == {'PROD-1'}
+
+
+def test_retried_delta_is_skipped_but_later_delta_applies(rollups):
+    rollups.handler({'Records': [_record('100', new=_order(5))]}, None)
+    delta = {'Records': [_record('200', old=_order(5), new=_order(8))]}
+    rollups.handler(delta, None)
+    rollups.handler(delta, None)
+    rollups.handler({'Records': [_record('300', old=_order(8), new=_order(6))]}, None)
+
+    assert _row(rollups, 'ALL')['units'] == 6
+
+
+def test_order_moved_to_another_day(rollups):
+    rollups.handler({'Records': [
+        _record('100', new=_order(5)),
+        _record('200', old=_order(5), new=_order(5, day='2026-03-03')),
+    ]}, None)
+    rollups.handler({'Records': [_record('200', old=_order(5), new=_order(5, day='2026-03-03'))]}, None)
+
+    old_row = _row(rollups, 'ALL')
+    assert old_row['orderCount'] == 0 and old_row['units'] == 0
+    assert not old_row.get('productIds')
+    new_row = _row(rollups, 'ALL', day='2026-03-03')
+    assert new_row['orderCount'] == 1 and new_row['units'] == 5
+
+
+def test_products_pruned_from_day_once_no_order_lists_them(rollups):
+    rollups.handler({'Records': [
+        _record('100', new=_order(5)),
+        _record('200', new=_order(3, order_id='ORD-2', products=('PROD-1', 'PROD-2')), order_id='ORD-2'),
+        _record('300', old=_order(5), new=_order(5, products=('PROD-3',))),
+    ]}, None)
+    assert _row(rollups, 'ALL')['productIds'] == {'PROD-1', 'PROD-2', 'PROD-3'}
+
+    rollups.handler({'Records': [_record('400', old=_order(3, order_id='ORD-2', products=('PROD-1', 'PROD-2')), order_id='ORD-2')]}, None)
+
+    row = _row(rollups, 'ALL')
+    assert row['productIds'] == {'PROD-3'}
+    assert row['orderCount'] == 1 and row['units'] == 5
+    assert rollups.state_table.get_item(Key={'orderId': 'ORD-2'})['Item']['contributions'] == []
+
+
+def test_batch_bumps_orders_version(rollups):
+    rollups.handler({'Records': [_record('100', new=_order(5)), _record('200', new=_order(3, order_id='ORD-2'), order_id='ORD-2')]}, None)
+
+    version = rollups.versions_table.get_item(Key={'source': 'supplysense-orders'})['Item']
+    assert version['version'] == 2
+    assert version['lastSequenceNumber'] == '200'
+
+
+def test_backfill_writes_the_completion_marker(rollups):
+    assert rollups.handler({'backfill': True}, None)['ordersProcessed'] == 0
+
+    marker = rollups.rollup_table.get_item(Key={'scope': '#BACKFILL', 'day': '#'})['Item']
+    assert marker['ordersProcessed'] == 0
+
+
+def _lines(rollups):
+    return sorted((line['productId'], line['lineKey']) for line in rollups.dynamodb.Table('supplysense-order-lines').scan()['Items'])
+
+
+def test_stale_backfill_image_does_not_restore_order_lines(rollups):
+    rollups.handler({'Records': [
+        _record('100', new=_order(5)),
+        _record('200', old=_order(5), new=_order(5, products=('PROD-2',))),
+    ]}, None)
+    assert _lines(rollups) == [('PROD-2', '2026-03-02T10:00:00Z#ORD-1')]
+
+    # The backfill scan read the order before the stream update above
+    rollups.dynamodb.Table('supplysense-orders').put_item(Item={
+        'orderId': 'ORD-1', 'orderDate': '2026-03-02T10:00:00Z', 'status': 'pending',
+        'quantity': 5, 'value': 50, 'productIds': ['PROD-1'],
+    })
+    rollups.handler({'backfill': True}, None)
+
+    assert _lines(rollups) == [('PROD-2', '2026-03-02T10:00:00Z#ORD-1')]
+    assert _row(rollups, 'PRODUCT#PROD-1')['orderCount'] == 0
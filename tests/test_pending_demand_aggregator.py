@@ -0,0 +1,153 @@
+import json
+
+import boto3
+import pytest
+from moto import mock_aws
+
+from conftest import load_lambda
+
+TABLES = {
+    'supplysense-pending-demand': ('productId',),
+    'supplysense-pending-demand-orders': ('orderId',),
+    'supplysense-pending-demand-lines': ('productId', 'orderId'),
+    'supplysense-orders': ('orderId',),
+}
+
+
+@pytest.fixture
+def aggregator():
+    with mock_aws():
+        client = boto3.client('dynamodb')
+        for name, keys in TABLES.items():
+            client.create_table(
+                TableName=name,
+                KeySchema=[{'AttributeName': key, 'KeyType': key_type} for key, key_type in zip(keys, ('HASH', 'RANGE'))],
+                AttributeDefinitions=[{'AttributeName': key, 'AttributeType': 'S'} for key in keys],
+                BillingMode='PAY_PER_REQUEST',
+            )
+        yield load_lambda('pending-demand-aggregator')
+
+
+def _order(quantity, status='pending', order_id='ORD-1'):
+    return {
+        'orderId': {'S': order_id},
+        'status': {'S': status},
+        'value': {'N': str(quantity * 10)},
+        'items': {'L': [{'M': {
+            'productId': {'S': 'PROD-1'},
+            'quantity': {'N': str(quantity)},
+            'unitPrice': {'N': '10'},
+        }}]},
+    }
+
+
+def _record(sequence, old=None, new=None, order_id='ORD-1'):
+    image = {'Keys': {'orderId': {'S': order_id}}, 'SequenceNumber': sequence}
+    if old:
+        image['OldImage'] = old
+    if new:
+        image['NewImage'] = new
+    return {'eventID': sequence, 'dynamodb': image}
+
+
+def _row(aggregator):
+    return aggregator.demand_table.get_item(Key={'productId': 'PROD-1'}).get('Item')
+
+
+def _state(aggregator, order_id='ORD-1'):
+    return aggregator.state_table.get_item(Key={'orderId': order_id}).get('Item')
+
+
+def _pending_lines(aggregator):
+    return aggregator.dynamodb.Table('supplysense-pending-demand-lines').scan()['Items']
+
+
+def _order_count(aggregator):
+    return aggregator.demand_table.get_item(Key={'productId': '#SUMMARY'})['Item']['orderCount']
+
+
+def test_redelivered_batch_is_applied_once(aggregator):
+    batch = {'Records': [
+        _record('100', new=_order(5)),
+        _record('200', old=_order(5), new=_order(8)),
+    ]}
+    assert aggregator.handler(batch, None) == {'batchItemFailures': []}
+    assert aggregator.handler(batch, None) == {'batchItemFailures': []}
+
+    row = _row(aggregator)
+    assert row['pendingUnits'] == 8
+    assert float(row['pendingValue']) == 80.0
+    assert row['orderCount'] == 1
+    assert set(row) == {'productId', 'pendingUnits', 'pendingValue', 'orderCount', 'updatedAt'}
+    assert _state(aggregator)['lines'] == {'PROD-1': {'units': 8, 'value': 80}}
+    assert _pending_lines(aggregator) == [{'productId': 'PROD-1', 'orderId': 'ORD-1'}]
+    assert _order_count(aggregator) == 1
+
+
+def test_retried_delta_is_skipped_but_later_delta_applies(aggregator):
+    aggregator.handler({'Records': [_record('100', new=_order(5))]}, None)
+    delta = {'Records': [_record('200', old=_order(5), new=_order(8))]}
+    aggregator.handler(delta, None)
+    aggregator.handler(delta, None)
+    aggregator.handler({'Records': [_record('300', old=_order(8), new=_order(6))]}, None)
+
+    assert _row(aggregator)['pendingUnits'] == 6
+
+
+def test_sequence_numbers_compare_numerically(aggregator):
+    aggregator.handler({'Records': [_record('9', new=_order(5))]}, None)
+    aggregator.handler({'Records': [_record('10', old=_order(5), new=_order(7))]}, None)
+
+    assert _row(aggregator)['pendingUnits'] == 7
+
+
+def test_fulfilled_order_leaves_no_demand(aggregator):
+    aggregator.handler({'Records': [
+        _record('100', new=_order(5)),
+        _record('200', old=_order(5), new=_order(5, status='fulfilled')),
+    ]}, None)
+    aggregator.handler({'Records': [_record('200', old=_order(5), new=_order(5, status='fulfilled'))]}, None)
+
+    row = _row(aggregator)
+    assert row['pendingUnits'] == 0
+    assert row['orderCount'] == 0
+    state = _state(aggregator)
+    assert state['lines'] == {}
+    assert state['expiresAt'] > 0
+    assert _pending_lines(aggregator) == []
+    assert _order_count(aggregator) == 0
+
+    # An older record redelivered after the order left the pending set is still skipped
+    aggregator.handler({'Records': [_record('100', new=_order(5))]}, None)
+    assert _row(aggregator)['pendingUnits'] == 0
+
+
+def test_stream_insert_after_backfill_is_not_counted_twice(aggregator):
+    aggregator.dynamodb.Table('supplysense-orders').put_item(Item={
+        'orderId': 'ORD-1', 'status': 'pending', 'value': 50,
+        'items': [{'productId': 'PROD-1', 'quantity': 5, 'unitPrice': 10}],
+    })
+    aggregator.handler({'backfill': True}, None)
+    aggregator.handler({'Records': [_record('100', new=_order(5))]}, None)
+    aggregator.handler({'backfill': True}, None)
+
+    row = _row(aggregator)
+    assert row['pendingUnits'] == 5
+    assert row['orderCount'] == 1
+
+
+def test_oversized_order_is_parked_on_the_failure_queue(aggregator, monkeypatch):
+    queue_url = boto3.client('sqs').create_queue(QueueName='supplysense-pending-demand-failures')['QueueUrl']
+    monkeypatch.setattr(aggregator, 'FAILURE_QUEUE_URL', queue_url)
+    oversized = _order(1)
+    oversized['items']['L'] = [
+        {'M': {'productId': {'S': f'PROD-{index}'}, 'quantity': {'N': '1'}, 'unitPrice': {'N': '10'}}}
+        for index in range(60)
+    ]
+    batch = {'Records': [_record('100', new=oversized), _record('200', new=_order(5), order_id='ORD-2')]}
+
+    assert aggregator.handler(batch, None) == {'batchItemFailures': []}
+    assert _state(aggregator) is None
+    assert _row(aggregator)['pendingUnits'] == 5
+    messages = boto3.client('sqs').receive_message(QueueUrl=queue_url)['Messages']
+    assert [json.loads(message['Body'])['orderId'] for message in messages] == ['ORD-1']
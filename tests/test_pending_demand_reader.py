@@ -0,0 +1,82 @@
+import boto3
+import pytest
+from moto import mock_aws
+
+from common.orders import (
+    PENDING_DEMAND_BACKFILL_KEY,
+    PENDING_DEMAND_SUMMARY_KEY,
+    load_pending_demand,
+    query_pending_order_ids,
+)
+from conftest import load_lambda
+
+
+@pytest.fixture
+def dynamodb():
+    with mock_aws():
+        resource = boto3.resource('dynamodb')
+        resource.create_table(
+            TableName='supplysense-pending-demand',
+            KeySchema=[{'AttributeName': 'productId', 'KeyType': 'HASH'}],
+            AttributeDefinitions=[{'AttributeName': 'productId', 'AttributeType': 'S'}],
+            BillingMode='PAY_PER_REQUEST',
+        )
+        resource.create_table(
+            TableName='supplysense-pending-demand-orders',
+            KeySchema=[{'AttributeName': 'orderId', 'KeyType': 'HASH'}],
+            AttributeDefinitions=[{'AttributeName': 'orderId', 'AttributeType': 'S'}],
+            BillingMode='PAY_PER_REQUEST',
+        )
+        resource.create_table(
+            TableName='supplysense-pending-demand-lines',
+            KeySchema=[
+                {'AttributeName': 'productId', 'KeyType': 'HASH'},
+                {'AttributeName': 'orderId', 'KeyType': 'RANGE'},
+            ],
+            AttributeDefinitions=[
+                {'AttributeName': 'productId', 'AttributeType': 'S'},
+                {'AttributeName': 'orderId', 'AttributeType': 'S'},
+            ],
+            BillingMode='PAY_PER_REQUEST',
+        )
+        resource.create_table(
+            TableName='supplysense-orders',
+            KeySchema=[{'AttributeName': 'orderId', 'KeyType': 'HASH'}],
+            AttributeDefinitions=[{'AttributeName': 'orderId', 'AttributeType': 'S'}],
+            BillingMode='PAY_PER_REQUEST',
+        )
+        yield resource
+
+
+def test_missing_table_is_not_authoritative():
+    with mock_aws():
+        assert load_pending_demand(boto3.resource('dynamodb')) is None
+
+
+def test_empty_or_unseeded_aggregate_is_not_authoritative(dynamodb):
+    assert load_pending_demand(dynamodb) is None
+
+    dynamodb.Table('supplysense-pending-demand').put_item(
+        Item={'productId': 'PROD-1', 'pendingUnits': 4, 'pendingValue': 40, 'orderCount': 1},
+    )
+    assert load_pending_demand(dynamodb) is None
+
+
+def test_backfilled_aggregate_is_authoritative_even_when_empty(dynamodb):
+    aggregator = load_lambda('pending-demand-aggregator')
+    assert aggregator.handler({'backfill': True}, None)['ordersProcessed'] == 0
+    assert load_pending_demand(dynamodb) == {}
+
+    dynamodb.Table('supplysense-orders').put_item(Item={
+        'orderId': 'ORD-1', 'status': 'pending', 'value': 40,
+        'items': [{'productId': 'PROD-1', 'quantity': 4, 'unitPrice': 10}],
+    })
+    aggregator.handler({'backfill': True}, None)
+
+    demand = load_pending_demand(dynamodb)
+    assert PENDING_DEMAND_BACKFILL_KEY not in demand
+    assert demand == {
+        'PROD-1': {'pendingUnits': 4, 'pendingValue': 40.0, 'orderCount': 1},
+        PENDING_DEMAND_SUMMARY_KEY: {'pendingUnits': 0, 'pendingValue': 0.0, 'orderCount': 1},
+    }
+    assert query_pending_order_ids(dynamodb, ['PROD-1', 'PROD-2']) == {'PROD-1': ['ORD-1'], 'PROD-2': []}
@@ -0,0 +1,56 @@
+import boto3
+import pytest
+from moto import mock_aws
+
+from common.runtime_arns import RuntimeArnResolver
+
+ARN = 'arn:aws:bedrock-agentcore:us-east-1:123456789012:runtime/{name}'
+
+
+@pytest.fixture
+def ssm():
+    with mock_aws():
+        yield boto3.client('ssm', region_name='us-east-1')
+
+
+def _put(ssm, agent_type, value):
+    ssm.put_parameter(Name=f"/supplysense/agents/{agent_type}/invoke-arn", Value=value, Type='String', Overwrite=True)
+
+
+def test_loads_every_invoke_arn_across_pages(ssm):
+    agent_types = [f"agent{n}" for n in range(12)]
+    for agent_type in agent_types:
+        _put(ssm, agent_type, ARN.format(name=agent_type))
+    ssm.put_parameter(Name='/supplysense/agents/agent0/runtime-id', Value='ignored', Type='String')
+
+    arns = RuntimeArnResolver(ssm, ttl=3600).all()
+
+    assert arns == {agent_type: ARN.format(name=agent_type) for agent_type in agent_types}
+
+
+def test_strips_endpoint_suffix(ssm):
+    _put(ssm, 'orchestrator', ARN.format(name='orch') + '/runtime-endpoint/DEFAULT')
+
+    assert RuntimeArnResolver(ssm, ttl=3600).get('orchestrator') == ARN.format(name='orch')
+
+
+def test_failed_refresh_keeps_previous_map(ssm, monkeypatch):
+    _put(ssm, 'inventory', ARN.format(name='inv'))
+    resolver = RuntimeArnResolver(ssm, ttl=3600)
+    assert resolver.get('inventory') == ARN.format(name='inv')
+
+    def _fail():
+        raise RuntimeError('throttled')
+
+    monkeypatch.setattr(resolver, '_load', _fail)
+    assert resolver.refresh() == {'inventory': ARN.format(name='inv')}
+
+
+def test_unknown_agent_reloads_after_miss_interval(ssm, monkeypatch):
+    resolver = RuntimeArnResolver(ssm, ttl=3600)
+    assert resolver.get('risk') is None
+    _put(ssm, 'risk', ARN.format(name='risk'))
+    assert resolver.get('risk') is None
+
+    monkeypatch.setattr('common.runtime_arns._MISS_RELOAD_SECONDS', 0.0)
+    assert resolver.get('risk') == ARN.format(name='risk')
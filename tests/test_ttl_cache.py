@@ -0,0 +1,94 @@
+from common import cache, inventory
+from common.cache import TTLCache
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(cache.time, 'monotonic', clock)
+    entries = TTLCache(ttl=10)
+    entries.set('inventory', 1)
+    entries.set('orders', 2, ttl=30)
+
+    clock.now += 10
+    assert entries.get('inventory') is None
+    assert entries.get('orders') == 2
+    assert entries.stats() == {'entries': 1, 'hits': 1, 'misses': 1, 'hitRate': 0.5}
+
+
+def test_least_recently_used_entry_is_evicted():
+    entries = TTLCache(maxsize=2)
+    entries.set('a', 1)
+    entries.set('b', 2)
+    entries.get('a')
+    entries.set('c', 3)
+
+    assert entries.get('b') is None
+    assert (entries.get('a'), entries.get('c')) == (1, 3)
+
+
+def test_get_or_load_caches_falsy_values():
+    entries = TTLCache()
+    loads = []
+
+    def _load():
+        loads.append(1)
+        return []
+
+    assert entries.get_or_load('empty', _load) == []
+    assert entries.get_or_load('empty', _load) == []
+    assert len(loads) == 1
+
+
+def test_invalidate_one_matching_or_all():
+    entries = TTLCache()
+    for key in [('inventory', 'p1'), ('inventory', 'p2'), ('demand', 'p1')]:
+        entries.set(key, key)
+
+    entries.invalidate(('inventory', 'p1'))
+    assert entries.get(('inventory', 'p1')) is None
+    entries.invalidate_where(lambda key: key[0] == 'inventory')
+    assert entries.get(('inventory', 'p2')) is None
+    assert entries.get(('demand', 'p1')) == ('demand', 'p1')
+    entries.invalidate()
+    assert entries.stats()['entries'] == 0
+
+
+class _Table:
+    name = 'supplysense-inventory'
+
+
+def test_snapshot_load_overtaken_by_invalidation_is_not_cached(monkeypatch):
+    scans = []
+
+    def _scan(table):
+        scans.append(1)
+        if len(scans) == 1:
+            # reserve_stock writes and invalidates while the first scan is in flight
+            inventory.invalidate_inventory_snapshot('p1')
+        return [{'productId': 'p1', 'availableStock': 10 - len(scans)}]
+
+    monkeypatch.setattr(inventory, 'scan_all', _scan)
+    inventory.invalidate_inventory_snapshot()
+
+    assert inventory.get_inventory_snapshot(_Table())[0]['availableStock'] == 9
+    assert inventory.get_inventory_snapshot(_Table())[0]['availableStock'] == 8
+    assert inventory.get_inventory_snapshot(_Table())[0]['availableStock'] == 8
+    assert len(scans) == 2
+
+
+def test_snapshot_rows_are_copies(monkeypatch):
+    monkeypatch.setattr(inventory, 'scan_all', lambda table: [{'productId': 'p1', 'availableStock': 5}])
+    inventory.invalidate_inventory_snapshot()
+
+    inventory.get_inventory_snapshot(_Table())[0]['availableStock'] = 0
+    inventory.get_product_inventory(_Table(), 'p1')[0]['availableStock'] = 0
+
+    assert inventory.get_inventory_snapshot(_Table())[0]['availableStock'] == 5